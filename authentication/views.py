@@ -50,6 +50,7 @@ from .forms import StyledPasswordChangeForm
 from scheduling.models import ProgressUpdate
 from scheduling.forms import ProjectTask
 from project_profiling.models import ProjectProfile, ProjectBudget, ProjectCost, FundAllocation
+from project_profiling.portfolio import planned_progress_percent, portfolio_status_counts, with_portfolio_figures
 from authentication.models import CustomUser
 from manage_client.models import Client
 
@@ -528,14 +529,14 @@ def dashboard_signed_with_role(request, token=None, role=None):
         projects = ProjectProfile.objects.all()
 
     # --- Optimize queries like API ---
+    status_base = projects
     projects = (
-        projects
+        with_portfolio_figures(projects)
         .prefetch_related(
             "tasks__assigned_to__user",
-            "budgets__allocations",
             "tasks__scope",
         )
-        .select_related()
+        .select_related("project_type")
     )
 
     projects_data = []
@@ -543,32 +544,19 @@ def dashboard_signed_with_role(request, token=None, role=None):
     today = timezone.now().date()
 
     for project in projects:
-        # --- Budget calculations ---
-        planned_budget = project.budgets.aggregate(
-            total=models.Sum("planned_amount")
-        )["total"] or 0
-
-        allocated_budget = FundAllocation.objects.filter(
-            project_budget__project=project
-        ).aggregate(total=models.Sum("amount"))["total"] or 0
+        # --- Budget calculations (annotated by with_portfolio_figures) ---
+        planned_budget = project.planned_total
+        allocated_budget = project.allocated_total
 
         approved_budget = float(project.approved_budget or 0)
         estimated_cost = float(project.estimated_cost or 0)
         spent = float(getattr(project, "expense", 0) or 0)
 
         # --- Actual disbursement from weekly cost reports ---
-        actual_disbursement = project.weekly_cost_reports.aggregate(
-            total=models.Sum("total_amount")
-        )["total"] or 0
+        actual_disbursement = project.disbursed_total
 
         # --- Planned progress calculation ---
-        planned_progress = 0
-        if project.start_date and project.target_completion_date:
-            total_days = (project.target_completion_date - project.start_date).days
-            elapsed_days = (today - project.start_date).days
-            if total_days > 0:
-                planned_progress = (elapsed_days / total_days) * 100
-            planned_progress = max(0, min(100, planned_progress))
+        planned_progress = planned_progress_percent(project, today)
 
         # --- Project data ---
         project_data = {
@@ -679,12 +667,7 @@ def dashboard_signed_with_role(request, token=None, role=None):
         projects_data.append(project_data)
 
     # --- Status counts ---
-    status_counts = {
-        "planned": projects.filter(status="PL").count(),
-        "ongoing": projects.filter(status="OG").count(),
-        "completed": projects.filter(status="CP").count(),
-        "cancelled": projects.filter(status="CN").count(),
-    }
+    status_counts = portfolio_status_counts(status_base)
 
     # --- Total projects ---
     total_projects = sum(status_counts.values()) or 1  # avoid division by zero
@@ -1327,13 +1310,14 @@ def dashboard_api(request):
         projects = ProjectProfile.objects.all()
 
     # --- Optimize queries ---
+    status_base = projects
     projects = (
-        projects.prefetch_related(
+        with_portfolio_figures(projects)
+        .prefetch_related(
             "tasks__assigned_to__user",
-            "budgets__allocations",
             "tasks__scope",
         )
-        .select_related()
+        .select_related("project_type")
     )
 
     projects_data = []
@@ -1341,32 +1325,19 @@ def dashboard_api(request):
     today = timezone.now().date()
 
     for project in projects:
-        # ---- Budget calculations ----
-        planned_budget = project.budgets.aggregate(
-            total=models.Sum("planned_amount")
-        )["total"] or 0
-
-        allocated_budget = FundAllocation.objects.filter(
-            project_budget__project=project
-        ).aggregate(total=models.Sum("amount"))["total"] or 0
+        # ---- Budget calculations (annotated by with_portfolio_figures) ----
+        planned_budget = project.planned_total
+        allocated_budget = project.allocated_total
 
         approved_budget = float(project.approved_budget or 0)
         estimated_cost = float(project.estimated_cost or 0)
         spent = float(getattr(project, "expense", 0) or 0)
 
         # --- Actual disbursement from weekly cost reports ---
-        actual_disbursement = project.weekly_cost_reports.aggregate(
-            total=models.Sum("total_amount")
-        )["total"] or 0
+        actual_disbursement = project.disbursed_total
 
         # --- Planned progress calculation ---
-        planned_progress = 0
-        if project.start_date and project.target_completion_date:
-            total_days = (project.target_completion_date - project.start_date).days
-            elapsed_days = (today - project.start_date).days
-            if total_days > 0:
-                planned_progress = (elapsed_days / total_days) * 100
-        planned_progress = max(0, min(100, planned_progress))
+        planned_progress = planned_progress_percent(project, today)
 
         # ---- Project data ----
         project_data = {
@@ -1480,12 +1451,7 @@ def dashboard_api(request):
         projects_data.append(project_data)
 
     # ---- Status + task counts ----
-    status_counts = {
-        "planned": projects.filter(status="PL").count(),
-        "ongoing": projects.filter(status="OG").count(),
-        "completed": projects.filter(status="CP").count(),
-        "cancelled": projects.filter(status="CN").count(),
-    }
+    status_counts = portfolio_status_counts(status_base)
 
     # Calculate status percentages (matching dashboard view)
     total_projects = len(projects_data)
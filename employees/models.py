@@ -208,8 +208,7 @@ class Employee(models.Model):
             if days_left is None:
                 return False
 
-            from django.core.mail import EmailMultiAlternatives
-            from django.conf import settings
+            from notifications.email_outbox import queue_email
 
             # Determine urgency and status
             is_expired = self.is_contract_expired
@@ -686,17 +685,10 @@ For questions, contact HR at hr@powermason.com
             if self.email and self.email not in recipient_list:
                 recipient_list.append(self.email)
 
-            email = EmailMultiAlternatives(
-                subject=subject,
-                body=plain_message,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=recipient_list,
-            )
-            email.attach_alternative(html_message, "text/html")
-            email.send()
+            queue_email(recipient_list, subject, plain_message, html_message=html_message)
 
             logger.info(
-                f"Contract notification sent successfully for "
+                f"Contract notification queued for "
                 f"{self.full_name} to {recipient_list}"
             )
             return True
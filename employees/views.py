@@ -21,6 +21,7 @@ from authentication.models import UserProfile
 from authentication.utils.decorators import verified_email_required, role_required
 from authentication.utils.toast_helpers import set_toast_message
 from project_profiling.models import ProjectProfile
+from project_profiling.search import search_queryset
 from manage_client.models import Client
 
 User = get_user_model()
@@ -681,11 +682,9 @@ def employee_search_api(request):
     if not query or len(query) < 2:
         return JsonResponse({'results': []})
     
-    employees = Employee.objects.filter(
-        Q(first_name__icontains=query) |
-        Q(last_name__icontains=query) |
-        Q(employee_id__icontains=query)
-    ).active()[:10]
+    employees = search_queryset(
+        Employee.objects.active(), 'employee', query
+    ).order_by('-search_rank', 'last_name', 'first_name')[:10]
     
     results = []
     for employee in employees:
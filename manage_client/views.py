@@ -15,6 +15,7 @@ from authentication.templatetags.role_tags import has_role
 
 from .models import Client, PROJECT_SOURCES
 from project_profiling.models import ProjectProfile, ProjectType
+from project_profiling.search import search_queryset
 from authentication.utils.decorators import verified_email_required, role_required
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
@@ -255,7 +256,7 @@ def add_client(request):
         if sync_to_xero and has_xero_connection(request.user):
             sync_result = sync_client_to_xero(request, client)
             if sync_result['success']:
-                xero_sync_message = " and synced to Xero"
+                xero_sync_message = " and queued for Xero sync"
             else:
                 xero_sync_message = f" (Xero sync failed: {sync_result.get('message', 'Unknown error')})"
         
@@ -452,11 +453,11 @@ def edit_client(request, client_id):
                 has_xero_connection = hasattr(request, "session") and request.session.get("xero_access_token")
                 if has_xero_connection:
                     try:
-                        success = client.sync_to_xero(request)
-                        if success:
+                        sync_result = client.sync_to_xero(request)
+                        if sync_result['success']:
                             xero_synced = True
                         else:
-                            xero_error = "Failed to sync to Xero"
+                            xero_error = sync_result.get('error', "Failed to sync to Xero")
                     except Exception as e:
                         xero_error = f"Xero sync error: {str(e)}"
                 else:
@@ -466,7 +467,7 @@ def edit_client(request, client_id):
             success_message = f'{client_type_display} "{company_name}" updated successfully.'
             
             if xero_synced:
-                success_message += " Changes have been synced to Xero."
+                success_message += " Changes have been queued for Xero sync."
             elif xero_error:
                 success_message += f" Warning: Xero sync failed - {xero_error}"
 
@@ -912,16 +913,12 @@ def search_clients(request):
     if len(query) < 2:
         return JsonResponse({'clients': []})
     
-    clients_query = Client.objects.filter(
-        Q(company_name__icontains=query) |
-        Q(contact_name__icontains=query),
-        is_active=True
-    )
+    clients_query = search_queryset(Client.objects.filter(is_active=True), 'client', query)
     
     if client_type and client_type in [choice[0] for choice in PROJECT_SOURCES]:
         clients_query = clients_query.filter(client_type=client_type)
     
-    clients = clients_query.order_by('company_name')[:10]
+    clients = clients_query.order_by('-search_rank', 'company_name')[:10]
     
     data = [{
         'id': client.id,
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MaterialsEquipmentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'materials_equipment'
+
+    def ready(self):
+        import materials_equipment.signals
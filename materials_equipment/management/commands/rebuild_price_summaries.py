@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from materials_equipment.models import MaterialPriceSummary
+
+
+class Command(BaseCommand):
+    help = "Rebuild MaterialPriceSummary rows (latest, BOQ and quotation prices, project counts) from the price history"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--material",
+            type=int,
+            action="append",
+            dest="material_ids",
+            help="Only rebuild the given material id (may be repeated). Rebuilds all materials by default.",
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = MaterialPriceSummary.rebuild(options["material_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt price summaries for {rebuilt} material(s)."))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-16 19:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('materials_equipment', '0003_add_source_field_to_material'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MaterialPriceSummary',
+            fields=[
+                ('material', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='price_summary', serialize=False, to='materials_equipment.material')),
+                ('latest_price', models.DecimalField(blank=True, decimal_places=2, help_text='Most recent active price from any supplier type', max_digits=15, null=True)),
+                ('latest_price_date', models.DateField(blank=True, null=True)),
+                ('boq_price', models.DecimalField(blank=True, decimal_places=2, help_text='Most recent BOQ estimate', max_digits=15, null=True)),
+                ('quotation_price', models.DecimalField(blank=True, decimal_places=2, help_text='Most recent project quotation price', max_digits=15, null=True)),
+                ('project_count', models.PositiveIntegerField(default=0, help_text='Number of projects with a price record for this material')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Material Price Summary',
+                'verbose_name_plural': 'Material Price Summaries',
+            },
+        ),
+    ]
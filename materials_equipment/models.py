@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
 from django.core.validators import MinValueValidator
+from django.utils import timezone
 from decimal import Decimal
 
 
@@ -97,6 +99,119 @@ class MaterialPriceMonitoring(models.Model):
         return 0
 
 
+# Older quotation extractions stored the full word instead of the 3-letter code
+QUOTATION_SUPPLIER_TYPES = [SupplierType.QUOTATION, 'QUOTATION']
+
+
+class MaterialPriceSummary(models.Model):
+    """
+    Denormalized latest prices per material so the catalog can list a page of
+    materials without querying the price history per row. Kept current by the
+    signal handlers in signals.py; `rebuild()` (and the rebuild_price_summaries
+    command) recomputes them from MaterialPriceMonitoring.
+    """
+    material = models.OneToOneField(
+        Material,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='price_summary'
+    )
+    latest_price = models.DecimalField(
+        max_digits=15, decimal_places=2, null=True, blank=True,
+        help_text="Most recent active price from any supplier type"
+    )
+    latest_price_date = models.DateField(null=True, blank=True)
+    boq_price = models.DecimalField(
+        max_digits=15, decimal_places=2, null=True, blank=True,
+        help_text="Most recent BOQ estimate"
+    )
+    quotation_price = models.DecimalField(
+        max_digits=15, decimal_places=2, null=True, blank=True,
+        help_text="Most recent project quotation price"
+    )
+    project_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of projects with a price record for this material"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Material Price Summary"
+        verbose_name_plural = "Material Price Summaries"
+
+    def __str__(self):
+        return f"Price summary for {self.material}"
+
+    @staticmethod
+    def _latest(column, **filters):
+        prices = MaterialPriceMonitoring.objects.filter(material=OuterRef('pk'), **filters)
+        return Subquery(prices.order_by('-date', '-pk').values(column)[:1])
+
+    @classmethod
+    def rebuild(cls, material_ids=None, create_missing=True):
+        """
+        Recompute summaries with one annotated query over the materials, then
+        upsert them. Rebuilds every material when `material_ids` is None; with
+        create_missing=False only existing summaries are updated (e.g. during
+        cascade deletes).
+        """
+        materials = Material.objects.all()
+        if material_ids is not None:
+            materials = materials.filter(pk__in=list(material_ids))
+
+        project_counts = (
+            MaterialPriceMonitoring.objects
+            .filter(material=OuterRef('pk'), project__isnull=False)
+            .order_by().values('material')
+            .annotate(count=Count('project', distinct=True)).values('count')
+        )
+        rows = materials.order_by().values('pk').annotate(
+            latest_price=cls._latest('price', is_active=True),
+            latest_price_date=cls._latest('date', is_active=True),
+            boq_price=cls._latest('price', supplier_type=SupplierType.BOQ),
+            quotation_price=cls._latest('price', supplier_type__in=QUOTATION_SUPPLIER_TYPES),
+            project_count=Subquery(project_counts),
+        )
+
+        now = timezone.now()
+        columns = ['latest_price', 'latest_price_date', 'boq_price', 'quotation_price', 'project_count']
+        summaries = [
+            cls(material_id=row['pk'], updated_at=now, **{
+                column: row[column] for column in columns
+            })
+            for row in rows
+        ]
+        for summary in summaries:
+            summary.project_count = summary.project_count or 0
+
+        if not create_missing:
+            existing = set(cls.objects.filter(pk__in=[s.material_id for s in summaries]).values_list('pk', flat=True))
+            summaries = [s for s in summaries if s.material_id in existing]
+            cls.objects.bulk_update(summaries, [*columns, 'updated_at'], batch_size=500)
+            return len(summaries)
+
+        cls.objects.bulk_create(
+            summaries,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['material'],
+            update_fields=[*columns, 'updated_at'],
+        )
+        return len(summaries)
+
+    @classmethod
+    def for_materials(cls, materials):
+        """Attach each material's summary, building any that are missing"""
+        missing = [m.pk for m in materials if not hasattr(m, 'price_summary')]
+        if missing:
+            cls.rebuild(missing)
+            summaries = cls.objects.in_bulk(missing)
+            for material in materials:
+                if material.pk in summaries:
+                    material.price_summary = summaries[material.pk]
+        return materials
+
+
 class ProjectMaterialExtraction(models.Model):
     """Track material extraction history from BOQ/Quotation files"""
     EXTRACTION_SOURCES = [
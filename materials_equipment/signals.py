@@ -0,0 +1,33 @@
+# materials_equipment/signals.py
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from .models import MaterialPriceMonitoring, MaterialPriceSummary
+
+
+# ----------------------------
+# MaterialPriceSummary maintenance
+# ----------------------------
+@receiver(pre_save, sender=MaterialPriceMonitoring)
+def capture_previous_material(sender, instance, raw=False, **kwargs):
+    if raw or not instance.pk:
+        instance._summary_previous_material = None
+        return
+    instance._summary_previous_material = (
+        sender.objects.filter(pk=instance.pk).values_list('material_id', flat=True).first()
+    )
+
+@receiver(post_save, sender=MaterialPriceMonitoring)
+def refresh_price_summary_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    material_ids = {instance.material_id}
+    previous = getattr(instance, '_summary_previous_material', None)
+    if previous:
+        material_ids.add(previous)
+    MaterialPriceSummary.rebuild(material_ids)
+
+@receiver(post_delete, sender=MaterialPriceMonitoring)
+def refresh_price_summary_on_delete(sender, instance, **kwargs):
+    # Never recreate a summary here: the material may be part of the same cascade delete
+    MaterialPriceSummary.rebuild([instance.material_id], create_missing=False)
@@ -2,6 +2,7 @@
 from .price_monitoring_integration import (
     create_price_records_from_boq,
     create_price_records_from_quotation,
-    get_price_variance_analysis
+    get_price_variance_analysis,
+    get_portfolio_price_variance
 )
 
@@ -2,18 +2,40 @@
 Price monitoring integration for BOQ and Quotation material extraction
 """
 import logging
+import re
 from decimal import Decimal
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from django.db import transaction
+from django.db.models import OuterRef, Subquery
 from django.contrib.auth import get_user_model
 
-from materials_equipment.models import Material, MaterialPriceMonitoring, ProjectMaterialExtraction
+from materials_equipment.models import (
+    Material, MaterialPriceMonitoring, MaterialPriceSummary, ProjectMaterialExtraction,
+    QUOTATION_SUPPLIER_TYPES, SupplierType
+)
 from project_profiling.models import ProjectProfile
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
+# Category -> name keywords, checked in this order (first match wins)
+MATERIAL_CATEGORY_KEYWORDS = [
+    ('ELECTRICAL', ['cable', 'wire', 'conduit', 'outlet', 'switch', 'breaker', 'panel', 'electrical']),
+    ('CIVIL', ['concrete', 'cement', 'steel', 'rebar', 'block', 'brick', 'sand', 'gravel']),
+    ('MECHANICAL', ['pipe', 'valve', 'pump', 'hvac', 'duct', 'mechanical']),
+    ('ARCHITECTURAL', ['paint', 'tile', 'flooring', 'ceiling', 'door', 'window', 'architectural']),
+    ('GENERAL', ['mobilization', 'temporary', 'safety', 'permit', 'supervision']),
+]
+
+# One alternation per category instead of a Python `in` test per keyword
+MATERIAL_CATEGORY_PATTERNS = [
+    (category, re.compile('|'.join(re.escape(term) for term in terms)))
+    for category, terms in MATERIAL_CATEGORY_KEYWORDS
+]
+
+
 def create_price_records_from_boq(project: ProjectProfile, boq_items: List[Dict[str, Any]], 
                                 extracted_by: Optional[Any] = None) -> Dict[str, int]:
     """
@@ -28,76 +50,20 @@ def create_price_records_from_boq(project: ProjectProfile, boq_items: List[Dict[
         Dict with counts of created records
     """
     try:
-        created_records = 0
-        total_value = Decimal('0')
-        
-        # Create extraction tracking record
-        extraction_record = ProjectMaterialExtraction.objects.create(
-            project=project,
+        # Line items only
+        line_items = [item for item in boq_items if item.get('level') == 2]
+        result = _create_price_records(
+            project, line_items, extracted_by,
             source_type='BOQ',
+            supplier_type=SupplierType.BOQ,
             source_file=getattr(project, 'boq_file_name', 'BOQ File'),
-            materials_count=0,
-            equipment_count=0,
-            mobilization_count=0,
-            total_extracted_value=0,
+            label='BOQ',
+            description=f"Extracted from BOQ for {project.project_name}",
+            notes=f"BOQ estimate for {project.project_name}",
             extraction_notes=f"BOQ extraction for project {project.project_name}",
-            extracted_by=extracted_by
         )
-        
-        for item in boq_items:
-            if item.get('level') == 2:  # Line items only
-                material_name = item.get('description', '').strip()
-                unit_cost = item.get('unit_cost', 0)
-                quantity = item.get('quantity', 1)
-                amount = item.get('amount', 0)
-                
-                if not material_name or not unit_cost:
-                    continue
-                
-                # Find or create material
-                material, created = Material.objects.get_or_create(
-                    name=material_name,
-                    defaults={
-                        'description': f"Extracted from BOQ for {project.project_name}",
-                        'unit': item.get('uom', 'unit'),
-                        'standard_price': Decimal(str(unit_cost)),
-                        'category': _classify_material_category(material_name),
-                        'source': 'BOQ'
-                    }
-                )
-                
-                # Create price monitoring record
-                price_record = MaterialPriceMonitoring.objects.create(
-                    material=material,
-                    supplier_type='BOQ',
-                    supplier_name=f"BOQ - {project.project_name}",
-                    price=Decimal(str(unit_cost)),
-                    date=project.created_at.date(),
-                    notes=f"BOQ estimate for {project.project_name}",
-                    project=project,
-                    recorded_by=extracted_by
-                )
-                
-                created_records += 1
-                total_value += Decimal(str(amount))
-                
-                # Update extraction counts
-                if item.get('is_requirement', False):
-                    extraction_record.mobilization_count += 1
-                else:
-                    extraction_record.materials_count += 1
-        
-        # Update extraction record with totals
-        extraction_record.materials_count = created_records
-        extraction_record.total_extracted_value = total_value
-        extraction_record.save()
-        
-        logger.info(f"Created {created_records} BOQ price records for project {project.id}")
-        return {
-            'price_records': created_records,
-            'total_value': float(total_value),
-            'extraction_id': extraction_record.id
-        }
+        logger.info(f"Created {result['price_records']} BOQ price records for project {project.id}")
+        return result
         
     except Exception as e:
         logger.error(f"Error creating BOQ price records for project {project.id}: {e}")
@@ -118,75 +84,105 @@ def create_price_records_from_quotation(project: ProjectProfile, quotation_data:
         Dict with counts of created records
     """
     try:
-        created_records = 0
-        total_value = Decimal('0')
-        
-        # Create extraction tracking record
-        extraction_record = ProjectMaterialExtraction.objects.create(
-            project=project,
+        result = _create_price_records(
+            project, quotation_data, extracted_by,
             source_type='QUOTATION',
+            supplier_type=SupplierType.QUOTATION,
             source_file=getattr(project, 'quotation_file_name', 'Quotation File'),
-            materials_count=0,
-            equipment_count=0,
-            mobilization_count=0,
-            total_extracted_value=0,
+            label='Quotation',
+            description=f"Extracted from quotation for {project.project_name}",
+            notes=f"Quotation price for {project.project_name}",
             extraction_notes=f"Quotation extraction for project {project.project_name}",
-            extracted_by=extracted_by
         )
+        logger.info(f"Created {result['price_records']} quotation price records for project {project.id}")
+        return result
         
-        for item in quotation_data:
-            material_name = item.get('description', '').strip()
-            unit_cost = item.get('unit_cost', 0)
-            quantity = item.get('quantity', 1)
-            amount = item.get('amount', 0)
-            
-            if not material_name or not unit_cost:
-                continue
-            
-            # Find or create material
-            material, created = Material.objects.get_or_create(
-                name=material_name,
-                defaults={
-                    'description': f"Extracted from quotation for {project.project_name}",
-                    'unit': item.get('uom', 'unit'),
-                    'standard_price': Decimal(str(unit_cost)),
-                    'category': _classify_material_category(material_name),
-                    'source': 'QUOTATION'
-                }
+    except Exception as e:
+        logger.error(f"Error creating quotation price records for project {project.id}: {e}")
+        raise
+
+
+@transaction.atomic
+def _create_price_records(project, items, extracted_by, source_type, supplier_type, source_file,
+                          label, description, notes, extraction_notes) -> Dict[str, Any]:
+    """
+    Batch path shared by the BOQ and quotation imports: all material names are
+    resolved with one `in` query, and missing materials and the price records
+    are inserted with bulk_create.
+    """
+    rows = []
+    for item in items:
+        material_name = item.get('description', '').strip()
+        unit_cost = item.get('unit_cost', 0)
+        
+        if not material_name or not unit_cost:
+            continue
+        
+        rows.append((material_name, Decimal(str(unit_cost)), Decimal(str(item.get('amount', 0))), item))
+    
+    # Find existing materials by name (lowest id wins if a name is duplicated)
+    names = {name for name, _unit_cost, _amount, _item in rows}
+    materials = {}
+    for material in Material.objects.filter(name__in=names).order_by('-pk'):
+        materials[material.name] = material
+    
+    # Create the missing ones from the first item that names them
+    new_materials = {}
+    for name, unit_cost, _amount, item in rows:
+        if name not in materials and name not in new_materials:
+            new_materials[name] = Material(
+                name=name,
+                description=description,
+                unit=item.get('uom', 'unit'),
+                standard_price=unit_cost,
+                category=_classify_material_category(name),
+                source=source_type
             )
-            
-            # Create price monitoring record
-            price_record = MaterialPriceMonitoring.objects.create(
-                material=material,
-                supplier_type='QUOTATION',
-                supplier_name=f"Quotation - {project.project_name}",
-                price=Decimal(str(unit_cost)),
-                date=project.created_at.date(),
-                notes=f"Quotation price for {project.project_name}",
+    if new_materials:
+        for material in Material.objects.bulk_create(new_materials.values(), batch_size=500):
+            materials[material.name] = material
+    
+    price_date = project.created_at.date()
+    MaterialPriceMonitoring.objects.bulk_create(
+        [
+            MaterialPriceMonitoring(
+                material=materials[name],
+                supplier_type=supplier_type,
+                supplier_name=f"{label} - {project.project_name}",
+                price=unit_cost,
+                date=price_date,
+                notes=notes,
                 project=project,
                 recorded_by=extracted_by
             )
-            
-            created_records += 1
-            total_value += Decimal(str(amount))
-        
-        # Update extraction record with totals
-        extraction_record.materials_count = created_records
-        extraction_record.total_extracted_value = total_value
-        extraction_record.save()
-        
-        logger.info(f"Created {created_records} quotation price records for project {project.id}")
-        return {
-            'price_records': created_records,
-            'total_value': float(total_value),
-            'extraction_id': extraction_record.id
-        }
-        
-    except Exception as e:
-        logger.error(f"Error creating quotation price records for project {project.id}: {e}")
-        raise
+            for name, unit_cost, _amount, _item in rows
+        ],
+        batch_size=500
+    )
+    # bulk_create skips the signal handlers that keep the summaries current
+    MaterialPriceSummary.rebuild({materials[name].pk for name in names})
+    
+    total_value = sum((amount for _name, _unit_cost, amount, _item in rows), Decimal('0'))
+    extraction_record = ProjectMaterialExtraction.objects.create(
+        project=project,
+        source_type=source_type,
+        source_file=source_file,
+        materials_count=len(rows),
+        equipment_count=0,
+        mobilization_count=sum(1 for *_row, item in rows if item.get('is_requirement', False)),
+        total_extracted_value=total_value,
+        extraction_notes=extraction_notes,
+        extracted_by=extracted_by
+    )
+    
+    return {
+        'price_records': len(rows),
+        'total_value': float(total_value),
+        'extraction_id': extraction_record.id
+    }
 
 
+@lru_cache(maxsize=4096)
 def _classify_material_category(material_name: str) -> str:
     """
     Classify material category based on name.
@@ -199,29 +195,59 @@ def _classify_material_category(material_name: str) -> str:
     """
     name_lower = material_name.lower()
     
-    # Electrical materials
-    if any(term in name_lower for term in ['cable', 'wire', 'conduit', 'outlet', 'switch', 'breaker', 'panel', 'electrical']):
-        return 'ELECTRICAL'
-    
-    # Civil materials
-    elif any(term in name_lower for term in ['concrete', 'cement', 'steel', 'rebar', 'block', 'brick', 'sand', 'gravel']):
-        return 'CIVIL'
-    
-    # Mechanical materials
-    elif any(term in name_lower for term in ['pipe', 'valve', 'pump', 'hvac', 'duct', 'mechanical']):
-        return 'MECHANICAL'
-    
-    # Architectural materials
-    elif any(term in name_lower for term in ['paint', 'tile', 'flooring', 'ceiling', 'door', 'window', 'architectural']):
-        return 'ARCHITECTURAL'
-    
-    # General requirements
-    elif any(term in name_lower for term in ['mobilization', 'temporary', 'safety', 'permit', 'supervision']):
-        return 'GENERAL'
+    for category, pattern in MATERIAL_CATEGORY_PATTERNS:
+        if pattern.search(name_lower):
+            return category
     
     return 'GENERAL'
 
 
+def _variance_records(boq_records):
+    """
+    One row per BOQ price record that has a quotation price for the same
+    project and material, with the latest such quotation price joined in as
+    a subquery (a single query for any number of projects).
+    """
+    latest_quotation = MaterialPriceMonitoring.objects.filter(
+        project=OuterRef('project'),
+        material=OuterRef('material'),
+        supplier_type__in=QUOTATION_SUPPLIER_TYPES
+    ).order_by('-date', '-pk').values('price')[:1]
+
+    return (
+        boq_records
+        .annotate(quotation_price=Subquery(latest_quotation))
+        .filter(quotation_price__isnull=False)
+        .order_by('-date', 'pk')
+        .values('project_id', 'project__project_name', 'material__name', 'price', 'quotation_price')
+    )
+
+
+def _variance_totals(total_boq_value: Decimal, total_quotation_value: Decimal) -> Dict[str, float]:
+    overall_variance = total_quotation_value - total_boq_value
+    overall_variance_percentage = (overall_variance / total_boq_value * 100) if total_boq_value > 0 else 0
+    return {
+        'total_boq_value': float(total_boq_value),
+        'total_quotation_value': float(total_quotation_value),
+        'overall_variance': float(overall_variance),
+        'overall_variance_percentage': float(overall_variance_percentage),
+    }
+
+
+def _variance_detail(row: Dict[str, Any]) -> Dict[str, Any]:
+    boq_price = row['price']
+    quotation_price = row['quotation_price']
+    variance = quotation_price - boq_price
+    variance_percentage = (variance / boq_price * 100) if boq_price > 0 else 0
+    return {
+        'material': row['material__name'],
+        'boq_price': float(boq_price),
+        'quotation_price': float(quotation_price),
+        'variance': float(variance),
+        'variance_percentage': float(variance_percentage)
+    }
+
+
 def get_price_variance_analysis(project: ProjectProfile) -> Dict[str, Any]:
     """
     Get price variance analysis for a project.
@@ -233,49 +259,24 @@ def get_price_variance_analysis(project: ProjectProfile) -> Dict[str, Any]:
         Dict with variance analysis data
     """
     try:
-        # Get BOQ and Quotation price records for this project
-        boq_records = MaterialPriceMonitoring.objects.filter(
+        # Compare each BOQ price with the project's latest quotation price for that material
+        rows = _variance_records(MaterialPriceMonitoring.objects.filter(
             project=project,
             supplier_type='BOQ'
-        )
-        
-        quotation_records = MaterialPriceMonitoring.objects.filter(
-            project=project,
-            supplier_type='QUOTATION'
-        )
+        ))
         
         variance_data = []
         total_boq_value = Decimal('0')
         total_quotation_value = Decimal('0')
         
-        # Compare BOQ vs Quotation prices
-        for boq_record in boq_records:
-            quotation_record = quotation_records.filter(material=boq_record.material).first()
-            
-            if quotation_record:
-                variance = quotation_record.price - boq_record.price
-                variance_percentage = (variance / boq_record.price * 100) if boq_record.price > 0 else 0
-                
-                variance_data.append({
-                    'material': boq_record.material.name,
-                    'boq_price': float(boq_record.price),
-                    'quotation_price': float(quotation_record.price),
-                    'variance': float(variance),
-                    'variance_percentage': float(variance_percentage)
-                })
-                
-                total_boq_value += boq_record.price
-                total_quotation_value += quotation_record.price
-        
-        overall_variance = total_quotation_value - total_boq_value
-        overall_variance_percentage = (overall_variance / total_boq_value * 100) if total_boq_value > 0 else 0
+        for row in rows:
+            variance_data.append(_variance_detail(row))
+            total_boq_value += row['price']
+            total_quotation_value += row['quotation_price']
         
         return {
             'project_name': project.project_name,
-            'total_boq_value': float(total_boq_value),
-            'total_quotation_value': float(total_quotation_value),
-            'overall_variance': float(overall_variance),
-            'overall_variance_percentage': float(overall_variance_percentage),
+            **_variance_totals(total_boq_value, total_quotation_value),
             'variance_details': variance_data,
             'record_count': len(variance_data)
         }
@@ -283,3 +284,82 @@ def get_price_variance_analysis(project: ProjectProfile) -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"Error getting price variance analysis for project {project.id}: {e}")
         return {'error': str(e)}
+
+
+def get_portfolio_price_variance(projects=None, include_details: bool = False) -> Dict[str, Any]:
+    """
+    BOQ vs quotation price variance across many projects from one query.
+    
+    Args:
+        projects: ProjectProfile queryset or iterable of projects/ids (all projects if None)
+        include_details: Include each project's per-material variance_details
+    
+    Returns:
+        Dict with portfolio totals, per-project summaries (largest variance first)
+        and per-material totals across projects
+    """
+    try:
+        boq_records = MaterialPriceMonitoring.objects.filter(supplier_type='BOQ')
+        if projects is not None:
+            boq_records = boq_records.filter(project__in=projects)
+        
+        by_project = {}
+        by_material = {}
+        total_boq_value = Decimal('0')
+        total_quotation_value = Decimal('0')
+        
+        for row in _variance_records(boq_records):
+            project_totals = by_project.setdefault(row['project_id'], {
+                'project_name': row['project__project_name'],
+                'boq': Decimal('0'), 'quotation': Decimal('0'), 'count': 0, 'details': [],
+            })
+            project_totals['boq'] += row['price']
+            project_totals['quotation'] += row['quotation_price']
+            project_totals['count'] += 1
+            if include_details:
+                project_totals['details'].append(_variance_detail(row))
+            
+            material_totals = by_material.setdefault(row['material__name'], {
+                'boq': Decimal('0'), 'quotation': Decimal('0'), 'projects': set(),
+            })
+            material_totals['boq'] += row['price']
+            material_totals['quotation'] += row['quotation_price']
+            material_totals['projects'].add(row['project_id'])
+            
+            total_boq_value += row['price']
+            total_quotation_value += row['quotation_price']
+        
+        project_data = []
+        for project_id, totals in by_project.items():
+            entry = {
+                'project_id': project_id,
+                'project_name': totals['project_name'],
+                **_variance_totals(totals['boq'], totals['quotation']),
+                'record_count': totals['count'],
+            }
+            if include_details:
+                entry['variance_details'] = totals['details']
+            project_data.append(entry)
+        project_data.sort(key=lambda entry: abs(entry['overall_variance']), reverse=True)
+        
+        material_data = [
+            {
+                'material': name,
+                **_variance_totals(totals['boq'], totals['quotation']),
+                'project_count': len(totals['projects']),
+            }
+            for name, totals in by_material.items()
+        ]
+        material_data.sort(key=lambda entry: abs(entry['overall_variance']), reverse=True)
+        
+        return {
+            **_variance_totals(total_boq_value, total_quotation_value),
+            'projects': project_data,
+            'materials': material_data,
+            'project_count': len(project_data),
+            'record_count': sum(entry['record_count'] for entry in project_data),
+        }
+        
+    except Exception as e:
+        logger.error(f"Error getting portfolio price variance analysis: {e}")
+        return {'error': str(e)}
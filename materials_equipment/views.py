@@ -5,7 +5,7 @@ from django.views.decorators.http import require_http_methods
 from django.db.models import Q, Avg
 from authentication.models import UserProfile
 from .models import (
-    Material, MaterialPriceMonitoring, Equipment, Manpower,
+    Material, MaterialPriceMonitoring, MaterialPriceSummary, Equipment, Manpower,
     GeneralRequirement, ProjectMaterial, ProjectEquipment,
     ProjectManpower, ProjectGeneralRequirement
 )
@@ -197,36 +197,34 @@ def api_material_list(request):
     end = start + page_size
     
     total_count = materials.count()
-    materials = materials[start:end]
+    # Latest/BOQ/quotation prices and project counts come from the maintained
+    # MaterialPriceSummary rows, so a page is one query however large it is
+    materials = MaterialPriceSummary.for_materials(list(materials.select_related('price_summary')[start:end]))
 
     data = []
     for m in materials:
-        latest_price = m.get_latest_price()
-        latest_price_value = float(latest_price.price) if latest_price else float(m.standard_price)
+        summary = getattr(m, 'price_summary', None)
+        standard_price = float(m.standard_price)
+        latest_price_value = float(summary.latest_price) if summary and summary.latest_price is not None else standard_price
         
         # Calculate variance from standard price
-        variance = latest_price_value - float(m.standard_price)
-        variance_percentage = (variance / float(m.standard_price) * 100) if m.standard_price > 0 else 0
-        
-        # Get project-specific price records
-        project_prices = MaterialPriceMonitoring.objects.filter(material=m)
-        boq_price = project_prices.filter(supplier_type='BOQ').first()
-        quotation_price = project_prices.filter(supplier_type='QUOTATION').first()
+        variance = latest_price_value - standard_price
+        variance_percentage = (variance / standard_price * 100) if m.standard_price > 0 else 0
         
         data.append({
             'id': m.id,
             'name': m.name,
             'unit': m.unit,
-            'standard_price': float(m.standard_price),
+            'standard_price': standard_price,
             'category': m.category or '',
             'description': m.description or '',
             'source': m.source or '',
             'latest_price': latest_price_value,
             'variance': variance,
             'variance_percentage': variance_percentage,
-            'boq_price': float(boq_price.price) if boq_price else None,
-            'quotation_price': float(quotation_price.price) if quotation_price else None,
-            'project_count': project_prices.values('project').distinct().count()
+            'boq_price': float(summary.boq_price) if summary and summary.boq_price is not None else None,
+            'quotation_price': float(summary.quotation_price) if summary and summary.quotation_price is not None else None,
+            'project_count': summary.project_count if summary else 0
         })
 
     return JsonResponse({
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notification, NotificationStatus
+from .models import Notification, NotificationStatus, OutboundEmail
 
 class NotificationStatusInline(admin.TabularInline):
     model = NotificationStatus
@@ -20,3 +20,11 @@ class NotificationStatusAdmin(admin.ModelAdmin):
     list_display = ('notification', 'user', 'is_read', 'cleared')
     list_filter = ('is_read', 'cleared')
     search_fields = ('notification__message', 'user__user__username')
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject',)
+    readonly_fields = ('attempts', 'last_error', 'created_at', 'sent_at')
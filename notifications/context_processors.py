@@ -1,28 +1,17 @@
-from .models import Notification, NotificationStatus
+from django.utils.functional import SimpleLazyObject
+from .utils import get_recent_notifications, get_unread_count
 
-def unread_notifications(request):
-    if request.user.is_authenticated and hasattr(request.user, "userprofile"):
-        profile = request.user.userprofile
-
-        notifications = Notification.objects.filter(
-            notificationstatus__user=profile,
-            notificationstatus__cleared=False
-        ).prefetch_related('notificationstatus_set').order_by('-created_at')
-
-        unread_count = NotificationStatus.objects.filter(
-            user=profile,
-            is_read=False,
-            cleared=False
-        ).count()
-
-        # Annotate each notification with is_read_for_user
-        for notif in notifications:
-            try:
-                status = notif.notificationstatus_set.get(user=profile)
-                notif.is_read_for_user = status.is_read
-            except NotificationStatus.DoesNotExist:
-                notif.is_read_for_user = True  
 
+def unread_notifications(request):
+    """
+    Expose the user's notifications and unread count to templates.
+    Both are lazy: nothing is queried unless a template reads them, and the
+    unread count is served from the per-user cache.
+    """
+    if request.user.is_authenticated:
+        user = request.user
+        notifications = SimpleLazyObject(lambda: get_recent_notifications(user))
+        unread_count = SimpleLazyObject(lambda: get_unread_count(user))
     else:
         notifications = []
         unread_count = 0
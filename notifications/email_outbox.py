@@ -0,0 +1,176 @@
+"""
+Database-backed outbox for outgoing email.
+
+queue_email() stores a message and returns immediately; deliver_queued_emails()
+(run by the send_queued_emails command or the background queue) claims due
+messages, sends each batch over a single backend connection, and records the
+outcome. Failed sends are retried with exponential backoff until
+EMAIL_OUTBOX_MAX_ATTEMPTS is reached.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_BASE_SECONDS = 60
+MAX_RETRY_DELAY = timedelta(hours=6)
+# Messages stuck in "sending" this long (e.g. the worker died) are retried
+STALE_SENDING_AFTER = timedelta(minutes=15)
+
+
+def queue_email(recipients, subject, plain_message='', html_message=None, from_email=None):
+    """
+    Store an email in the outbox and schedule delivery after commit.
+
+    Args:
+        recipients: Email address (string) or list of email addresses
+        subject: Email subject line
+        plain_message: Plain text body
+        html_message: Optional HTML alternative
+        from_email: Sender, defaults to DEFAULT_FROM_EMAIL
+
+    Returns:
+        OutboundEmail or None if there were no valid recipients
+    """
+    if isinstance(recipients, str):
+        recipients = [recipients]
+    recipients = [r for r in recipients if r]
+    if not recipients:
+        logger.warning("No valid recipients for queued email: %s", subject)
+        return None
+
+    email = OutboundEmail.objects.create(
+        subject=subject,
+        body=plain_message or '',
+        html_body=html_message or '',
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=recipients,
+    )
+
+    from .tasks import enqueue_email_delivery
+    enqueue_email_delivery()
+    return email
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt: base * 2^(attempts-1), capped"""
+    base = getattr(settings, 'EMAIL_OUTBOX_RETRY_BASE_SECONDS', DEFAULT_RETRY_BASE_SECONDS)
+    return min(timedelta(seconds=base * 2 ** max(attempts - 1, 0)), MAX_RETRY_DELAY)
+
+
+def claim_due_emails(batch_size=DEFAULT_BATCH_SIZE):
+    """Mark up to batch_size due messages as "sending" and return them"""
+    now = timezone.now()
+    OutboundEmail.objects.filter(
+        status='sending', next_attempt_at__lte=now - STALE_SENDING_AFTER
+    ).update(status='pending')
+
+    with transaction.atomic():
+        ids = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        pending = OutboundEmail.objects.filter(status='pending')
+        if connections[pending.db].features.has_select_for_update_skip_locked:
+            # The selected rows stay locked until commit, so no other worker can claim them
+            pending.filter(id__in=ids).update(status='sending', next_attempt_at=now)
+        else:
+            # Nothing stops two workers selecting the same rows; keep only the
+            # ones this update actually moved out of "pending"
+            ids = [pk for pk in ids if pending.filter(id=pk).update(status='sending', next_attempt_at=now)]
+    return list(OutboundEmail.objects.filter(id__in=ids).order_by('id'))
+
+
+def build_message(email, connection=None):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or settings.DEFAULT_FROM_EMAIL,
+        to=email.to,
+        connection=connection,
+    )
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def _record_failure(email, error, max_attempts):
+    email.attempts += 1
+    email.last_error = str(error)[:2000]
+    if email.attempts >= max_attempts:
+        email.status = 'failed'
+        logger.error("Giving up on email %s after %s attempts: %s", email.pk, email.attempts, error)
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+        logger.warning("Email %s failed (attempt %s), retrying at %s: %s",
+                       email.pk, email.attempts, email.next_attempt_at, error)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def deliver_batch(emails, connection=None):
+    """
+    Send the given claimed messages over one backend connection
+    (one SMTP session / one SendGrid HTTP client) and record each outcome.
+    Returns (sent, failed) counts.
+    """
+    max_attempts = getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    sent = failed = 0
+    if not emails:
+        return sent, failed
+
+    connection = connection or get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        for email in emails:
+            _record_failure(email, e, max_attempts)
+        return sent, len(emails)
+
+    try:
+        for email in emails:
+            try:
+                delivered = connection.send_messages([build_message(email, connection)])
+                if not delivered:
+                    raise RuntimeError("Email backend reported the message as not sent")
+            except Exception as e:
+                _record_failure(email, e, max_attempts)
+                failed += 1
+            else:
+                email.attempts += 1
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                email.save(update_fields=['attempts', 'status', 'sent_at', 'last_error'])
+                sent += 1
+    finally:
+        connection.close()
+
+    logger.info("Email outbox batch delivered: %s sent, %s failed", sent, failed)
+    return sent, failed
+
+
+def deliver_queued_emails(batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    """Deliver due messages batch by batch until none are left. Returns (sent, failed)."""
+    total_sent = total_failed = batches = 0
+    while max_batches is None or batches < max_batches:
+        emails = claim_due_emails(batch_size)
+        if not emails:
+            break
+        sent, failed = deliver_batch(emails)
+        total_sent += sent
+        total_failed += failed
+        batches += 1
+    return total_sent, total_failed
@@ -2,9 +2,9 @@
 Email utility functions for sending notifications via SendGrid/SMTP
 """
 import logging
-from django.core.mail import send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
+from .email_outbox import queue_email
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +28,7 @@ def send_email_notification(recipients, subject, html_message, plain_message=Non
         plain_message: Plain text fallback (optional, will strip HTML if not provided)
 
     Returns:
-        bool: True if email sent successfully, False otherwise
+        bool: True if email was queued for delivery, False otherwise
     """
     # Ensure recipients is a list
     if isinstance(recipients, str):
@@ -46,20 +46,14 @@ def send_email_notification(recipients, subject, html_message, plain_message=Non
         plain_message = f"{subject}\n\nPlease view this email in an HTML-enabled email client."
 
     try:
-        # Send email using Django's send_mail (uses configured backend)
-        send_mail(
-            subject=subject,
-            message=plain_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=recipients,
-            html_message=html_message,
-            fail_silently=False,
-        )
-        logger.info(f"Email sent successfully to {len(recipients)} recipient(s): {subject}")
+        # Store in the outbox; delivery happens in the background so a slow
+        # or unavailable mail provider never holds up the request
+        queue_email(recipients, subject, plain_message, html_message=html_message)
+        logger.info(f"Email queued for {len(recipients)} recipient(s): {subject}")
         return True
 
     except Exception as e:
-        logger.error(f"Failed to send email: {subject}. Error: {str(e)}")
+        logger.error(f"Failed to queue email: {subject}. Error: {str(e)}")
         # Don't raise exception - we don't want email failures to break the workflow
         return False
 
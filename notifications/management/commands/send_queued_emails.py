@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from notifications.email_outbox import DEFAULT_BATCH_SIZE, deliver_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Deliver emails waiting in the outbox, one backend connection per batch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Messages sent per connection (default: {DEFAULT_BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and poll the outbox instead of exiting when it is empty",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=10,
+            help="Seconds to wait between polls in --loop mode (default: 10)",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            sent, failed = deliver_queued_emails(batch_size=options["batch_size"])
+            if sent or failed or not options["loop"]:
+                self.stdout.write(f"Outbox delivery: {sent} sent, {failed} failed.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
@@ -0,0 +1,17 @@
+# notifications/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from authentication.models import UserProfile
+from .models import NotificationStatus
+from .utils import invalidate_unread_count
+
+@receiver(post_save, sender=NotificationStatus)
+@receiver(post_delete, sender=NotificationStatus)
+def invalidate_unread_count_on_change(sender, instance, raw=False, **kwargs):
+    """Keep cached unread counts in step with individually saved or deleted statuses"""
+    if raw:
+        return
+    if NotificationStatus.user.is_cached(instance):
+        invalidate_unread_count([instance.user.user_id])
+    else:
+        invalidate_unread_count(UserProfile.objects.filter(pk=instance.user_id).values_list('user_id', flat=True))
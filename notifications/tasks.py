@@ -0,0 +1,114 @@
+# notifications/tasks.py
+"""
+Background execution for notification work (role fan-out, email delivery).
+
+NOTIFICATION_QUEUE_BACKEND selects where deferred jobs run:
+- "celery": hand the job to a Celery worker (requires celery and a broker)
+- "local":  run it on a daemon worker thread inside this process (default)
+- "sync":   run it inline, e.g. in tests or management commands
+
+Jobs are submitted on transaction commit so workers never see rows that the
+request has not committed yet.
+"""
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import connections, transaction
+
+try:
+    from celery import shared_task
+except ImportError:  # Celery is optional; fall back to the local worker
+    shared_task = None
+
+logger = logging.getLogger(__name__)
+
+_local_jobs = queue.Queue()
+_local_worker = None
+_local_worker_lock = threading.Lock()
+
+
+def run_fan_out(notification_id, roles=None, profile_ids=None):
+    from .utils import fan_out_notification
+    fan_out_notification(notification_id, roles=roles, profile_ids=profile_ids)
+
+
+def run_email_delivery():
+    from .email_outbox import deliver_queued_emails
+    deliver_queued_emails()
+
+
+if shared_task is not None:
+    fan_out_notification_task = shared_task(name="notifications.fan_out_notification")(run_fan_out)
+    deliver_queued_emails_task = shared_task(name="notifications.deliver_queued_emails")(run_email_delivery)
+else:
+    fan_out_notification_task = None
+    deliver_queued_emails_task = None
+
+
+def _work_local_queue():
+    while True:
+        func, kwargs = _local_jobs.get()
+        try:
+            func(**kwargs)
+        except Exception:
+            logger.exception("Background notification job %s failed", getattr(func, "__name__", func))
+        finally:
+            # Each job gets a fresh connection; don't hold one open between jobs
+            connections.close_all()
+            _local_jobs.task_done()
+
+
+def _start_local_worker():
+    global _local_worker
+    with _local_worker_lock:
+        if _local_worker is None or not _local_worker.is_alive():
+            _local_worker = threading.Thread(
+                target=_work_local_queue, name="notification-worker", daemon=True
+            )
+            _local_worker.start()
+
+
+def get_queue_backend():
+    backend = getattr(settings, "NOTIFICATION_QUEUE_BACKEND", "local")
+    if backend == "celery" and shared_task is None:
+        logger.warning("NOTIFICATION_QUEUE_BACKEND is 'celery' but celery is not installed; using local worker")
+        return "local"
+    return backend
+
+
+def submit_job(func, celery_task=None, **kwargs):
+    """Run func(**kwargs) on the configured backend once the current transaction commits"""
+    def submit():
+        backend = get_queue_backend()
+        if backend == "celery" and celery_task is not None:
+            celery_task.delay(**kwargs)
+        elif backend == "sync":
+            func(**kwargs)
+        else:
+            _start_local_worker()
+            _local_jobs.put((func, kwargs))
+
+    transaction.on_commit(submit)
+
+
+def enqueue_fan_out(notification_id, roles=None, profile_ids=None):
+    """Run notification fan-out in the background"""
+    submit_job(
+        run_fan_out,
+        celery_task=fan_out_notification_task,
+        notification_id=notification_id,
+        roles=list(roles) if roles else None,
+        profile_ids=list(profile_ids) if profile_ids else None,
+    )
+
+
+def enqueue_email_delivery():
+    """Deliver queued emails in the background"""
+    submit_job(run_email_delivery, celery_task=deliver_queued_emails_task)
+
+
+def wait_for_local_jobs():
+    """Block until the local worker has drained its queue (used by tests and commands)"""
+    _local_jobs.join()
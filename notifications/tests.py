@@ -1,3 +1,69 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from notifications.email_outbox import claim_due_emails, deliver_queued_emails, queue_email
+from notifications.models import OutboundEmail
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                   NOTIFICATION_QUEUE_BACKEND='sync')
+class EmailOutboxTestCase(TestCase):
+    def test_queue_email_does_not_send_inline(self):
+        email = queue_email(['pm@example.com', ''], "Budget alert", "Plain", html_message="<p>HTML</p>")
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.to, ['pm@example.com'])
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_deliver_sends_and_records_status(self):
+        queue_email('pm@example.com', "Budget alert", "Plain", html_message="<p>HTML</p>")
+        queue_email('om@example.com', "Contract expiry", "Plain")
+
+        sent, failed = deliver_queued_emails()
+
+        self.assertEqual((sent, failed), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], "text/html")
+        self.assertFalse(OutboundEmail.objects.exclude(status='sent').exists())
+        self.assertEqual(deliver_queued_emails(), (0, 0))
+
+    @override_settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_send_is_retried_with_backoff_then_given_up(self):
+        email = queue_email('pm@example.com', "Budget alert", "Plain")
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=OSError("connection refused")):
+            self.assertEqual(deliver_queued_emails(), (0, 1))
+            email.refresh_from_db()
+            self.assertEqual((email.status, email.attempts), ('pending', 1))
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            self.assertIn("connection refused", email.last_error)
+
+            # Not due yet, so nothing is picked up
+            self.assertEqual(deliver_queued_emails(), (0, 0))
+
+            OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+            self.assertEqual(deliver_queued_emails(), (0, 1))
+
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts), ('failed', 2))
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_rows_claimed_by_another_worker_are_skipped(self):
+        if connection.features.has_select_for_update_skip_locked:
+            self.skipTest("skip_locked keeps other workers off the selected rows")
+        ours = queue_email('pm@example.com', "Budget alert", "Plain")
+        theirs = queue_email('om@example.com', "Contract expiry", "Plain")
+
+        # Both workers selected both rows; the other one already moved `theirs` on
+        select = mock.MagicMock()
+        select.filter.return_value.order_by.return_value.values_list.return_value.__getitem__.return_value = [
+            ours.pk, theirs.pk
+        ]
+        OutboundEmail.objects.filter(pk=theirs.pk).update(status='sending')
+        with mock.patch.object(OutboundEmail.objects, 'select_for_update', return_value=select):
+            self.assertEqual(claim_due_emails(), [ours])
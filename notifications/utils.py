@@ -1,10 +1,98 @@
+from django.core.cache import cache
+from django.db.models import Q
 from notifications.models import Notification, NotificationStatus
 from authentication.models import UserProfile
 
-def send_notification(user=None, roles=None, message=None, link=None):
+# Unread counts are cached per auth user and invalidated on every status write
+UNREAD_COUNT_CACHE_TIMEOUT = 300
+NOTIFICATION_LIST_LIMIT = 50
+FAN_OUT_BATCH_SIZE = 500
+
+
+def unread_count_cache_key(user_id):
+    return f"notifications:unread_count:{user_id}"
+
+
+def get_unread_count(user):
+    """Number of unread, uncleared notifications for an auth user (cached)"""
+    key = unread_count_cache_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = NotificationStatus.objects.filter(
+            user__user=user,
+            is_read=False,
+            cleared=False
+        ).count()
+        cache.set(key, count, UNREAD_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def invalidate_unread_count(user_ids):
+    """Drop cached unread counts for the given auth user ids"""
+    cache.delete_many([unread_count_cache_key(user_id) for user_id in set(user_ids)])
+
+
+def get_recent_notifications(user, limit=NOTIFICATION_LIST_LIMIT, include_archived=True):
+    """
+    Latest uncleared notifications for an auth user, newest first.
+    Reads through NotificationStatus in one query so each notification carries
+    its read flag as `is_read_for_user`.
+    """
+    statuses = NotificationStatus.objects.filter(
+        user__user=user,
+        cleared=False
+    ).select_related('notification').order_by('-notification__created_at')
+    if not include_archived:
+        statuses = statuses.filter(notification__archived=False)
+
+    notifications = []
+    for status in statuses[:limit]:
+        notification = status.notification
+        notification.is_read_for_user = status.is_read
+        notifications.append(notification)
+    return notifications
+
+
+def fan_out_notification(notification, roles=None, profile_ids=None, defer=False):
+    """
+    Link a notification to every user holding one of `roles` and/or listed in
+    `profile_ids`, inserting NotificationStatus rows with batched bulk_create.
+    Returns the number of recipients. With defer=True the work is handed to
+    the background queue (see tasks.py) and this returns None immediately.
+    """
+    notification_id = getattr(notification, 'pk', notification)
+    if defer:
+        from .tasks import enqueue_fan_out
+        enqueue_fan_out(notification_id, roles=roles, profile_ids=profile_ids)
+        return
+
+    recipient_filter = Q()
+    if roles:
+        recipient_filter |= Q(role__in=roles)
+    if profile_ids:
+        recipient_filter |= Q(pk__in=profile_ids)
+    if not recipient_filter:
+        return 0
+    recipients = dict(UserProfile.objects.filter(recipient_filter).values_list('pk', 'user_id'))
+
+    NotificationStatus.objects.bulk_create(
+        [
+            NotificationStatus(notification_id=notification_id, user_id=profile_id, is_read=False, cleared=False)
+            for profile_id in recipients
+        ],
+        batch_size=FAN_OUT_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    # bulk_create skips signals, so invalidate the cached counts here
+    invalidate_unread_count(recipients.values())
+    return len(recipients)
+
+
+def send_notification(user=None, roles=None, message=None, link=None, defer=False):
     """
     Sends notifications to a specific user and/or roles with a preformatted message.
-    Creates NotificationStatus entries to link notifications to users.
+    Creates NotificationStatus entries to link notifications to users; role
+    fan-out is bulk inserted, and runs in the background when defer=True.
     """
     if user and message:
         # Create notification for specific user
@@ -18,15 +106,6 @@ def send_notification(user=None, roles=None, message=None, link=None):
 
     if roles and message:
         for role in roles:
-            # Create notification with role
+            # Create notification with role, then link every user with this role
             notification = Notification.objects.create(role=role, message=message, link=link)
-
-            # Get all users with this role and create NotificationStatus for each
-            users_with_role = UserProfile.objects.filter(role=role)
-            for user_profile in users_with_role:
-                NotificationStatus.objects.create(
-                    notification=notification,
-                    user=user_profile,
-                    is_read=False,
-                    cleared=False
-                )
+            fan_out_notification(notification, roles=[role], defer=defer)
@@ -3,6 +3,7 @@ from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_POST
 from django.http import JsonResponse
 from .models import Notification, NotificationStatus
+from .utils import get_recent_notifications, get_unread_count, invalidate_unread_count
 
 @login_required
 def notifications_dropdown(request):
@@ -11,17 +12,8 @@ def notifications_dropdown(request):
         return redirect("unauthorized")
 
     # Get notifications for this user via NotificationStatus
-    notifications = Notification.objects.filter(
-        notificationstatus__user=profile,
-        archived=False,
-        notificationstatus__cleared=False
-    ).distinct().order_by('-created_at')
-
-    unread_count = NotificationStatus.objects.filter(
-        user=profile,
-        is_read=False,
-        cleared=False
-    ).count()
+    notifications = get_recent_notifications(request.user, include_archived=False)
+    unread_count = get_unread_count(request.user)
 
     return render(request, "partials/_notifications.html", {
         "notifications": notifications,
@@ -38,6 +30,7 @@ def mark_notifications_read(request):
             user=profile,
             is_read=False
         ).update(is_read=True)
+        invalidate_unread_count([request.user.pk])
     return JsonResponse({"status": "ok"})
 
 
@@ -49,4 +42,5 @@ def clear_notifications(request):
         NotificationStatus.objects.filter(
             user=profile
         ).update(cleared=True)  # archive instead of delete
+        invalidate_unread_count([request.user.pk])
     return JsonResponse({"status": "cleared"})
@@ -195,6 +195,17 @@ SOCIALACCOUNT_PROVIDERS = {
 XERO_CLIENT_ID = os.getenv("XERO_CLIENT_ID")
 XERO_CLIENT_SECRET = os.getenv("XERO_CLIENT_SECRET")
 XERO_REDIRECT_URI = "http://localhost:8000/accounts/xero/login/callback/"
+# Xero API client: base URL (point at a stub server in tests), per-request
+# timeout in seconds and the size of the shared connection pool
+XERO_API_BASE_URL = os.getenv("XERO_API_BASE_URL", "https://api.xero.com")
+XERO_REQUEST_TIMEOUT = float(os.getenv("XERO_REQUEST_TIMEOUT", "20"))
+XERO_POOL_SIZE = int(os.getenv("XERO_POOL_SIZE", "10"))
+# Most pages of a Contacts snapshot fetched per call; longer passes resume on
+# the next call
+XERO_SNAPSHOT_MAX_PAGES = int(os.getenv("XERO_SNAPSHOT_MAX_PAGES", "5"))
+# Xero sync outbox: records per bulk request and retries before giving up
+XERO_BATCH_LIMIT = int(os.getenv("XERO_BATCH_LIMIT", "50"))
+XERO_SYNC_MAX_ATTEMPTS = int(os.getenv("XERO_SYNC_MAX_ATTEMPTS", "5"))
 
 # Email Configuration
 # Use SendGrid for production (Render-compatible)
@@ -229,6 +240,19 @@ else:
     EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
     print("Email configured for development (console backend)")
 
+# Background queue for notification fan-out: "local" (in-process worker thread),
+# "celery" (requires celery + broker) or "sync" (inline)
+NOTIFICATION_QUEUE_BACKEND = os.getenv("NOTIFICATION_QUEUE_BACKEND", "local")
+
+# Seconds a process may reuse its cached cost estimation tables before
+# re-reading them (edits made in other processes show up within this time)
+COST_TABLES_MAX_AGE = int(os.getenv("COST_TABLES_MAX_AGE", "60"))
+
+# Document downloads: "" streams through Django; "x-accel-redirect" (nginx) or
+# "x-sendfile" (Apache) hands the transfer to the web server
+PROTECTED_FILE_OFFLOAD = os.getenv("PROTECTED_FILE_OFFLOAD", "")
+PROTECTED_FILE_ACCEL_PREFIX = os.getenv("PROTECTED_FILE_ACCEL_PREFIX", "/protected/")
+
 # Site URL Configuration (for email links)
 if ENVIRONMENT == "production":
     SITE_URL = os.getenv("SITE_URL", "https://powermason-beta.onrender.com")
@@ -13,6 +13,7 @@ from django.views import View
 from django.db.models import Q
 from authentication.utils.decorators import verified_email_required
 from .models import ProjectProfile, ProjectStaging, Client
+from .search import search_queryset
 # Removed get_user_projects import - will create inline
 import json
 
@@ -376,9 +377,9 @@ def ajax_search_handler(request):
         if query:
             # Search projects
             if type in ['all', 'projects']:
-                projects = ProjectProfile.objects.filter(
-                    project_name__icontains=query
-                )[:5]
+                projects = search_queryset(
+                    ProjectProfile.objects.all(), 'project', query
+                ).order_by('-search_rank', '-created_at')[:5]
                 results['projects'] = [
                     {
                         'id': p.id,
@@ -392,9 +393,9 @@ def ajax_search_handler(request):
             
             # Search clients
             if type in ['all', 'clients']:
-                clients = Client.objects.filter(
-                    company_name__icontains=query
-                )[:5]
+                clients = search_queryset(
+                    Client.objects.all(), 'client', query
+                ).order_by('-search_rank', 'company_name')[:5]
                 results['clients'] = [
                     {
                         'id': c.id,
@@ -408,11 +409,9 @@ def ajax_search_handler(request):
             # Search employees
             if type in ['all', 'employees']:
                 from employees.models import Employee
-                employees = Employee.objects.filter(
-                    first_name__icontains=query
-                ) | Employee.objects.filter(
-                    last_name__icontains=query
-                )[:5]
+                employees = search_queryset(
+                    Employee.objects.all(), 'employee', query
+                ).order_by('-search_rank', 'last_name', 'first_name')[:5]
                 results['employees'] = [
                     {
                         'id': e.id,
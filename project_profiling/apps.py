@@ -10,4 +10,7 @@ class ProjectProfilingConfig(AppConfig):
     name = "project_profiling"
 
     def ready(self):
-        import project_profiling.signals
\ No newline at end of file
+        import project_profiling.signals
+        from django.db.models.signals import post_migrate
+        from .search import install_search_backend_after_migrate
+        post_migrate.connect(install_search_backend_after_migrate, sender=self)
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+BOQ Item Index
+Code, level and division lookups over a project's BOQ items JSON so callers
+don't rescan the whole list for every task or item they resolve
+"""
+
+
+class BOQIndex:
+    """
+    Read-only index over a list of BOQ item dicts.
+
+    Lookups return the original dicts and keep BOQ order, so results are the
+    same as scanning ProjectProfile.boq_items directly.
+    """
+
+    def __init__(self, items):
+        self.items = items or []
+        self._positions = {}
+        for position, item in enumerate(self.items):
+            self._positions.setdefault(item.get('code'), []).append(position)
+        self._levels = {}
+        self._divisions = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def get(self, code):
+        """First BOQ item with the given code, or None"""
+        positions = self._positions.get(code)
+        return self.items[positions[0]] if positions else None
+
+    def position(self, code):
+        """Position of the first item with the given code, or None"""
+        positions = self._positions.get(code)
+        return positions[0] if positions else None
+
+    def items_for_codes(self, codes):
+        """All BOQ items whose code is in `codes`, in BOQ order"""
+        if not codes:
+            return []
+        positions = sorted(
+            position
+            for code in set(codes)
+            for position in self._positions.get(code, ())
+        )
+        return [self.items[position] for position in positions]
+
+    def level_items(self, level):
+        """BOQ items at the given level (e.g. 2 for actual work items), in BOQ order"""
+        if level not in self._levels:
+            self._levels[level] = [item for item in self.items if item.get('level', 0) == level]
+        return self._levels[level]
+
+    def divisions(self, level=None):
+        """
+        Dict of division name -> BOQ items in that division, optionally limited
+        to one level. Divisions are in order of first appearance.
+        """
+        if level not in self._divisions:
+            items = self.items if level is None else self.level_items(level)
+            grouped = {}
+            for item in items:
+                grouped.setdefault(item.get('division', ''), []).append(item)
+            self._divisions[level] = grouped
+        return self._divisions[level]
+
+
+def get_boq_index(project):
+    """
+    BOQIndex for a ProjectProfile, cached on the instance.
+
+    The cache is rebuilt whenever boq_items is reassigned (e.g. refresh_from_db)
+    or changes length, and ProjectProfile.save() drops it.
+    """
+    source = project.boq_items
+    cached = project.__dict__.get('_boq_index')
+    if cached is not None:
+        cached_source, index = cached
+        if cached_source is source and len(index) == len(source or []):
+            return index
+    index = BOQIndex(source)
+    project.__dict__['_boq_index'] = (source, index)
+    return index
+
+
+def invalidate_boq_index(project):
+    """Drop the cached index so the next lookup rebuilds it from boq_items"""
+    project.__dict__.pop('_boq_index', None)
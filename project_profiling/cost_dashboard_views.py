@@ -17,8 +17,20 @@ from authentication.utils.decorators import verified_email_required, role_requir
 from authentication.utils.tokens import get_user_profile, verify_user_profile
 from .models import (
     ProjectProfile, ProjectBudget, FundAllocation, Expense,
-    ProjectCost, SubcontractorExpense, CostCategory
+    ProjectCost, SubcontractorExpense, CostCategory, ProjectCostRollup
 )
+from .portfolio import related_sum
+
+
+def budgets_with_totals(project):
+    """
+    Project budget categories annotated with their active allocations
+    (allocated_total) and recorded expenses (spent_total) in a single query.
+    """
+    return project.budgets.select_related('scope').annotate(
+        allocated_total=related_sum(FundAllocation.objects.filter(is_deleted=False), 'project_budget', 'amount'),
+        spent_total=related_sum(Expense.objects.all(), 'budget_category', 'amount'),
+    )
 
 
 @login_required
@@ -43,37 +55,20 @@ def project_detail_cost_dashboard(request, project_id):
     # 1. BUDGET OVERVIEW
     # ========================================
 
+    # Totals come from the incrementally maintained cost rollup
+    rollup = ProjectCostRollup.for_project(project)
+
     # Total Planned Budget (from ProjectBudget)
-    total_planned = project.budgets.aggregate(
-        total=Sum('planned_amount')
-    )['total'] or Decimal('0')
+    total_planned = rollup.total_planned
 
     # Total Allocated (from FundAllocation)
-    total_allocated = FundAllocation.objects.filter(
-        project_budget__project=project,
-        is_deleted=False
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+    total_allocated = rollup.total_allocated
 
     # Total Actual Spending (from Expense)
-    total_spent = Expense.objects.filter(
-        project=project
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-    # Total Disbursed Amount (includes weekly cost reports + subcontractor payments)
-    from project_profiling.models import WeeklyCostReport
-
-    # Get total from all weekly cost reports (all submitted reports)
-    total_weekly_costs = WeeklyCostReport.objects.filter(
-        project=project
-    ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
-
-    # Get total from subcontractor payments (amount_paid field)
-    total_subcontractor_paid = SubcontractorExpense.objects.filter(
-        project=project
-    ).aggregate(total=Sum('amount_paid'))['total'] or Decimal('0')
+    total_spent = rollup.total_spent
 
     # Total disbursed is weekly costs + subcontractor payments
-    total_disbursed = total_weekly_costs + total_subcontractor_paid
+    total_disbursed = rollup.total_disbursed
 
     # Calculate key metrics using total disbursed
     remaining_budget = total_allocated - total_disbursed
@@ -96,16 +91,9 @@ def project_detail_cost_dashboard(request, project_id):
     # ========================================
 
     categories_data = []
-    for budget in project.budgets.select_related('scope').all():
-        # Calculate allocated amount for this category
-        allocated = budget.allocations.filter(
-            is_deleted=False
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-        # Calculate spent amount for this category
-        spent = budget.expenses.aggregate(
-            total=Sum('amount')
-        )['total'] or Decimal('0')
+    for budget in budgets_with_totals(project):
+        allocated = budget.allocated_total
+        spent = budget.spent_total
 
         # Calculate percentage
         utilization = (spent / allocated * 100) if allocated > 0 else 0
@@ -197,9 +185,7 @@ def project_detail_cost_dashboard(request, project_id):
     # 6. SUBCONTRACTOR & MOBILIZATION COSTS
     # ========================================
 
-    subcontractor_total = SubcontractorExpense.objects.filter(
-        project=project
-    ).aggregate(total=Sum('amount_paid'))['total'] or Decimal('0')
+    subcontractor_total = rollup.total_subcontractor_paid
 
     # Mobilization costs are now handled by ProjectGeneralRequirement
     mobilization_total = Decimal('0')
@@ -321,19 +307,11 @@ def api_project_cost_summary(request, project_id):
 
         # Budget vs Actual by Category
         category_data = []
-        for budget in project.budgets.select_related('scope').all():
-            allocated = budget.allocations.filter(
-                is_deleted=False
-            ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-            spent = budget.expenses.aggregate(
-                total=Sum('amount')
-            )['total'] or Decimal('0')
-
+        for budget in budgets_with_totals(project):
             category_data.append({
                 'name': f"{budget.scope.name} - {budget.get_category_display()}",
-                'allocated': float(allocated),
-                'spent': float(spent),
+                'allocated': float(budget.allocated_total),
+                'spent': float(budget.spent_total),
             })
 
         return JsonResponse({
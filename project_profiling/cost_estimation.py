@@ -4,7 +4,9 @@ Calculates project costs based on project type, lot size, and other factors
 """
 
 from decimal import Decimal
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
 from django.db import models
 from .models import ProjectProfile, ProjectType
 from .cost_configuration import (
@@ -14,6 +16,11 @@ from .cost_configuration import (
     ComplexityMultiplier,
     CostBreakdownTemplate
 )
+from .cost_tables import get_cost_tables
+
+
+# Upper bound on complexity x category x location x lot size cells per batch
+MAX_SCENARIO_CELLS = 200_000
 
 
 class CostEstimationEngine:
@@ -144,6 +151,77 @@ class CostEstimationEngine:
             }
         }
     
+    @classmethod
+    def estimate_scenarios(
+        cls,
+        project_type: str,
+        lot_sizes: Sequence,
+        project_categories: Sequence[str] = ('PRI',),
+        locations: Sequence[str] = ('',),
+        complexity_levels: Sequence[str] = ('mid_range',),
+    ) -> Dict:
+        """
+        Evaluate estimate_project_cost over every combination of the given
+        complexity levels, project categories, locations and lot sizes at once.
+        
+        Each multiplier is looked up once per axis value; the grid itself is
+        float64 NumPy arithmetic, so cell values equal estimate_project_cost's
+        Decimal results to floating point precision.
+        
+        Returns arrays shaped (complexity, category, location, lot size):
+            total_estimated_cost, base_cost, cost_per_sqm
+        plus the per-axis values used ('base_cost_per_sqm', 'multipliers') and
+        the 'breakdown_percentages' each cell's base cost is split by.
+        Lot sizes that are missing or <= 0 give zero cost, like a single estimate.
+        """
+        shape = (len(complexity_levels), len(project_categories), len(locations), len(lot_sizes))
+        if np.prod(shape) > MAX_SCENARIO_CELLS:
+            raise ValueError(f"Too many scenarios ({int(np.prod(shape))}); the limit is {MAX_SCENARIO_CELLS}")
+        
+        sizes = np.array([float(size) if size else 0.0 for size in lot_sizes], dtype=float)
+        valid = sizes > 0
+        
+        size_multipliers = np.ones(len(sizes))
+        tables = cls._cost_tables()
+        if tables and valid.any():
+            size_multipliers[valid] = tables.size_multipliers(sizes[valid])
+        missing = valid & np.isnan(size_multipliers)
+        for index in np.flatnonzero(missing if tables else valid):
+            size_multipliers[index] = float(cls._get_size_multiplier(Decimal(str(lot_sizes[index]))))
+        
+        base_costs = np.array([float(cls._get_base_cost_per_sqm(project_type, level)) for level in complexity_levels])
+        complexity_multipliers = np.array([
+            float(cls.COMPLEXITY_MULTIPLIERS.get(category, Decimal('1.0'))) for category in project_categories
+        ])
+        location_multipliers = np.array([float(cls._get_location_multiplier(location)) for location in locations])
+        
+        percentages = cls._get_breakdown_percentages(project_type)
+        percentage_total = float(sum(Decimal(str(percentage)) for percentage in percentages.values()))
+        
+        # Same order as estimate_project_cost: base * size * complexity * location
+        cost_per_sqm = (
+            base_costs[:, None, None, None]
+            * size_multipliers[None, None, None, :]
+            * complexity_multipliers[None, :, None, None]
+            * location_multipliers[None, None, :, None]
+        )
+        cost_per_sqm = np.where(valid, cost_per_sqm, 0.0)
+        base_cost = sizes * cost_per_sqm
+        
+        return {
+            'shape': shape,
+            'total_estimated_cost': base_cost * percentage_total,
+            'base_cost': base_cost,
+            'cost_per_sqm': cost_per_sqm,
+            'base_cost_per_sqm': base_costs,
+            'multipliers': {
+                'size': np.where(valid, size_multipliers, 0.0),
+                'complexity': complexity_multipliers,
+                'location': location_multipliers,
+            },
+            'breakdown_percentages': {category: float(percentage) for category, percentage in percentages.items()},
+        }
+    
     @classmethod
     def _get_base_cost_per_sqm(cls, project_type: str, complexity_level: str) -> Decimal:
         """Get base cost per square meter for project type and complexity"""
@@ -155,14 +233,11 @@ class CostEstimationEngine:
         
         # If project_type is a string, try to find the ProjectType
         if isinstance(project_type, str):
-            try:
-                from .models import ProjectType
-                project_type_obj = ProjectType.objects.get(name__iexact=project_type, is_active=True)
+            project_type_obj = cls._find_project_type(project_type)
+            if project_type_obj:
                 base_cost = project_type_obj.get_base_cost(complexity_level)
                 if base_cost:
                     return base_cost
-            except ProjectType.DoesNotExist:
-                pass
         
         # Fallback to hardcoded values
         normalized_type = project_type.lower().replace(' ', '_') if isinstance(project_type, str) else 'residential'
@@ -188,25 +263,31 @@ class CostEstimationEngine:
         mapped_type = type_mapping.get(normalized_type, 'residential')
         return cls.BASE_COSTS_PER_SQM.get(mapped_type, {}).get(complexity_level, Decimal('20000'))
     
+    @classmethod
+    def _cost_tables(cls):
+        """Cached configuration tables, or None if they can't be loaded"""
+        try:
+            return get_cost_tables()
+        except Exception:
+            return None
+    
+    @classmethod
+    def _find_project_type(cls, name: str):
+        """Active ProjectType with this name (case-insensitive), or None"""
+        tables = cls._cost_tables()
+        return tables.project_type(name) if tables else None
+    
     @classmethod
     def _get_size_multiplier(cls, lot_size: Decimal) -> Decimal:
         """Get size-based cost multiplier"""
         size_value = float(lot_size)
         
-        # Try to get from database configuration first
-        try:
-            multipliers = SizeMultiplier.objects.filter(is_active=True).order_by('min_size')
-            for multiplier in multipliers:
-                if multiplier.max_size is None:
-                    # No upper limit
-                    if size_value >= float(multiplier.min_size):
-                        return multiplier.multiplier
-                else:
-                    # Has upper limit
-                    if float(multiplier.min_size) <= size_value < float(multiplier.max_size):
-                        return multiplier.multiplier
-        except Exception:
-            pass
+        # Try the database configuration first
+        tables = cls._cost_tables()
+        if tables:
+            multiplier = tables.size_multiplier(size_value)
+            if multiplier is not None:
+                return multiplier
         
         # Fallback to hardcoded values
         for size_category, config in cls.SIZE_MULTIPLIERS.items():
@@ -220,20 +301,12 @@ class CostEstimationEngine:
         """Get location-based cost multiplier"""
         location_upper = location.upper()
         
-        # Try to get from database configuration first
-        try:
-            multipliers = LocationMultiplier.objects.filter(is_active=True).exclude(is_default=True)
-            for multiplier in multipliers:
-                keywords = multiplier.get_keywords_list()
-                if any(keyword.upper() in location_upper for keyword in keywords):
-                    return multiplier.multiplier
-            
-            # Check for default multiplier
-            default_multiplier = LocationMultiplier.objects.filter(is_default=True, is_active=True).first()
-            if default_multiplier:
-                return default_multiplier.multiplier
-        except Exception:
-            pass
+        # Try the database configuration first (keyword matches, then the default)
+        tables = cls._cost_tables()
+        if tables:
+            multiplier = tables.location_multiplier(location_upper)
+            if multiplier is not None:
+                return multiplier
         
         # Fallback to hardcoded values
         if any(region in location_upper for region in ['MANILA', 'QUEZON CITY', 'MAKATI', 'TAGUIG', 'PASAY']):
@@ -252,28 +325,33 @@ class CostEstimationEngine:
     @classmethod
     def _calculate_cost_breakdown(cls, base_cost: Decimal, project_type: str, complexity_level: str = 'mid_range') -> Dict[str, Decimal]:
         """Calculate detailed cost breakdown by category"""
+        percentages = cls._get_breakdown_percentages(project_type)
         
+        breakdown = {}
+        for category, percentage in percentages.items():
+            breakdown[category] = base_cost * Decimal(str(percentage))
+        
+        return breakdown
+    
+    @classmethod
+    def _get_breakdown_percentages(cls, project_type: str) -> Dict[str, Decimal]:
+        """Breakdown percentages (fractions of the base cost) for a project type"""
         # If project_type is a ProjectType instance, use its breakdown
         if hasattr(project_type, 'get_cost_breakdown'):
             percentages = project_type.get_cost_breakdown()
         # If project_type is a string, try to find the ProjectType
         elif isinstance(project_type, str):
-            try:
-                from .models import ProjectType
-                project_type_obj = ProjectType.objects.get(name__iexact=project_type, is_active=True)
+            project_type_obj = cls._find_project_type(project_type)
+            if project_type_obj:
                 percentages = project_type_obj.get_cost_breakdown()
-            except ProjectType.DoesNotExist:
+            else:
                 # Fallback to hardcoded values
                 percentages = cls._get_fallback_breakdown(project_type)
         else:
             # Fallback to hardcoded values
             percentages = cls._get_fallback_breakdown(project_type)
         
-        breakdown = {}
-        for category, percentage in percentages.items():
-            breakdown[category] = base_cost * Decimal(str(percentage))
-        
-        return breakdown
+        return percentages
     
     @classmethod
     def _get_fallback_breakdown(cls, project_type: str) -> Dict[str, float]:
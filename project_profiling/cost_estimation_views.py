@@ -209,6 +209,90 @@ def estimate_project_cost_api(request):
         }, status=500)
 
 
+@login_required
+@verified_email_required
+@role_required('EG', 'OM', 'PM')
+@require_http_methods(["POST"])
+def estimate_cost_scenarios_api(request):
+    """
+    API endpoint for what-if estimation over a grid of scenarios.
+    
+    Takes project_type and lists of lot_sizes, locations, project_categories
+    and complexity_levels; returns the totals as a matrix indexed
+    [complexity_level][project_category][location][lot_size].
+    """
+    verified_profile = get_user_profile(request)
+    if not verified_profile:
+        return JsonResponse({"error": "Authentication required"}, status=403)
+    
+    try:
+        data = json.loads(request.body)
+        
+        project_type = data.get('project_type', 'residential')
+        lot_sizes = data.get('lot_sizes') or []
+        locations = data.get('locations') or ['']
+        project_categories = data.get('project_categories') or ['PRI']
+        complexity_levels = data.get('complexity_levels') or ['mid_range']
+        
+        if not lot_sizes:
+            return JsonResponse({
+                'error': 'At least one lot size is required for cost estimation'
+            }, status=400)
+        if not all(isinstance(axis, list) for axis in (lot_sizes, locations, project_categories, complexity_levels)):
+            return JsonResponse({
+                'error': 'lot_sizes, locations, project_categories and complexity_levels must be lists'
+            }, status=400)
+        
+        try:
+            lot_sizes = [Decimal(str(lot_size)) for lot_size in lot_sizes]
+        except (ValueError, TypeError, ArithmeticError):
+            return JsonResponse({
+                'error': 'Invalid lot size format'
+            }, status=400)
+        
+        # Project types can be given by ID, like the single estimate
+        if str(project_type).isdigit():
+            from .models import ProjectType
+            project_type = ProjectType.objects.filter(id=project_type, is_active=True).first() or project_type
+        
+        try:
+            scenarios = CostEstimationEngine.estimate_scenarios(
+                project_type=project_type,
+                lot_sizes=lot_sizes,
+                project_categories=project_categories,
+                locations=locations,
+                complexity_levels=complexity_levels
+            )
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        
+        return JsonResponse({
+            'success': True,
+            'axes': {
+                'complexity_levels': complexity_levels,
+                'project_categories': project_categories,
+                'locations': locations,
+                'lot_sizes': [str(lot_size) for lot_size in lot_sizes],
+            },
+            'shape': scenarios['shape'],
+            # Amounts in PHP, rounded to centavos
+            'total_estimated_cost': scenarios['total_estimated_cost'].round(2).tolist(),
+            'cost_per_sqm': scenarios['cost_per_sqm'].round(2).tolist(),
+            'base_cost_per_sqm': scenarios['base_cost_per_sqm'].tolist(),
+            'multipliers': {name: values.tolist() for name, values in scenarios['multipliers'].items()},
+            'breakdown_percentages': scenarios['breakdown_percentages'],
+        })
+        
+    except json.JSONDecodeError:
+        return JsonResponse({
+            'error': 'Invalid JSON data'
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'error': f'Estimation failed: {str(e)}'
+        }, status=500)
+
+
 @login_required
 @verified_email_required
 @role_required('EG', 'OM', 'PM')
@@ -16,7 +16,7 @@ from io import BytesIO
 from decimal import Decimal
 
 from authentication.utils.decorators import verified_email_required, role_required
-from .models import ProjectProfile, WeeklyCostReport
+from .models import ProjectProfile, WeeklyCostReport, ProjectCostRollup
 from .cost_tracking_views import aggregate_monthly_data, calculate_totals
 
 # WeasyPrint for PDF generation
@@ -663,25 +663,18 @@ def api_dashboard_budget_summary(request):
         approved_budgets = []
         actual_disbursements = []
 
+        projects = list(projects.only('id', 'project_name'))
+        rollups = ProjectCostRollup.for_projects(projects)
+
         for project in projects:
             project_names.append(project.project_name)
+            rollup = rollups[project.id]
 
             # Get approved budget (sum of all budget categories)
-            from .models import ProjectBudget
-            approved_budget = ProjectBudget.objects.filter(
-                project_scope__project=project
-            ).aggregate(
-                total=Sum('planned_amount')
-            )['total'] or 0
-            approved_budgets.append(float(approved_budget))
+            approved_budgets.append(float(rollup.total_planned))
 
             # Get actual disbursement (sum of all weekly reports)
-            actual_disbursement = WeeklyCostReport.objects.filter(
-                project=project
-            ).aggregate(
-                total=Sum('total_amount')
-            )['total'] or 0
-            actual_disbursements.append(float(actual_disbursement))
+            actual_disbursements.append(float(rollup.total_weekly_costs))
 
         return JsonResponse({
             'success': True,
@@ -1,14 +1,23 @@
 """
 Cost Learning Engine
 Handles learning from actual project BOQ data to build cost intelligence
+
+Learned costs are recency-weighted averages of the approved cost history.
+The weighted sums live in ProjectTypeCostSummary: approving a record newer
+than the rest updates them in O(1) (only the newest nine records change
+weight), and rebuild_cost_summaries() recomputes every project type from one
+query with NumPy.
 """
 
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple
-from django.db import models
+
+import numpy as np
+from django.db import models, transaction
 from django.utils import timezone
 from django.db.models import Avg, Count, Q
-from .models import ProjectType, ProjectTypeCostHistory, ProjectProfile
+from .cost_tables import invalidate_cost_tables
+from .models import ProjectType, ProjectTypeCostHistory, ProjectProfile, ProjectTypeCostSummary
 
 
 class CostLearningEngine:
@@ -38,51 +47,193 @@ class CostLearningEngine:
     def calculate_project_type_costs(project_type: ProjectType) -> Dict[str, Decimal]:
         """
         Calculate average costs from all approved history records
+        (recent projects weighted higher), read from the running summary
         """
-        # Get all approved cost history for this project type
-        history_records = ProjectTypeCostHistory.objects.filter(
-            project_type=project_type,
-            is_approved=True
-        ).order_by('-uploaded_at')
-        
-        if not history_records.exists():
+        summary = CostLearningEngine.get_cost_summary(project_type)
+        weighted_costs = summary.weighted_costs()
+        if not weighted_costs:
             return {}
         
-        # Calculate weighted averages (recent projects weighted higher)
-        total_weight = Decimal('0')
-        weighted_costs = {
-            'low_end': Decimal('0'),
-            'mid_range': Decimal('0'),
-            'high_end': Decimal('0'),
-        }
-        
-        # Calculate weights based on recency (more recent = higher weight)
-        for i, record in enumerate(history_records):
-            # Weight decreases with age (most recent = weight 1.0, older = less)
-            weight = Decimal('1.0') - (Decimal(str(i)) * Decimal('0.1'))
-            weight = max(weight, Decimal('0.1'))  # Minimum weight of 0.1
-            
-            total_weight += weight
-            
-            # Add to complexity level averages
-            complexity = record.complexity_level
-            if complexity in weighted_costs:
-                weighted_costs[complexity] += record.cost_per_sqm * weight
-        
-        # Calculate final averages
-        if total_weight > 0:
-            for complexity in weighted_costs:
-                weighted_costs[complexity] = weighted_costs[complexity] / total_weight
+        CostLearningEngine._apply_learned_costs(project_type, summary)
+        project_type.save()
         
-        # Update ProjectType fields
+        return weighted_costs
+    
+    @staticmethod
+    def _apply_learned_costs(project_type: ProjectType, summary: ProjectTypeCostSummary):
+        """Copy a summary's weighted costs onto the ProjectType fields (not saved)"""
+        weighted_costs = summary.weighted_costs()
         project_type.base_cost_low_end = weighted_costs.get('low_end')
         project_type.base_cost_mid_range = weighted_costs.get('mid_range')
         project_type.base_cost_high_end = weighted_costs.get('high_end')
-        project_type.total_projects_count = history_records.count()
+        project_type.total_projects_count = summary.history_count
         project_type.last_cost_update = timezone.now()
-        project_type.save()
+    
+    @staticmethod
+    def get_cost_summary(project_type) -> ProjectTypeCostSummary:
+        """The project type's running cost summary, building it on first access"""
+        project_type_id = getattr(project_type, 'pk', project_type)
+        summary = ProjectTypeCostSummary.objects.filter(project_type_id=project_type_id).first()
+        if summary is None:
+            CostLearningEngine.rebuild_cost_summaries([project_type_id])
+            summary = ProjectTypeCostSummary.objects.get(project_type_id=project_type_id)
+        return summary
+    
+    @staticmethod
+    def summarize_history(type_ids, complexities, costs):
+        """
+        Recency-weighted sums for history rows sorted by project type, then
+        newest first. Arrays in, {project type id: (count, {level: sum}, recent)}
+        out; sums are weight tenths x centavos, as ProjectTypeCostSummary stores.
+        """
+        type_ids = np.asarray(type_ids, dtype=np.int64)
+        if not len(type_ids):
+            return {}
+        cents = np.rint(np.asarray(costs, dtype=float) * 100).astype(np.int64)
+        levels = ProjectTypeCostSummary.COMPLEXITY_LEVELS
+        level_codes = {level: code for code, level in enumerate(levels)}
+        codes = np.array([level_codes.get(level, -1) for level in complexities], dtype=np.int64)
+        
+        # Rank of each row within its project type (0 = newest)
+        starts = np.flatnonzero(np.r_[True, type_ids[1:] != type_ids[:-1]])
+        counts = np.diff(np.r_[starts, len(type_ids)])
+        group = np.repeat(np.arange(len(starts)), counts)
+        rank = np.arange(len(type_ids)) - starts[group]
+        weights = np.maximum(10 - rank, 1)
+        
+        sums = np.zeros((len(starts), len(levels)), dtype=np.int64)
+        known = codes >= 0
+        np.add.at(sums, (group[known], codes[known]), weights[known] * cents[known])
+        
+        recent = {int(type_ids[start]): [] for start in starts}
+        for index in np.flatnonzero(rank < ProjectTypeCostSummary.RECENT_WINDOW):
+            recent[int(type_ids[index])].append([complexities[index], int(cents[index])])
         
-        return weighted_costs
+        return {
+            int(type_ids[start]): (
+                int(counts[g]),
+                {level: int(sums[g, code]) for code, level in enumerate(levels)},
+                recent[int(type_ids[start])],
+            )
+            for g, start in enumerate(starts)
+        }
+    
+    @staticmethod
+    def rebuild_cost_summaries(project_type_ids=None, create_missing=True) -> int:
+        """
+        Recompute ProjectTypeCostSummary rows from the approved history in one
+        query and one vectorized pass, then upsert them. Rebuilds every project
+        type when `project_type_ids` is None; with create_missing=False only
+        existing summaries are updated (e.g. during cascade deletes).
+        """
+        project_types = ProjectType.objects.all()
+        history = ProjectTypeCostHistory.objects.filter(is_approved=True)
+        if project_type_ids is not None:
+            project_types = project_types.filter(pk__in=list(project_type_ids))
+            history = history.filter(project_type_id__in=list(project_type_ids))
+        type_ids = list(project_types.values_list('pk', flat=True))
+        if not create_missing:
+            type_ids = list(ProjectTypeCostSummary.objects.filter(pk__in=type_ids).values_list('pk', flat=True))
+        if not type_ids:
+            return 0
+        
+        rows = list(history.order_by('project_type_id', '-uploaded_at', '-pk').values_list(
+            'project_type_id', 'pk', 'complexity_level', 'cost_per_sqm', 'uploaded_at'
+        ))
+        columns = list(zip(*rows)) if rows else [(), (), (), (), ()]
+        summarized = CostLearningEngine.summarize_history(columns[0], columns[2], columns[3])
+        
+        # Newest row of each type, and the history ids of its recent window
+        latest = {}
+        recent_ids = {}
+        for type_id, pk, _level, _cost, uploaded_at in rows:
+            latest.setdefault(type_id, uploaded_at)
+            ids = recent_ids.setdefault(type_id, [])
+            if len(ids) < ProjectTypeCostSummary.RECENT_WINDOW:
+                ids.append(pk)
+        
+        now = timezone.now()
+        summaries = []
+        for type_id in type_ids:
+            count, sums, recent = summarized.get(type_id, (0, {}, []))
+            summaries.append(ProjectTypeCostSummary(
+                project_type_id=type_id,
+                history_count=count,
+                weighted_sums=sums,
+                recent=[[pk, *entry] for pk, entry in zip(recent_ids.get(type_id, []), recent)],
+                latest_uploaded_at=latest.get(type_id),
+                updated_at=now,
+            ))
+        
+        columns = ['history_count', 'weighted_sums', 'recent', 'latest_uploaded_at', 'updated_at']
+        if not create_missing:
+            ProjectTypeCostSummary.objects.bulk_update(summaries, columns, batch_size=500)
+        else:
+            ProjectTypeCostSummary.objects.bulk_create(
+                summaries,
+                batch_size=500,
+                update_conflicts=True,
+                unique_fields=['project_type'],
+                update_fields=columns,
+            )
+        return len(summaries)
+    
+    @staticmethod
+    def record_approved_history(history: ProjectTypeCostHistory):
+        """
+        Add one newly approved history record to its project type's summary.
+        O(1) when it is the newest record; otherwise (or without a summary)
+        the type is rebuilt.
+        """
+        cost_per_sqm, uploaded_at = ProjectTypeCostHistory.objects.filter(pk=history.pk).values_list(
+            'cost_per_sqm', 'uploaded_at'
+        ).get()
+        with transaction.atomic():
+            summary = ProjectTypeCostSummary.objects.select_for_update().filter(
+                project_type_id=history.project_type_id
+            ).first()
+            newest = summary is not None and (
+                not summary.recent
+                or (uploaded_at, history.pk) > (summary.latest_uploaded_at, summary.recent[0][0])
+            )
+            if not newest:
+                CostLearningEngine.rebuild_cost_summaries([history.project_type_id])
+                return
+            
+            # Every record in the window moves down one rank and loses 0.1 weight
+            sums = dict(summary.weighted_sums)
+            for _pk, level, cents in summary.recent:
+                if level in sums:
+                    sums[level] -= cents
+            cents = int((cost_per_sqm * 100).to_integral_value())
+            if history.complexity_level in ProjectTypeCostSummary.COMPLEXITY_LEVELS:
+                sums[history.complexity_level] = sums.get(history.complexity_level, 0) + 10 * cents
+            
+            summary.weighted_sums = sums
+            summary.recent = [[history.pk, history.complexity_level, cents], *summary.recent][:ProjectTypeCostSummary.RECENT_WINDOW]
+            summary.history_count += 1
+            summary.latest_uploaded_at = uploaded_at
+            summary.save()
+    
+    @staticmethod
+    def recalculate_all_project_types() -> int:
+        """
+        Rebuild every summary and store the learned costs on every project
+        type with approved history. Returns the number of project types updated.
+        """
+        CostLearningEngine.rebuild_cost_summaries()
+        summaries = ProjectTypeCostSummary.objects.filter(history_count__gt=0).select_related('project_type')
+        project_types = []
+        for summary in summaries:
+            CostLearningEngine._apply_learned_costs(summary.project_type, summary)
+            project_types.append(summary.project_type)
+        ProjectType.objects.bulk_update(project_types, [
+            'base_cost_low_end', 'base_cost_mid_range', 'base_cost_high_end',
+            'total_projects_count', 'last_cost_update',
+        ], batch_size=500)
+        # bulk_update skips the save signals that normally retire the estimation tables
+        invalidate_cost_tables()
+        return len(project_types)
     
     @staticmethod
     def get_cost_estimate(
@@ -0,0 +1,160 @@
+"""
+Cost Table Snapshot
+In-process copy of the cost estimation configuration (size multipliers,
+location multipliers, active project types) so CostEstimationEngine can
+estimate without touching the database.
+
+- Size multipliers are flattened into sorted breakpoints; a lot size is
+  resolved with one bisect, giving the same answer as scanning the rows in
+  min_size order (first matching range wins)
+- Location keywords are compiled into one regex per multiplier, checked in
+  the same order as the table
+- Project types are a {lower-cased name: ProjectType} map
+
+The snapshot is tagged with a version number kept in the cache (like the
+document stats cache); saving or deleting any of those rows bumps it, so the
+saving process rebuilds on its next estimate, as does every other process when
+CACHES is shared (Redis, memcached, database).
+
+Invalidation is best-effort without a shared cache: with the default
+per-process memory cache other workers never see the bump. Every snapshot is
+therefore also rebuilt once it is COST_TABLES_MAX_AGE seconds old, which bounds
+how long a worker can keep estimating from outdated multipliers.
+"""
+
+import re
+import threading
+import time
+from bisect import bisect_right
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+COST_TABLES_VERSION_KEY = "cost_estimation:tables:version"
+DEFAULT_COST_TABLES_MAX_AGE = 60
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+class CostTables:
+    """One immutable build of the multiplier tables"""
+
+    def __init__(self, version, size_rows, location_rows, default_location, project_types):
+        self.version = version
+        self.built_at = time.monotonic()
+        self.size_breaks, self.size_values = self._size_segments(size_rows)
+        self.location_patterns = [
+            (re.compile('|'.join(re.escape(keyword) for keyword in keywords)), multiplier)
+            for keywords, multiplier in location_rows if keywords
+        ]
+        self.default_location = default_location
+        self.project_types = project_types
+
+    @staticmethod
+    def _size_segments(size_rows):
+        """
+        Sorted breakpoints and the multiplier for each [break, next break)
+        segment (None where no range matches). Every range boundary is a
+        breakpoint, so the first matching row is constant inside a segment.
+        """
+        breaks = sorted({bound for min_size, max_size, _multiplier in size_rows
+                         for bound in (min_size, max_size) if bound is not None})
+        values = []
+        for point in breaks:
+            match = None
+            for min_size, max_size, multiplier in size_rows:
+                if min_size <= point and (max_size is None or point < max_size):
+                    match = multiplier
+                    break
+            values.append(match)
+        return breaks, values
+
+    def size_multiplier(self, size_value):
+        """Configured multiplier for a lot size, or None when no range matches"""
+        index = bisect_right(self.size_breaks, size_value) - 1
+        return self.size_values[index] if index >= 0 else None
+
+    def size_multipliers(self, size_values):
+        """size_multiplier() for an array of lot sizes (NaN where no range matches)"""
+        if not self.size_breaks:
+            return np.full(len(size_values), np.nan)
+        values = np.array([np.nan if value is None else float(value) for value in self.size_values])
+        indexes = np.searchsorted(self.size_breaks, size_values, side='right') - 1
+        return np.where(indexes >= 0, values[np.maximum(indexes, 0)], np.nan)
+
+    def location_multiplier(self, location_upper):
+        """Configured multiplier for an upper-cased location, or None"""
+        for pattern, multiplier in self.location_patterns:
+            if pattern.search(location_upper):
+                return multiplier
+        return self.default_location
+
+    def project_type(self, name):
+        return self.project_types.get(name.lower())
+
+    def is_current(self, version):
+        max_age = getattr(settings, 'COST_TABLES_MAX_AGE', DEFAULT_COST_TABLES_MAX_AGE)
+        return self.version == version and time.monotonic() - self.built_at < max_age
+
+
+def _tables_version():
+    version = cache.get(COST_TABLES_VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(COST_TABLES_VERSION_KEY, version, None)
+    return version
+
+
+def invalidate_cost_tables():
+    """
+    Make processes sharing the cache rebuild their snapshot on the next
+    estimate. Best-effort: processes on another cache only catch up when their
+    snapshot reaches COST_TABLES_MAX_AGE.
+    """
+    try:
+        cache.incr(COST_TABLES_VERSION_KEY)
+    except ValueError:
+        cache.add(COST_TABLES_VERSION_KEY, 1, None)
+
+
+def build_cost_tables(version):
+    """Read the configuration tables (three queries)"""
+    from .cost_configuration import LocationMultiplier, SizeMultiplier
+    from .models import ProjectType
+
+    size_rows = [
+        (float(row.min_size), float(row.max_size) if row.max_size is not None else None, row.multiplier)
+        for row in SizeMultiplier.objects.filter(is_active=True).order_by('min_size')
+    ]
+
+    location_rows = []
+    default_location = None
+    for row in LocationMultiplier.objects.filter(is_active=True):
+        if row.is_default:
+            # Meta ordering puts defaults first; the first one is used
+            if default_location is None:
+                default_location = row.multiplier
+        else:
+            location_rows.append(([keyword.upper() for keyword in row.get_keywords_list()], row.multiplier))
+
+    project_types = {}
+    for project_type in ProjectType.objects.filter(is_active=True).order_by('name'):
+        project_types.setdefault(project_type.name.lower(), project_type)
+
+    return CostTables(version, size_rows, location_rows, default_location, project_types)
+
+
+def get_cost_tables():
+    """The current snapshot, rebuilt when the tables have changed or it has expired"""
+    global _snapshot
+    version = _tables_version()
+    snapshot = _snapshot
+    if snapshot is None or not snapshot.is_current(version):
+        with _snapshot_lock:
+            snapshot = _snapshot
+            if snapshot is None or not snapshot.is_current(version):
+                snapshot = build_cost_tables(version)
+                _snapshot = snapshot
+    return snapshot
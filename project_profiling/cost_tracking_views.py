@@ -9,19 +9,22 @@ from django.views.decorators.http import require_http_methods
 from django.http import JsonResponse, HttpResponse
 from django.db.models import Sum
 from django.utils.timezone import localtime
-from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.conf import settings
 from decimal import Decimal
+import logging
 
 from authentication.utils.decorators import verified_email_required, role_required
 from authentication.utils.tokens import get_user_profile, verify_user_profile
 from authentication.models import UserProfile
 from notifications.utils import send_notification
+from notifications.email_outbox import queue_email
 from .models import (
-    ProjectProfile, SubcontractorExpense, SubcontractorPayment
+    ProjectProfile, SubcontractorExpense, SubcontractorPayment, ProjectCostRollup
 )
 
+logger = logging.getLogger(__name__)
+
 
 # ========================================
 # SUBCONTRACTOR MANAGEMENT
@@ -595,9 +598,7 @@ def check_and_notify_budget_overrun(project, new_report):
     """
     try:
         # Get total disbursed amount including the new report
-        total_disbursed = WeeklyCostReport.objects.filter(
-            project=project
-        ).aggregate(total=Sum('total_amount'))['total'] or Decimal('0')
+        total_disbursed = ProjectCostRollup.for_project(project).total_weekly_costs
 
         # Get approved budget
         approved_budget = project.approved_budget or Decimal('0')
@@ -628,7 +629,8 @@ def check_and_notify_budget_overrun(project, new_report):
                 send_notification(
                     roles=['OM', 'EG'],
                     message=message,
-                    link=link
+                    link=link,
+                    defer=True
                 )
 
                 # Send email notification to OM and EG users
@@ -664,7 +666,8 @@ def check_and_notify_budget_overrun(project, new_report):
                 send_notification(
                     roles=['OM', 'EG'],
                     message=message,
-                    link=link
+                    link=link,
+                    defer=True
                 )
 
                 # Send email notification to OM and EG users
@@ -859,16 +862,8 @@ This is an automated notification from PowerMason Cost Tracking System
         recipient_emails = [user.user.email for user in recipients if user.user.email]
 
         if recipient_emails:
-            email = EmailMultiAlternatives(
-                subject=subject,
-                body=text_content,
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=recipient_emails,
-            )
-            email.attach_alternative(html_content, "text/html")
-            email.send(fail_silently=True)
-
-            print(f"Budget {notification_type} email sent to {len(recipient_emails)} recipients: {', '.join(recipient_emails)}")
+            queue_email(recipient_emails, subject, text_content, html_message=html_content)
+            logger.info("Budget %s email queued for %s recipients", notification_type, len(recipient_emails))
         else:
             print(f"No valid email addresses found for roles {roles}")
 
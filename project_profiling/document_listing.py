@@ -0,0 +1,163 @@
+"""
+Document Listing
+Keyset pagination and field selection for the document library API.
+
+Pages are ordered newest first on (uploaded_at, id) and each page continues
+from an opaque cursor instead of an OFFSET, so fetching page 1,000 costs the
+same index seek as page 1. Only the columns behind the requested fields are
+selected.
+"""
+
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+from django.db.models.fields.json import KeyTextTransform
+from django.utils.timezone import localtime
+
+from .models import ProjectDocument
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+DOCUMENT_TYPE_LABELS = dict(ProjectDocument.DOCUMENT_TYPES)
+PROJECT_STAGE_LABELS = dict(ProjectDocument.PROJECT_STAGES)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def format_file_size(size):
+    """Human-readable file size, e.g. "1.5 MB" """
+    size = size or 0
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f} MB"
+    elif size >= 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size} Bytes"
+
+
+def format_uploaded_at(value):
+    return localtime(value).strftime('%b %d, %Y %I:%M %p')
+
+
+def file_extension(name):
+    return name.split('.')[-1] if name and '.' in name else ''
+
+
+def _uploader_name(doc):
+    # Same fallback order as UserProfile.full_name
+    if not doc.uploaded_by:
+        return 'Unknown'
+    return doc.uploaded_by.full_name
+
+
+def _project_name(doc):
+    if doc.project_id:
+        return doc.project.project_name
+    elif doc.project_staging_id:
+        return f"{doc.staging_project_name or 'Unnamed'} (Pending)"
+    return 'N/A'
+
+
+# Output field -> (model columns it needs, formatter)
+DOCUMENT_FIELDS = {
+    'id': (('id',), lambda doc: doc.id),
+    'title': (('title',), lambda doc: doc.title),
+    'description': (('description',), lambda doc: doc.description),
+    'document_type': (('document_type',), lambda doc: doc.document_type),
+    'document_type_display': (('document_type',), lambda doc: DOCUMENT_TYPE_LABELS.get(doc.document_type, doc.document_type)),
+    'project_stage': (('project_stage',), lambda doc: doc.project_stage),
+    'project_stage_display': (('project_stage',), lambda doc: PROJECT_STAGE_LABELS.get(doc.project_stage, doc.project_stage)),
+    'project_name': (('project__project_name', 'project_staging'), _project_name),
+    'version': (('version',), lambda doc: doc.version),
+    'file_size': (('file_size',), lambda doc: format_file_size(doc.file_size)),
+    'file_extension': (('file',), lambda doc: file_extension(doc.file.name) if doc.file else ''),
+    'uploaded_by': (
+        ('uploaded_by__user__first_name', 'uploaded_by__user__last_name', 'uploaded_by__user__email'),
+        _uploader_name,
+    ),
+    'uploaded_at': (('uploaded_at',), lambda doc: format_uploaded_at(doc.uploaded_at)),
+    'tags': (('tags',), lambda doc: doc.tags or ''),
+    'is_archived': (('is_archived',), lambda doc: doc.is_archived),
+}
+
+
+def parse_fields(value):
+    """
+    Requested fields from a comma-separated `fields` parameter, in
+    DOCUMENT_FIELDS order. Unknown names are ignored; empty means all fields.
+    """
+    requested = {name.strip() for name in (value or '').split(',') if name.strip()}
+    fields = [name for name in DOCUMENT_FIELDS if name in requested]
+    return fields or list(DOCUMENT_FIELDS)
+
+
+def parse_page_size(value):
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def encode_cursor(uploaded_at, pk):
+    raw = f"{uploaded_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(uploaded_at, id) from a cursor made by encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        uploaded_at, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(uploaded_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def paginate_documents(documents, fields, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    One page of a filtered ProjectDocument queryset as dicts of `fields`.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+
+    Raises:
+        InvalidCursor: The cursor could not be decoded
+    """
+    columns = {'id', 'uploaded_at'}
+    for name in fields:
+        columns.update(DOCUMENT_FIELDS[name][0])
+
+    related = []
+    if 'project_name' in fields:
+        related.append('project')
+        documents = documents.annotate(
+            staging_project_name=KeyTextTransform('project_name', 'project_staging__project_data')
+        )
+    if 'uploaded_by' in fields:
+        related.append('uploaded_by__user')
+
+    documents = documents.select_related(None)
+    if related:
+        documents = documents.select_related(*related)
+    documents = documents.only(*columns).order_by('-uploaded_at', '-id')
+
+    if cursor:
+        uploaded_at, pk = decode_cursor(cursor)
+        documents = documents.filter(
+            Q(uploaded_at__lt=uploaded_at) | Q(uploaded_at=uploaded_at, id__lt=pk)
+        )
+
+    page = list(documents[:page_size + 1])
+    has_more = len(page) > page_size
+    page = page[:page_size]
+
+    rows = [
+        {name: DOCUMENT_FIELDS[name][1](doc) for name in fields}
+        for doc in page
+    ]
+    next_cursor = encode_cursor(page[-1].uploaded_at, page[-1].id) if has_more else None
+    return rows, next_cursor
@@ -0,0 +1,127 @@
+"""
+Document Statistics
+Document library totals computed with conditional aggregates and cached per
+role scope (all documents for EG/OM, a PM's own projects for PM).
+
+Every cached entry is keyed on a shared generation number, so one
+invalidate_document_stats() call (on upload, archive, restore or delete, and on
+project changes to the contract, permit or BOQ) retires the cached stats of
+every role at once. Without a shared cache other processes don't see the bump,
+so the generation itself expires after DOCUMENT_STATS_VERSION_TIMEOUT and is
+reseeded with a new value, bounding how long they serve stale cards.
+"""
+
+import time
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+
+from .models import ProjectDocument, ProjectProfile, SupplierQuotation
+
+DOCUMENT_STATS_CACHE_TIMEOUT = 300
+DOCUMENT_STATS_VERSION_KEY = "documents:stats:version"
+DOCUMENT_STATS_VERSION_TIMEOUT = 60
+# ProjectProfile fields counted in the stats
+DOCUMENT_STATS_PROJECT_FIELDS = {'contract_agreement', 'permits_licenses', 'boq_items', 'project_manager'}
+
+
+def _new_stats_version():
+    # Time-based so a reseeded generation never matches entries cached under an earlier one
+    return time.time_ns() // 1000
+
+
+def _stats_version():
+    version = cache.get(DOCUMENT_STATS_VERSION_KEY)
+    if version is None:
+        version = _new_stats_version()
+        if not cache.add(DOCUMENT_STATS_VERSION_KEY, version, DOCUMENT_STATS_VERSION_TIMEOUT):
+            version = cache.get(DOCUMENT_STATS_VERSION_KEY, version)
+    return version
+
+
+def document_stats_cache_key(user_profile):
+    scope = f"PM:{user_profile.pk}" if user_profile.role == 'PM' else user_profile.role
+    return f"documents:stats:{_stats_version()}:{scope}"
+
+
+def invalidate_document_stats():
+    """Retire every cached stats entry"""
+    try:
+        cache.incr(DOCUMENT_STATS_VERSION_KEY)
+    except ValueError:
+        # No version stored yet, so nothing has been cached under it either
+        cache.add(DOCUMENT_STATS_VERSION_KEY, _new_stats_version(), DOCUMENT_STATS_VERSION_TIMEOUT)
+
+
+def format_total_size(size_bytes):
+    total_size_mb = size_bytes / (1024 * 1024)
+    if total_size_mb >= 1000:
+        return f"{total_size_mb / 1024:.1f} GB"
+    return f"{total_size_mb:.1f} MB"
+
+
+def compute_document_stats(user_profile):
+    """Stats for the document library cards, in three aggregate queries"""
+    if user_profile.role in ['EG', 'OM']:
+        documents = ProjectDocument.objects.all()
+        projects = ProjectProfile.objects.all()
+        quotations = SupplierQuotation.objects.filter(status='APPROVED')
+    elif user_profile.role == 'PM':
+        documents = ProjectDocument.objects.filter(
+            Q(project__project_manager=user_profile) |
+            Q(project_staging__created_by=user_profile)
+        )
+        projects = ProjectProfile.objects.filter(project_manager=user_profile)
+        quotations = SupplierQuotation.objects.filter(
+            status='APPROVED',
+            project_type='profile',
+            project_id__in=projects.values('id')
+        )
+    else:
+        documents = ProjectDocument.objects.none()
+        projects = ProjectProfile.objects.none()
+        quotations = SupplierQuotation.objects.none()
+
+    # Library documents: every type count and the total size in one pass
+    document_totals = documents.order_by().aggregate(
+        total=Count('pk'),
+        contracts=Count('pk', filter=Q(document_type='CONTRACT')),
+        reports=Count('pk', filter=Q(document_type='REPORT')),
+        quotations=Count('pk', filter=Q(document_type='QUOTATION')),
+        size=Sum('file_size'),
+    )
+
+    # Old-system contract/permit files stored on the project, and project BOQs
+    old_system = (
+        (Q(contract_agreement__isnull=False) | Q(permits_licenses__isnull=False)) &
+        ~(Q(contract_agreement='') | Q(permits_licenses=''))
+    )
+    project_totals = projects.order_by().aggregate(
+        old_contracts=Count('pk', filter=old_system & Q(contract_agreement__isnull=False) & ~Q(contract_agreement='')),
+        old_permits=Count('pk', filter=old_system & Q(permits_licenses__isnull=False) & ~Q(permits_licenses='')),
+        boq=Count('pk', filter=Q(boq_items__isnull=False) & ~Q(boq_items={})),
+    )
+
+    approved_quotations_count = quotations.count()
+
+    return {
+        'total_documents': (
+            document_totals['total'] + project_totals['old_contracts'] + project_totals['old_permits'] +
+            project_totals['boq'] + approved_quotations_count
+        ),
+        'contracts': document_totals['contracts'] + project_totals['old_contracts'],
+        'reports': document_totals['reports'],
+        'quotations': document_totals['quotations'] + approved_quotations_count,
+        'boq_documents': project_totals['boq'],
+        'total_size': format_total_size(document_totals['size'] or 0),
+    }
+
+
+def get_document_stats(user_profile):
+    """Document library stats for a user's role scope (cached)"""
+    key = document_stats_cache_key(user_profile)
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_document_stats(user_profile)
+        cache.set(key, stats, DOCUMENT_STATS_CACHE_TIMEOUT)
+    return stats
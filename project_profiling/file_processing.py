@@ -5,6 +5,8 @@ Handles PDF and Excel file parsing for project data extraction
 
 import os
 import json
+import re
+import numpy as np
 import pandas as pd
 from typing import Dict, List, Any, Optional, Tuple
 from django.core.files.uploadedfile import UploadedFile
@@ -601,6 +603,73 @@ def extract_from_standard_template(excel_file) -> Dict[str, Any]:
         }
 
 
+# Suggested role detection for hierarchical BOQ items: role code -> pattern
+# matched against the lower-cased item description
+HIERARCHICAL_ROLE_PATTERNS = {
+    'PM': r'project manager|\bpm\b|project management|project head',
+    'PIC': (r'project in charge|person in charge|\bpic\b|site engineer|supervision|'
+            r'site supervisor|field engineer|construction manager|site manager'),
+    'SO': (r'safety officer|safety engineer|safety supervisor|hse officer|hse engineer|'
+           r'safety coordinator|safety manager|safety specialist|safety inspector'),
+    'QA': (r'quality control|\bqa\b|quality assurance|qc officer|quality engineer|'
+           r'quality supervisor|quality coordinator|qa engineer'),
+    'QO': r'quality officer|\bqo\b|quality inspector|quality checker|quality technician',
+    'FM': (r'foreman|\bfm\b|foreman supervisor|crew leader|team leader|work supervisor|'
+           r'construction foreman|site foreman'),
+    'LB': (r'labor|worker|helper|construction worker|skilled worker|unskilled worker|mason|'
+           r'carpenter|electrician|plumber|painter|welder|operator|equipment operator|machine operator'),
+}
+# "SO" also matches the bare abbreviation when the description mentions safety or an officer
+SAFETY_OFFICER_ABBREVIATION = r'\bso\b'
+SAFETY_OFFICER_CONTEXT = r'safety|officer'
+# Duration-based roles count as one person regardless of the quantity
+ROLE_DURATION_UNITS = r'month|week|day|mo|wk|d'
+
+PERMIT_TASK_KEYWORDS = ['permits', 'licenses', 'clearances', 'documentation', 'compliance']
+PERMIT_ITEM_KEYWORDS = [
+    'permit', 'license', 'clearance', 'inspection', 'fee', 'certificate',
+    'authorization', 'approval', 'registration', 'compliance',
+    'building permit', 'business permit', 'occupancy permit', 'equipment to operate',
+    'mechanical permit', 'estate permit', 'work permit', 'electrical permit',
+    'fire permit', 'safety permit', 'environmental permit', 'zoning permit'
+]
+
+
+def _to_decimal(val) -> Decimal:
+    try:
+        if val is None or (isinstance(val, float) and pd.isna(val)) or (isinstance(val, str) and val.strip() == ''):
+            return Decimal('0')
+        return Decimal(str(val).replace(',', ''))
+    except Exception:
+        return Decimal('0')
+
+
+def _contains_any(values: pd.Series, keywords: List[str]) -> np.ndarray:
+    """Boolean array: which strings contain any of the keywords"""
+    pattern = '|'.join(re.escape(keyword) for keyword in keywords)
+    return values.str.contains(pattern, regex=True).to_numpy(dtype=bool)
+
+
+def _hierarchy_levels(level_values: pd.Series, dot_counts: pd.Series) -> np.ndarray:
+    """
+    Level column as ints: int(value) where it converts, otherwise the number
+    of dots in the code
+    """
+    fallback = dot_counts.to_numpy(dtype=np.int64)
+    if pd.api.types.is_numeric_dtype(level_values) and not pd.api.types.is_bool_dtype(level_values):
+        numbers = level_values.to_numpy(dtype=float)
+        finite = np.isfinite(numbers)
+        return np.where(finite, np.trunc(np.where(finite, numbers, 0)), fallback).astype(np.int64)
+
+    def to_level(value, dots):
+        try:
+            return int(value) if pd.notna(value) else dots
+        except Exception:
+            return dots
+
+    return np.array([to_level(v, d) for v, d in zip(level_values.tolist(), fallback.tolist())], dtype=np.int64)
+
+
 def extract_from_hierarchical_template(file_bytes: bytes) -> Dict[str, Any]:
     """
     Extract data from the hierarchical BOQ template generated by boq_template.py
@@ -614,15 +683,22 @@ def extract_from_hierarchical_template(file_bytes: bytes) -> Dict[str, Any]:
       - Division rows: Code like "DIV 1", Level = 0, Description is division/scope name
       - Task rows: one dot (e.g., "1.2"), Level = 1
       - Item rows: two dots (e.g., "1.2.1"), Level = 2 — treated as materials unless division is GENERAL REQUIREMENTS
+
+    The workbook is parsed once. Levels, division/task context and the role and
+    permit checks are computed column-wise; only the output dicts are built per item.
     """
     try:
         import io as _io
-        buffer = _io.BytesIO(file_bytes)
+        from pandas.io.parsers import TextParser
+
         # Read raw for cell addressing (header=None)
-        df_cells = pd.read_excel(buffer, header=None, engine='openpyxl')
-        # Read table with headers at row 9 (index 8)
-        buffer.seek(0)
-        df = pd.read_excel(buffer, header=8, engine='openpyxl')
+        df_cells = pd.read_excel(_io.BytesIO(file_bytes), header=None, engine='openpyxl')
+
+        # Table with headers at row 9 (index 8), parsed from the rows already in
+        # memory the same way read_excel(header=8) would type them
+        table_rows = df_cells.iloc[8:].astype(object)
+        table_rows = table_rows.where(table_rows.notna(), '')
+        df = TextParser(table_rows.values.tolist(), header=0, skip_blank_lines=False).read()
 
         # Project info
         project_name = _get_cell_value(df_cells, 'B4')
@@ -630,22 +706,10 @@ def extract_from_hierarchical_template(file_bytes: bytes) -> Dict[str, Any]:
         floor_area_val = _get_cell_value(df_cells, 'B6')
         total_amount_val = _get_cell_value(df_cells, 'F2')
 
-        def to_decimal(val) -> Decimal:
-            try:
-                if val is None or (isinstance(val, float) and pd.isna(val)) or (isinstance(val, str) and val.strip() == ''):
-                    return Decimal('0')
-                return Decimal(str(val).replace(',', ''))
-            except Exception:
-                return Decimal('0')
-
-        lot_size = to_decimal(lot_size_val)
-        floor_area = to_decimal(floor_area_val)
-        total_amount = to_decimal(total_amount_val)
-
-        # Iterate rows to build items with division/task context
-        current_division_name = ''
-        current_division_is_general = False
-        current_task_name = ''
+        lot_size = _to_decimal(lot_size_val)
+        floor_area = _to_decimal(floor_area_val)
+        total_amount = _to_decimal(total_amount_val)
+
         division_subtotals: Dict[str, Decimal] = {}
         boq_items: List[Dict[str, Any]] = []
         suggested_roles: Dict[str, Decimal] = {}
@@ -667,161 +731,114 @@ def extract_from_hierarchical_template(file_bytes: bytes) -> Dict[str, Any]:
                 'error': 'Template missing required Code/Description columns'
             }
 
-        for _, row in df.iterrows():
-            code = str(row.get(code_col, '')).strip()
-            if code == '' or code.lower() == 'nan':
-                continue
-            level_val = row.get(level_col)
-            try:
-                level = int(level_val) if pd.notna(level_val) else code.count('.')
-            except Exception:
-                level = code.count('.')
+        # Keep rows with a code
+        codes = df[code_col].map(str).str.strip()
+        rows = df[(codes != '') & (codes.str.lower() != 'nan')]
+        codes = codes[rows.index]
+
+        def values(col, default=None):
+            if col is None:
+                return [default] * len(rows)
+            return rows[col].tolist()
+
+        if level_col is None:
+            levels = codes.str.count(r'\.').to_numpy(dtype=np.int64)
+        else:
+            levels = _hierarchy_levels(rows[level_col], codes.str.count(r'\.'))
+        is_division = levels == 0
+        is_task = levels == 1
+        is_item = ~(is_division | is_task)
+
+        descriptions = rows[desc_col].map(str).str.strip()
+
+        # Division and task context: carry the latest division/task row forward;
+        # a new division resets the task
+        divisions = descriptions.where(is_division).ffill().fillna('')
+        tasks = descriptions.where(is_task)
+        tasks[is_division] = ''
+        tasks = tasks.ffill().fillna('')
+        is_general = (divisions.str.strip().str.lower() == 'general requirements').to_numpy(dtype=bool)
 
-            description = str(row.get(desc_col, '')).strip()
+        # Suggested roles and required permits, checked over all item descriptions at once
+        desc_lower = descriptions.str.lower()
+        role_matches = {
+            role: desc_lower.str.contains(pattern, regex=True).to_numpy(dtype=bool) & is_item
+            for role, pattern in HIERARCHICAL_ROLE_PATTERNS.items()
+        }
+        role_matches['SO'] |= (
+            desc_lower.str.contains(SAFETY_OFFICER_ABBREVIATION, regex=True).to_numpy(dtype=bool)
+            & desc_lower.str.contains(SAFETY_OFFICER_CONTEXT, regex=True).to_numpy(dtype=bool)
+            & is_item
+        )
+        duration_based = desc_lower.str.contains(ROLE_DURATION_UNITS, regex=True).to_numpy(dtype=bool)
+        has_role = np.logical_or.reduce(list(role_matches.values()))
+
+        is_permit_related = (
+            _contains_any(tasks.str.strip().str.lower(), PERMIT_TASK_KEYWORDS)
+            | _contains_any(desc_lower, PERMIT_ITEM_KEYWORDS)
+        )
+        is_permit = is_item & is_general & is_permit_related & (descriptions != '').to_numpy(dtype=bool)
+
+        amount_values = values(amt_col)
+        code_values = codes.tolist()
+        desc_values = descriptions.tolist()
+        division_values = divisions.tolist()
+        task_values = tasks.tolist()
+        uom_values = values(uom_col, '')
+        qty_values = values(qty_col)
+        unit_values = values(unit_col)
+        level_values = levels.tolist()
+
+        for position in np.flatnonzero(is_division | is_item).tolist():
+            division_name = division_values[position]
 
-            if level == 0:
-                # Division/scope row; code like "DIV 1"
-                current_division_name = description
-                current_division_is_general = (description or '').strip().lower() == 'general requirements'
-                current_task_name = ''
+            if is_division[position]:
                 # Subtotal may already be pre-computed in Amount column on the same row
-                div_amt = to_decimal(row.get(amt_col))
+                div_amt = _to_decimal(amount_values[position])
                 if div_amt > 0:
-                    division_subtotals[current_division_name] = division_subtotals.get(current_division_name, Decimal('0')) + div_amt
-                continue
-
-            if level == 1:
-                current_task_name = description
+                    division_subtotals[division_name] = division_subtotals.get(division_name, Decimal('0')) + div_amt
                 continue
 
             # Level >=2 -> Item
-            uom = str(row.get(uom_col, '') or '')
-            qty = to_decimal(row.get(qty_col))
-            unit_cost = to_decimal(row.get(unit_col))
-            amount = to_decimal(row.get(amt_col))
+            description = desc_values[position]
+            uom = str(uom_values[position] or '')
+            qty = _to_decimal(qty_values[position])
+            unit_cost = _to_decimal(unit_values[position])
+            amount = _to_decimal(amount_values[position])
             if amount == 0 and qty > 0 and unit_cost > 0:
                 amount = qty * unit_cost
-            item = {
-                'division': current_division_name,
-                'task': current_task_name,
-                'code': code,
+            boq_items.append({
+                'division': division_name,
+                'task': task_values[position],
+                'code': code_values[position],
                 'description': description,
                 'uom': uom,
                 'quantity': qty,
                 'unit_cost': unit_cost,
                 'amount': amount,
-                'is_requirement': current_division_is_general,
-                'level': level
-            }
-            boq_items.append(item)
-            
+                'is_requirement': bool(is_general[position]),
+                'level': level_values[position]
+            })
+
             # Add item amount to division subtotal
-            if current_division_name and amount > 0:
-                division_subtotals[current_division_name] = division_subtotals.get(current_division_name, Decimal('0')) + amount
+            if division_name and amount > 0:
+                division_subtotals[division_name] = division_subtotals.get(division_name, Decimal('0')) + amount
 
-            # Suggested roles extraction - scan all divisions for role-related items
-            import re as _re
-            desc_l = (description or '').lower()
-            
-            def add_role(role_code: str, count: Decimal):
+            if has_role[position]:
                 # For duration-based roles (months, weeks, days), use 1 person regardless of duration
                 # For quantity-based roles (persons, people, workers), use the actual quantity
-                if any(time_unit in desc_l for time_unit in ['month', 'week', 'day', 'mo', 'wk', 'd']):
-                    # Duration-based role - always 1 person
-                    suggested_roles[role_code] = suggested_roles.get(role_code, Decimal('0')) + Decimal('1')
-                else:
-                    # Quantity-based role - use the quantity or default to 1
-                    suggested_roles[role_code] = suggested_roles.get(role_code, Decimal('0')) + (count if count > 0 else Decimal('1'))
-            
-            # Project Manager (PM) - look in any division
-            if ('project manager' in desc_l or _re.search(r'\bpm\b', desc_l) or 
-                'project management' in desc_l or 'project head' in desc_l):
-                add_role('PM', qty)
-            
-            # Project In Charge (PIC) - look in any division
-            if ('project in charge' in desc_l or 'person in charge' in desc_l or _re.search(r'\bpic\b', desc_l) or 
-                'site engineer' in desc_l or 'supervision' in desc_l or 
-                'site supervisor' in desc_l or 'field engineer' in desc_l or
-                'construction manager' in desc_l or 'site manager' in desc_l):
-                add_role('PIC', qty)
-            
-            # Safety Officer (SO) - look in any division (more specific matching)
-            if ('safety officer' in desc_l or
-                'safety engineer' in desc_l or 'safety supervisor' in desc_l or
-                'hse officer' in desc_l or 'hse engineer' in desc_l or
-                'safety coordinator' in desc_l or 'safety manager' in desc_l or
-                'safety specialist' in desc_l or 'safety inspector' in desc_l or
-                (_re.search(r'\bso\b', desc_l) and ('safety' in desc_l or 'officer' in desc_l))):
-                add_role('SO', qty)
-            
-            # Quality Assurance Officer (QA) - look in any division
-            if ('quality control' in desc_l or _re.search(r'\bqa\b', desc_l) or
-                'quality assurance' in desc_l or 'qc officer' in desc_l or
-                'quality engineer' in desc_l or 'quality supervisor' in desc_l or
-                'quality coordinator' in desc_l or 'qa engineer' in desc_l):
-                add_role('QA', qty)
-            
-            # Quality Officer (QO) - look in any division
-            if ('quality officer' in desc_l or _re.search(r'\bqo\b', desc_l) or
-                'quality inspector' in desc_l or 'quality checker' in desc_l or
-                'quality technician' in desc_l):
-                add_role('QO', qty)
-            
-            # Foreman (FM) - look in any division
-            if ('foreman' in desc_l or _re.search(r'\bfm\b', desc_l) or
-                'foreman supervisor' in desc_l or 'crew leader' in desc_l or
-                'team leader' in desc_l or 'work supervisor' in desc_l or
-                'construction foreman' in desc_l or 'site foreman' in desc_l):
-                add_role('FM', qty)
-            
-            # Labor (LB) - look in any division
-            if ('labor' in desc_l or 'worker' in desc_l or 'helper' in desc_l or
-                'construction worker' in desc_l or 'skilled worker' in desc_l or
-                'unskilled worker' in desc_l or 'mason' in desc_l or
-                'carpenter' in desc_l or 'electrician' in desc_l or
-                'plumber' in desc_l or 'painter' in desc_l or
-                'welder' in desc_l or 'operator' in desc_l or
-                'equipment operator' in desc_l or 'machine operator' in desc_l):
-                add_role('LB', qty)
-
-            # Required permits extraction - Updated logic for current data structure
-            # Check if this is a GENERAL REQUIREMENTS item
-            is_general_requirements = current_division_is_general
-            
-            # Check if this is a permit-related task or item
-            task_name_lower = (current_task_name or '').strip().lower()
-            description_lower = (description or '').strip().lower()
-            
-            # Check task name for permit keywords
-            is_permit_task = any(keyword in task_name_lower for keyword in [
-                'permits', 'licenses', 'clearances', 'documentation', 'compliance'
-            ])
-            
-            # Also check description for permit-related keywords
-            is_permit_item = any(keyword in description_lower for keyword in [
-                'permit', 'license', 'clearance', 'inspection', 'fee', 'certificate', 
-                'authorization', 'approval', 'registration', 'compliance',
-                'building permit', 'business permit', 'occupancy permit', 'equipment to operate',
-                'mechanical permit', 'estate permit', 'work permit', 'electrical permit',
-                'fire permit', 'safety permit', 'environmental permit', 'zoning permit'
-            ])
-            
-            # Combine both checks
-            is_permit_related = is_permit_task or is_permit_item
-            
-            # Debug logging for permit detection
-            if is_general_requirements:
-                print(f"DEBUG: Division: {current_division_name}, Task: {current_task_name}, Is General: {is_general_requirements}, Is Permit Task: {is_permit_task}, Is Permit Item: {is_permit_item}, Description: {description}")
-            
-            if is_general_requirements and is_permit_related:
-                if description:
-                    print(f"DEBUG: Adding permit: {description}")
-                    required_permits.append({
-                        'name': description,
-                        'quantity': str(qty),
-                        'uom': uom,
-                        'requires_upload': True
-                    })
+                count = Decimal('1') if duration_based[position] or qty <= 0 else qty
+                for role, matches in role_matches.items():
+                    if matches[position]:
+                        suggested_roles[role] = suggested_roles.get(role, Decimal('0')) + count
+
+            if is_permit[position]:
+                required_permits.append({
+                    'name': description,
+                    'quantity': str(qty),
+                    'uom': uom,
+                    'requires_upload': True
+                })
 
         # Debug: Print division subtotals
         print(f"DEBUG: Division subtotals calculated: {division_subtotals}")
@@ -0,0 +1,168 @@
+"""
+File Serving
+Streams stored files (project documents, supplier quotations) to the client
+without reading them into worker memory, with HTTP Range and conditional GET
+support.
+
+PROTECTED_FILE_OFFLOAD lets the web server send the bytes instead:
+- "" (default): Django streams the file in chunks
+- "x-accel-redirect": nginx internal location; the header value is
+  PROTECTED_FILE_ACCEL_PREFIX + the storage name (e.g. /protected/project_documents/a.pdf)
+- "x-sendfile": Apache/lighttpd mod_xsendfile; the header value is the file's path
+  on disk, so this only works with FileSystemStorage
+"""
+
+import hashlib
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe, quote_etag
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def file_etag(name, size, modified):
+    """Strong ETag for a stored file from its name, size and modification time"""
+    stamp = modified.timestamp() if modified else ''
+    digest = hashlib.md5(f"{name}:{size}:{stamp}".encode(), usedforsecurity=False).hexdigest()
+    return quote_etag(digest)
+
+
+def parse_range_header(header, size):
+    """
+    Parse a single-range "bytes=start-end" header against a file of `size` bytes.
+
+    Returns (start, end) with `end` inclusive, None when the header should be
+    ignored (missing, malformed or multi-range), or False when the range can't
+    be satisfied.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start > end or start >= size:
+        return False
+    return start, min(end, size - 1)
+
+
+def _range_allowed(request, etag, last_modified):
+    """If-Range: only honour the range when the client's copy is still current"""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    if_range_date = parse_http_date_safe(if_range)
+    return if_range_date is not None and last_modified is not None and if_range_date >= int(last_modified.timestamp())
+
+
+def _iter_file_range(file, start, length, chunk_size=STREAM_CHUNK_SIZE):
+    try:
+        file.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = file.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def _offload_response(field_file, content_type):
+    mode = getattr(settings, 'PROTECTED_FILE_OFFLOAD', '').lower()
+    if mode == 'x-accel-redirect':
+        prefix = getattr(settings, 'PROTECTED_FILE_ACCEL_PREFIX', '/protected/')
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + field_file.name.lstrip('/')
+        return response
+    if mode == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = field_file.path
+        return response
+    return None
+
+
+def serve_stored_file(request, field_file, filename=None, last_modified=None,
+                      content_type=None, as_attachment=True):
+    """
+    Response for a FieldFile that streams it in chunks.
+
+    Args:
+        request: The download request (Range / If-None-Match / If-Modified-Since are honoured)
+        field_file: FieldFile to serve
+        filename: Download name, defaults to the stored file's base name
+        last_modified: Datetime used for Last-Modified and the ETag (e.g. uploaded_at)
+        content_type: Defaults to a guess from the filename
+        as_attachment: Send Content-Disposition: attachment
+
+    Raises:
+        FileNotFoundError: The file is missing from storage
+    """
+    filename = filename or os.path.basename(field_file.name)
+    if content_type is None:
+        content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    # Always the stored size: a cached column (e.g. ProjectDocument.file_size)
+    # can be stale after the file is replaced
+    size = field_file.size
+
+    etag = file_etag(field_file.name, size, last_modified)
+    last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+    if not_modified is not None:
+        return not_modified
+
+    response = _offload_response(field_file, content_type)
+    if response is None:
+        byte_range = None
+        if request.method in ('GET', 'HEAD') and _range_allowed(request, etag, last_modified):
+            byte_range = parse_range_header(request.headers.get('Range'), size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            response['Accept-Ranges'] = 'bytes'
+            return response
+
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                _iter_file_range(field_file.open('rb'), start, length),
+                status=206, content_type=content_type
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(length)
+        else:
+            response = FileResponse(field_file.open('rb'), content_type=content_type)
+            response.block_size = STREAM_CHUNK_SIZE
+            response['Content-Length'] = str(size)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    if last_modified_ts is not None:
+        response['Last-Modified'] = http_date(last_modified_ts)
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    return response
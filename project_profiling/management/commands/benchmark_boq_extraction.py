@@ -0,0 +1,85 @@
+import contextlib
+import io
+import time
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+from openpyxl import Workbook
+
+from project_profiling.file_processing import extract_from_hierarchical_template
+
+DIVISIONS = ["GENERAL REQUIREMENTS", "EARTHWORKS", "CONCRETE WORKS", "MASONRY", "ELECTRICAL WORKS"]
+ITEM_DESCRIPTIONS = [
+    "Project Manager", "Safety officer", "Site foreman", "Building permit fee", "Skilled worker",
+    "Ready-mix concrete 3000 psi", "Rebar 12mm", "CHB 4 inch", "Conduit 20mm", "Excavation by hand",
+]
+
+
+def build_hierarchical_boq(rows):
+    """Workbook in the boq_template.py hierarchical layout with about `rows` table rows"""
+    wb = Workbook()
+    ws = wb.active
+    ws["E2"] = "Total Amount (PHP)"
+    ws["A4"], ws["B4"] = "Project Name", "Benchmark BOQ"
+    ws["A5"], ws["B5"] = "Lot Size (sqm)", 500
+    ws["A6"], ws["B6"] = "Floor Area (sqm)", 120
+    for col, title in enumerate(["Code", "Description", "UOM", "Quantity", "Unit Cost", "Amount", "Level"], start=1):
+        ws.cell(row=9, column=col, value=title)
+
+    row = 10
+    division = 0
+    while row < 10 + rows:
+        division += 1
+        ws.append([f"DIV {division}", DIVISIONS[division % len(DIVISIONS)], None, None, "TOTAL:", None, 0])
+        row += 1
+        for task in range(1, 11):
+            ws.append([f"{division}.{task}", f"Task {task}", None, None, None, None, 1])
+            row += 1
+            for item in range(1, 20):
+                quantity = item * 2
+                unit_cost = 150 + item
+                ws.append([
+                    f"{division}.{task}.{item}",
+                    ITEM_DESCRIPTIONS[item % len(ITEM_DESCRIPTIONS)],
+                    "lot", quantity, unit_cost, quantity * unit_cost, 2,
+                ])
+                row += 1
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = "Benchmark extract_from_hierarchical_template on generated BOQ workbooks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            default="1000,10000",
+            help="Comma-separated BOQ table sizes to measure (default: 1000,10000)",
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options["rows"].split(",") if s.strip()]
+
+        self.stdout.write(f"{'rows':>8} {'items':>8} {'read ms':>10} {'total ms':>10}")
+        for size in sizes:
+            data = build_hierarchical_boq(size)
+
+            start = time.perf_counter()
+            pd.read_excel(io.BytesIO(data), header=None, engine="openpyxl")
+            read_elapsed = time.perf_counter() - start
+
+            # The extractor prints debug summaries; keep them out of the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                result = extract_from_hierarchical_template(data)
+                elapsed = time.perf_counter() - start
+
+            if not result.get("success"):
+                self.stdout.write(self.style.ERROR(f"{size} rows: {result.get('error')}"))
+                continue
+            self.stdout.write(
+                f"{size:>8} {len(result['boq_items']):>8} {read_elapsed * 1000:>10.1f} {elapsed * 1000:>10.1f}"
+            )
@@ -0,0 +1,116 @@
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from project_profiling.cost_learning import CostLearningEngine
+from project_profiling.models import ProjectType, ProjectTypeCostHistory, ProjectTypeCostSummary
+
+COMPLEXITY_LEVELS = ['low_end', 'mid_range', 'high_end']
+
+
+class _Rollback(Exception):
+    """Raised to discard the benchmark fixtures once they have been measured"""
+
+
+def row_by_row_costs(project_type_id):
+    """The previous per-record Decimal recalculation, for comparison"""
+    history_records = ProjectTypeCostHistory.objects.filter(
+        project_type_id=project_type_id, is_approved=True
+    ).order_by('-uploaded_at', '-pk')
+    total_weight = Decimal('0')
+    weighted_costs = {level: Decimal('0') for level in COMPLEXITY_LEVELS}
+    for i, record in enumerate(history_records):
+        weight = max(Decimal('1.0') - (Decimal(str(i)) * Decimal('0.1')), Decimal('0.1'))
+        total_weight += weight
+        if record.complexity_level in weighted_costs:
+            weighted_costs[record.complexity_level] += record.cost_per_sqm * weight
+    return {level: cost / total_weight for level, cost in weighted_costs.items()}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark learned cost recalculation (row-by-row vs vectorized rebuild vs "
+        "incremental updates) on synthetic cost history. All generated data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50000, help="History rows to generate (default: 50000)")
+        parser.add_argument("--types", type=int, default=20, help="Project types to spread them over (default: 20)")
+        parser.add_argument("--updates", type=int, default=100, help="Approved records to add incrementally (default: 100)")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.measure(options["rows"], options["types"], options["updates"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def measure(self, rows, type_count, updates):
+        rng = random.Random(42)
+        project_types = [
+            ProjectType.objects.create(name=f"Benchmark Type {i}", code=f"BT{i}")
+            for i in range(type_count)
+        ]
+        history = []
+        for i in range(rows):
+            lot_size = Decimal(rng.randint(50, 5000))
+            total_cost = Decimal(rng.randint(500_000, 250_000_000)) / 100
+            history.append(ProjectTypeCostHistory(
+                project_type=project_types[i % type_count],
+                lot_size=lot_size,
+                total_cost=total_cost,
+                cost_per_sqm=(total_cost / lot_size).quantize(Decimal('0.01')),
+                complexity_level=rng.choice(COMPLEXITY_LEVELS),
+                is_approved=True,
+            ))
+        ProjectTypeCostHistory.objects.bulk_create(history, batch_size=2000)
+        self.stdout.write(f"{rows} approved history rows over {type_count} project types")
+
+        start = time.perf_counter()
+        expected = {project_type.pk: row_by_row_costs(project_type.pk) for project_type in project_types}
+        row_by_row = time.perf_counter() - start
+        self.stdout.write(f"{'row-by-row recalculation, all types':<42} {row_by_row * 1000:>10.1f} ms")
+
+        start = time.perf_counter()
+        CostLearningEngine.rebuild_cost_summaries([project_type.pk for project_type in project_types])
+        rebuild = time.perf_counter() - start
+        self.stdout.write(f"{'vectorized rebuild, all types':<42} {rebuild * 1000:>10.1f} ms")
+        self.check_summaries(expected)
+
+        # Incremental: each new approved record updates its type's running sums
+        start = time.perf_counter()
+        for i in range(updates):
+            ProjectTypeCostHistory.objects.create(
+                project_type=project_types[i % type_count],
+                lot_size=Decimal('100'),
+                total_cost=Decimal(rng.randint(1_000_000, 5_000_000)),
+                complexity_level=rng.choice(COMPLEXITY_LEVELS),
+                is_approved=True,
+            )
+        incremental = time.perf_counter() - start
+        self.stdout.write(
+            f"{f'incremental, {updates} new records':<42} {incremental * 1000:>10.1f} ms "
+            f"({incremental * 1000 / max(updates, 1):.2f} ms per record, including the insert)"
+        )
+
+        # What each new record used to cost: a full recalculation of its type
+        start = time.perf_counter()
+        row_by_row_costs(project_types[0].pk)
+        one_type = time.perf_counter() - start
+        self.stdout.write(f"{'row-by-row recalculation of one type':<42} {one_type * 1000:>10.1f} ms")
+        self.check_summaries({project_type.pk: row_by_row_costs(project_type.pk) for project_type in project_types})
+
+    def check_summaries(self, expected):
+        summaries = ProjectTypeCostSummary.objects.in_bulk(list(expected))
+        mismatched = [
+            type_id for type_id, costs in expected.items()
+            if summaries[type_id].weighted_costs() != costs
+        ]
+        if mismatched:
+            self.stdout.write(self.style.ERROR(f"Learned costs differ for project types {mismatched}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Learned costs match the row-by-row recalculation."))
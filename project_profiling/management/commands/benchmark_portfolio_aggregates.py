@@ -0,0 +1,104 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from authentication.models import UserProfile
+from authentication.views import dashboard_api
+from project_profiling.models import FundAllocation, ProjectBudget, ProjectProfile, WeeklyCostReport
+from scheduling.models import ProjectScope
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    """Raised to discard the benchmark fixtures once a size has been measured"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark dashboard_api against synthetic portfolios of increasing size. "
+        "All generated data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="10,100,1000,5000",
+            help="Comma-separated project counts to measure (default: 10,100,1000,5000)",
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(s) for s in options["sizes"].split(",") if s.strip()]
+
+        self.stdout.write(f"{'projects':>10} {'queries':>8} {'ms':>10}")
+        query_counts = []
+        for size in sizes:
+            try:
+                with transaction.atomic():
+                    queries, elapsed = self.measure(size)
+                    raise _Rollback
+            except _Rollback:
+                pass
+            query_counts.append(queries)
+            self.stdout.write(f"{size:>10} {queries:>8} {elapsed * 1000:>10.1f}")
+
+        if len(set(query_counts)) == 1:
+            self.stdout.write(self.style.SUCCESS("Query count is flat across portfolio sizes."))
+        else:
+            self.stdout.write(self.style.WARNING(f"Query count varies with portfolio size: {query_counts}"))
+
+    def measure(self, size):
+        user = User.objects.create_user(email="portfolio-bench@example.com", password="bench")
+        UserProfile.objects.create(user=user, role="OM")
+
+        today = date.today()
+        projects = ProjectProfile.objects.bulk_create([
+            ProjectProfile(
+                project_name=f"Benchmark Project {i}",
+                project_source="GC",
+                location="Benchmark Site",
+                start_date=today - timedelta(days=30),
+                target_completion_date=today + timedelta(days=60),
+                approved_budget=Decimal("1000000"),
+                status="OG",
+            )
+            for i in range(size)
+        ])
+        scopes = ProjectScope.objects.bulk_create([
+            ProjectScope(project=project, name="General Requirements", weight=Decimal("100"))
+            for project in projects
+        ])
+        budgets = ProjectBudget.objects.bulk_create([
+            ProjectBudget(project=scope.project, scope=scope, category="MAT", planned_amount=Decimal("500000"))
+            for scope in scopes
+        ])
+        FundAllocation.objects.bulk_create([
+            FundAllocation(project_budget=budget, amount=Decimal("250000"))
+            for budget in budgets
+        ])
+        WeeklyCostReport.objects.bulk_create([
+            WeeklyCostReport(
+                project=project,
+                report_date=today,
+                period_start=today - timedelta(days=6),
+                period_end=today,
+                materials_amount=Decimal("125000"),
+                total_amount=Decimal("125000"),
+            )
+            for project in projects
+        ])
+
+        request = RequestFactory().get("/api/dashboard/")
+        request.user = user
+
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            dashboard_api(request)
+            elapsed = time.perf_counter() - start
+        return len(ctx.captured_queries), elapsed
@@ -0,0 +1,113 @@
+import io
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from project_profiling.utils.progress_excel_reader import ProgressExcelReader
+from project_profiling.utils.progress_template_excel_v2 import ProgressTemplateExcelGeneratorV2
+
+ITEMS_PER_DIVISION = 50
+
+
+def build_filled_progress_sheet(rows, seed=0):
+    """
+    V2 progress template with about `rows` BOQ rows, filled in the way a site
+    engineer returns it: daily amounts plus the TOTAL values Excel caches for
+    the formula columns (openpyxl doesn't evaluate formulas, so they're written
+    as plain numbers here).
+    """
+    rng = random.Random(seed)
+    divisions = []
+    for div_idx in range(1, rows // ITEMS_PER_DIVISION + 2):
+        divisions.append({
+            'name': f"DIVISION {div_idx}",
+            'boq_items': [
+                {
+                    'code': f"{div_idx}.{item_idx}",
+                    'description': f"Work item {div_idx}.{item_idx}",
+                    'quantity': rng.randint(1, 500),
+                    'uom': 'lot',
+                    'approved_amount': rng.randint(1000, 500000),
+                }
+                for item_idx in range(1, ITEMS_PER_DIVISION + 1)
+            ],
+        })
+
+    generator = ProgressTemplateExcelGeneratorV2({
+        'project_id': 1,
+        'project_code': 'GC-BENCH',
+        'project_name': 'Benchmark Project',
+        'week_start_date': '2024-08-12',
+        'week_end_date': '2024-08-18',
+        'divisions': divisions,
+    })
+    wb = generator.generate_template()
+    ws = wb.active
+
+    total_col = 6 + generator.num_date_cols
+    approved = {item['code']: item['approved_amount'] for division in divisions for item in division['boq_items']}
+    grand_total = 0
+    for row in ws.iter_rows(min_row=generator.data_start_row):
+        code = row[0].value
+        if code not in approved:
+            continue
+        # Leave about a third of the rows without progress this week
+        if rng.random() < 0.35:
+            row[total_col - 1].value = None
+            row[total_col].value = 0
+            continue
+        amount = round(approved[code] * rng.uniform(0.01, 0.2), 2)
+        row[5].value = amount
+        row[total_col - 1].value = amount
+        row[total_col].value = amount / approved[code]
+        grand_total += amount
+
+    total_row = ws.max_row
+    ws.cell(row=total_row, column=total_col, value=grand_total)
+    ws.cell(row=3, column=total_col, value=grand_total / sum(approved.values()))
+
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def measure(data, read_only):
+    """Run read_and_validate, returning (result, seconds, peak traced bytes)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = ProgressExcelReader(io.BytesIO(data), read_only=read_only).read_and_validate()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+class Command(BaseCommand):
+    help = "Compare full-load and streaming ProgressExcelReader on a generated progress sheet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help='BOQ rows in the sheet (default: 20000)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        data = build_filled_progress_sheet(options['rows'], seed=options['seed'])
+        self.stdout.write(f"Sheet: {options['rows']} BOQ rows, {len(data) / 1024:.0f} KiB")
+
+        full_result, full_elapsed, full_peak = measure(data, read_only=False)
+        stream_result, stream_elapsed, stream_peak = measure(data, read_only=True)
+
+        self.stdout.write(f"{'mode':<10} {'items':>8} {'seconds':>10} {'peak MiB':>10}")
+        for mode, result, elapsed, peak in (
+            ('full', full_result, full_elapsed, full_peak),
+            ('streaming', stream_result, stream_elapsed, stream_peak),
+        ):
+            self.stdout.write(
+                f"{mode:<10} {len(result['boq_items']):>8} {elapsed:>10.2f} {peak / (1024 * 1024):>10.1f}"
+            )
+
+        if full_result == stream_result:
+            self.stdout.write(self.style.SUCCESS("Results identical"))
+        else:
+            self.stdout.write(self.style.ERROR("Results differ between full and streaming reads"))
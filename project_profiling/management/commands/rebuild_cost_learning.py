@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from project_profiling.cost_learning import CostLearningEngine
+
+
+class Command(BaseCommand):
+    help = "Rebuild the learned cost summaries from approved cost history and update every project type's learned costs"
+
+    def handle(self, *args, **options):
+        updated = CostLearningEngine.recalculate_all_project_types()
+        self.stdout.write(self.style.SUCCESS(f"Updated learned costs for {updated} project type(s)."))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from project_profiling.models import ProjectCostRollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild ProjectCostRollup rows from expenses, allocations, weekly cost reports and subcontractor expenses"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project",
+            type=int,
+            action="append",
+            dest="project_ids",
+            help="Only rebuild the given project id (may be repeated). Rebuilds all projects by default.",
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = ProjectCostRollup.rebuild(options["project_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt cost rollups for {rebuilt} project(s)."))
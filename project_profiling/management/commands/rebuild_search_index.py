@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from project_profiling.search import SEARCH_SOURCES, install_search_backend, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Refill the full-text search table from projects, clients, employees and documents"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kind",
+            action="append",
+            dest="kinds",
+            choices=list(SEARCH_SOURCES),
+            help="Only rebuild the given kind (may be repeated). Rebuilds every kind by default.",
+        )
+
+    def handle(self, *args, **options):
+        install_search_backend(connection)
+        counts = rebuild_search_index(options["kinds"])
+        summary = ", ".join(f"{count} {kind}(s)" for kind, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt search index: {summary}."))
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_profiling', '0030_remove_mobilization_cost_model'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectCostRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_planned', models.DecimalField(decimal_places=2, default=0, help_text='Sum of planned amounts across budget categories', max_digits=15)),
+                ('total_allocated', models.DecimalField(decimal_places=2, default=0, help_text='Sum of active (not soft-deleted) fund allocations', max_digits=15)),
+                ('total_spent', models.DecimalField(decimal_places=2, default=0, help_text='Sum of recorded expenses', max_digits=15)),
+                ('total_weekly_costs', models.DecimalField(decimal_places=2, default=0, help_text='Sum of weekly cost report totals', max_digits=15)),
+                ('total_subcontractor_paid', models.DecimalField(decimal_places=2, default=0, help_text='Sum of amounts paid to subcontractors', max_digits=15)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='cost_rollup', to='project_profiling.projectprofile')),
+            ],
+            options={
+                'verbose_name': 'Project Cost Rollup',
+                'verbose_name_plural': 'Project Cost Rollups',
+            },
+        ),
+    ]
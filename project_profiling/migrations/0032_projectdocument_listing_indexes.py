@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_profiling', '0031_projectcostrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectdocument',
+            index=models.Index(fields=['is_archived', '-uploaded_at', '-id'], name='project_pro_is_arch_8e0f08_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectdocument',
+            index=models.Index(fields=['document_type', 'is_archived', '-uploaded_at', '-id'], name='project_pro_documen_203f5b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectdocument',
+            index=models.Index(fields=['project_stage', 'is_archived', '-uploaded_at', '-id'], name='project_pro_project_8e76ce_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectdocument',
+            index=models.Index(fields=['project', 'is_archived', '-uploaded_at', '-id'], name='project_pro_project_06e832_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectdocument',
+            index=models.Index(fields=['project_staging', 'is_archived', '-uploaded_at', '-id'], name='project_pro_project_4c6b5c_idx'),
+        ),
+    ]
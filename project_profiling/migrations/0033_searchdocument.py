@@ -0,0 +1,62 @@
+from django.db import migrations, models
+
+# Frozen copy of the search text builders in project_profiling.search, so the
+# backfill doesn't change when the live index does. The full-text structures
+# are installed by the post_migrate handler in project_profiling.apps.
+SEARCH_SOURCES = {
+    'project': (('project_profiling', 'ProjectProfile'), ('client',), lambda project: [
+        project.project_name, project.project_id, project.location,
+        project.client.company_name if project.client else None,
+        project.client.contact_name if project.client else None,
+    ]),
+    'client': (('manage_client', 'Client'), (), lambda client: [client.company_name, client.contact_name]),
+    'employee': (('employees', 'Employee'), (), lambda employee: [
+        employee.first_name, employee.last_name, employee.employee_id,
+    ]),
+    'document': (('project_profiling', 'ProjectDocument'), (), lambda document: [
+        document.title, document.description, document.tags,
+    ]),
+}
+
+
+def backfill_search_documents(apps, schema_editor):
+    SearchDocument = apps.get_model('project_profiling', 'SearchDocument')
+    for kind, (model_key, related, builder) in SEARCH_SOURCES.items():
+        try:
+            model = apps.get_model(*model_key)
+        except LookupError:
+            # e.g. an app without migrations; `rebuild_search_index` fills it in later
+            continue
+        batch = []
+        for instance in model._default_manager.select_related(*related).order_by('pk').iterator(chunk_size=1000):
+            body = '\n'.join(str(value) for value in builder(instance) if value)
+            batch.append(SearchDocument(kind=kind, object_id=instance.pk, body=body))
+            if len(batch) >= 1000:
+                SearchDocument.objects.bulk_create(batch)
+                batch = []
+        SearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_profiling', '0032_projectdocument_listing_indexes'),
+        ('manage_client', '0004_client_contract'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('project', 'Project'), ('client', 'Client'), ('employee', 'Employee'), ('document', 'Document')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('body', models.TextField(help_text='Searchable text of the source row')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('kind', 'object_id')},
+            },
+        ),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-16 19:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project_profiling', '0033_searchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectTypeCostSummary',
+            fields=[
+                ('project_type', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='cost_summary', serialize=False, to='project_profiling.projecttype')),
+                ('history_count', models.PositiveIntegerField(default=0, help_text='Approved cost history records')),
+                ('weighted_sums', models.JSONField(default=dict, help_text='{complexity level: sum of weight (tenths) x cost per sqm (centavos)}')),
+                ('recent', models.JSONField(default=list, help_text='[history id, complexity level, cost per sqm in centavos] for the newest records, newest first')),
+                ('latest_uploaded_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Project Type Cost Summary',
+                'verbose_name_plural': 'Project Type Cost Summaries',
+            },
+        ),
+    ]
@@ -593,7 +593,21 @@ class ProjectProfile(models.Model):
             missing.append('Permits & Licenses')
         return missing
 
+    @property
+    def boq_index(self):
+        """Indexed lookups over boq_items (see project_profiling.boq_index)"""
+        from .boq_index import get_boq_index
+        return get_boq_index(self)
+
+    def get_boq_item(self, code):
+        """BOQ item dict with the given code, or None"""
+        return self.boq_index.get(code)
+
     def save(self, *args, **kwargs):
+        # boq_items may have been edited in place; rebuild the index on next use
+        from .boq_index import invalidate_boq_index
+        invalidate_boq_index(self)
+
         # --- Progress logic ---
         # Clamp progress between 0 and 100
         self.progress = max(0, min(self.progress, 100))
@@ -1105,6 +1119,12 @@ class ProjectDocument(models.Model):
             models.Index(fields=['project', 'document_type']),
             models.Index(fields=['project', 'project_stage']),
             models.Index(fields=['is_mandatory', 'is_archived']),
+            # Document library: filter columns followed by the (uploaded_at, id) keyset order
+            models.Index(fields=['is_archived', '-uploaded_at', '-id']),
+            models.Index(fields=['document_type', 'is_archived', '-uploaded_at', '-id']),
+            models.Index(fields=['project_stage', 'is_archived', '-uploaded_at', '-id']),
+            models.Index(fields=['project', 'is_archived', '-uploaded_at', '-id']),
+            models.Index(fields=['project_staging', 'is_archived', '-uploaded_at', '-id']),
         ]
 
     def __str__(self):
@@ -1445,6 +1465,14 @@ class BOQItemProgress(models.Model):
 
     def save(self, *args, **kwargs):
         """Auto-calculate period progress on save"""
+        self.calculate_period_progress()
+        super().save(*args, **kwargs)
+
+    def calculate_period_progress(self):
+        """
+        Derive period progress from cumulative vs previous values.
+        Called by save(); call it directly before bulk_create, which skips save().
+        """
         # Calculate period progress
         self.period_progress_percent = self.cumulative_percent - self.previous_cumulative_percent
         self.period_progress_amount = self.cumulative_amount - self.previous_cumulative_amount
@@ -1453,8 +1481,6 @@ class BOQItemProgress(models.Model):
         if self.cumulative_percent < self.previous_cumulative_percent:
             self.progress_decreased = True
 
-        super().save(*args, **kwargs)
-
     def get_previous_progress(self):
         """Get the most recent approved progress record before this one"""
         previous = BOQItemProgress.objects.filter(
@@ -1639,3 +1665,222 @@ class WeeklyCostReport(models.Model):
         return self.period_start.isocalendar()[1]
 
 
+
+
+class ProjectCostRollup(models.Model):
+    """
+    Denormalized per-project cost totals so cost dashboards can read them in a
+    single row lookup. Kept current incrementally by the signal handlers in
+    signals.py; `rebuild()` (and the rebuild_cost_rollups command) recomputes
+    them from the source tables.
+    """
+    # Rollup column -> (source model name, project lookup, summed field, extra filter)
+    SOURCES = {
+        'total_planned': ('ProjectBudget', 'project', 'planned_amount', {}),
+        'total_allocated': ('FundAllocation', 'project_budget__project', 'amount', {'is_deleted': False}),
+        'total_spent': ('Expense', 'project', 'amount', {}),
+        'total_weekly_costs': ('WeeklyCostReport', 'project', 'total_amount', {}),
+        'total_subcontractor_paid': ('SubcontractorExpense', 'project', 'amount_paid', {}),
+    }
+
+    project = models.OneToOneField(
+        'ProjectProfile',
+        on_delete=models.CASCADE,
+        related_name='cost_rollup'
+    )
+    total_planned = models.DecimalField(
+        max_digits=15, decimal_places=2, default=0,
+        help_text="Sum of planned amounts across budget categories"
+    )
+    total_allocated = models.DecimalField(
+        max_digits=15, decimal_places=2, default=0,
+        help_text="Sum of active (not soft-deleted) fund allocations"
+    )
+    total_spent = models.DecimalField(
+        max_digits=15, decimal_places=2, default=0,
+        help_text="Sum of recorded expenses"
+    )
+    total_weekly_costs = models.DecimalField(
+        max_digits=15, decimal_places=2, default=0,
+        help_text="Sum of weekly cost report totals"
+    )
+    total_subcontractor_paid = models.DecimalField(
+        max_digits=15, decimal_places=2, default=0,
+        help_text="Sum of amounts paid to subcontractors"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Project Cost Rollup"
+        verbose_name_plural = "Project Cost Rollups"
+
+    def __str__(self):
+        return f"Cost rollup for {self.project}"
+
+    @property
+    def total_disbursed(self):
+        """Weekly cost reports plus subcontractor payments"""
+        return self.total_weekly_costs + self.total_subcontractor_paid
+
+    @classmethod
+    def rebuild(cls, project_ids=None):
+        """
+        Recompute rollups from the source tables with one grouped aggregate per
+        source, then upsert them. Rebuilds every project when `project_ids` is None.
+        """
+        projects = ProjectProfile.objects.all()
+        if project_ids is not None:
+            projects = projects.filter(pk__in=project_ids)
+        totals = {pk: {} for pk in projects.values_list('pk', flat=True)}
+        if not totals:
+            return 0
+
+        for column, (model_name, project_path, field, extra) in cls.SOURCES.items():
+            source = apps.get_model('project_profiling', model_name).objects.filter(**extra)
+            if project_ids is not None:
+                source = source.filter(**{f'{project_path}__in': list(totals)})
+            grouped = source.order_by().values(project_path).annotate(total=Sum(field))
+            for row in grouped:
+                if row[project_path] in totals:
+                    totals[row[project_path]][column] = row['total'] or Decimal('0')
+
+        now = timezone.now()
+        cls.objects.bulk_create(
+            [
+                cls(project_id=pk, updated_at=now, **{
+                    column: values.get(column, Decimal('0')) for column in cls.SOURCES
+                })
+                for pk, values in totals.items()
+            ],
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['project'],
+            update_fields=[*cls.SOURCES, 'updated_at'],
+        )
+        return len(totals)
+
+    @classmethod
+    def for_project(cls, project):
+        """Return the project's rollup, building it on first access"""
+        project_id = getattr(project, 'pk', project)
+        rollup = cls.objects.filter(project_id=project_id).first()
+        if rollup is None:
+            cls.rebuild([project_id])
+            rollup = cls.objects.get(project_id=project_id)
+        return rollup
+
+    @classmethod
+    def for_projects(cls, projects):
+        """Return {project_id: rollup} for the given projects, building any that are missing"""
+        project_ids = [getattr(p, 'pk', p) for p in projects]
+        rollups = {r.project_id: r for r in cls.objects.filter(project_id__in=project_ids)}
+        missing = [pk for pk in project_ids if pk not in rollups]
+        if missing:
+            cls.rebuild(missing)
+            rollups.update({r.project_id: r for r in cls.objects.filter(project_id__in=missing)})
+        return rollups
+
+    @classmethod
+    def apply_delta(cls, project_id, create_missing=True, **deltas):
+        """
+        Atomically add `deltas` (column -> Decimal) to a project's rollup.
+        A missing rollup is built from scratch instead, which already includes
+        the change, unless `create_missing` is False (e.g. during cascade deletes).
+        """
+        deltas = {column: delta for column, delta in deltas.items() if delta}
+        if not project_id or not deltas:
+            return
+        updated = cls.objects.filter(project_id=project_id).update(
+            updated_at=timezone.now(),
+            **{column: models.F(column) + delta for column, delta in deltas.items()}
+        )
+        if not updated and create_missing:
+            cls.rebuild([project_id])
+
+
+class SearchDocument(models.Model):
+    """
+    One row of searchable text per project, client, employee or library
+    document. Kept current by the signal handlers in signals.py;
+    project_profiling.search builds the text, installs the database-specific
+    full-text index over `body` and runs the queries (the rebuild_search_index
+    command refills the table from the source models).
+    """
+    KINDS = [
+        ('project', 'Project'),
+        ('client', 'Client'),
+        ('employee', 'Employee'),
+        ('document', 'Document'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KINDS)
+    object_id = models.PositiveBigIntegerField()
+    body = models.TextField(help_text="Searchable text of the source row")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('kind', 'object_id')
+
+    def __str__(self):
+        return f"{self.kind} #{self.object_id}"
+
+
+class ProjectTypeCostSummary(models.Model):
+    """
+    Running recency-weighted cost sums per project type, so learned costs can
+    be updated without re-reading the whole cost history. Kept current by the
+    signal handlers in signals.py; CostLearningEngine.rebuild_cost_summaries()
+    (and the rebuild_cost_learning command) recomputes them.
+
+    History records are weighted by recency rank: the newest 1.0, then 0.9,
+    0.8, ... down to 0.1 from the tenth record on. Weights are stored in
+    tenths and costs in centavos, so the sums are exact integers.
+    """
+    # Records whose weight still changes when a newer one arrives (ranks 0-8)
+    RECENT_WINDOW = 9
+    COMPLEXITY_LEVELS = ('low_end', 'mid_range', 'high_end')
+
+    project_type = models.OneToOneField(
+        ProjectType,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='cost_summary'
+    )
+    history_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Approved cost history records"
+    )
+    weighted_sums = models.JSONField(
+        default=dict,
+        help_text="{complexity level: sum of weight (tenths) x cost per sqm (centavos)}"
+    )
+    recent = models.JSONField(
+        default=list,
+        help_text="[history id, complexity level, cost per sqm in centavos] for the newest records, newest first"
+    )
+    latest_uploaded_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Project Type Cost Summary"
+        verbose_name_plural = "Project Type Cost Summaries"
+
+    def __str__(self):
+        return f"Cost summary for {self.project_type}"
+
+    @staticmethod
+    def total_weight_tenths(count):
+        """Sum of the recency weights of `count` records, in tenths"""
+        if count <= 10:
+            return 10 * count - count * (count - 1) // 2
+        return 55 + (count - 10)
+
+    def weighted_costs(self):
+        """{complexity level: weighted cost per sqm}, as CostLearningEngine stores on the ProjectType"""
+        if not self.history_count:
+            return {}
+        total = Decimal(100 * self.total_weight_tenths(self.history_count))
+        return {
+            level: Decimal(self.weighted_sums.get(level, 0)) / total
+            for level in self.COMPLEXITY_LEVELS
+        }
@@ -0,0 +1,74 @@
+"""
+Portfolio Aggregation
+Computes budget, disbursement and progress figures for a whole set of projects
+in a fixed number of queries, regardless of how many projects are visible
+"""
+
+from decimal import Decimal
+from django.db.models import Count, DecimalField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from .models import FundAllocation, ProjectBudget, WeeklyCostReport
+
+
+MONEY_FIELD = DecimalField(max_digits=15, decimal_places=2)
+
+# Dashboard status buckets -> ProjectProfile.status codes
+STATUS_BUCKETS = {
+    'planned': 'PL',
+    'ongoing': 'OG',
+    'completed': 'CP',
+    'cancelled': 'CN',
+}
+
+
+def related_sum(queryset, parent_path, field):
+    """
+    Correlated subquery returning SUM(field) of `queryset` rows whose
+    `parent_path` points at the outer row, or 0 when there are none.
+    """
+    totals = (
+        queryset
+        .filter(**{parent_path: OuterRef('pk')})
+        .order_by()
+        .values(parent_path)
+        .annotate(total=Sum(field))
+        .values('total')
+    )
+    return Coalesce(Subquery(totals, output_field=MONEY_FIELD), Value(Decimal('0')), output_field=MONEY_FIELD)
+
+
+def with_portfolio_figures(projects):
+    """
+    Annotate a ProjectProfile queryset with the figures the dashboards need:
+
+    - planned_total: sum of ProjectBudget.planned_amount
+    - allocated_total: sum of FundAllocation.amount across the project's budgets
+    - disbursed_total: sum of WeeklyCostReport.total_amount
+
+    Each figure is a grouped subquery, so the whole portfolio is fetched in a
+    single SELECT instead of three aggregates per project.
+    """
+    return projects.annotate(
+        planned_total=related_sum(ProjectBudget.objects.all(), 'project', 'planned_amount'),
+        allocated_total=related_sum(FundAllocation.objects.all(), 'project_budget__project', 'amount'),
+        disbursed_total=related_sum(WeeklyCostReport.objects.all(), 'project', 'total_amount'),
+    )
+
+
+def planned_progress_percent(project, today):
+    """Percentage of the project timeline elapsed as of `today`, clamped to 0-100"""
+    progress = 0
+    if project.start_date and project.target_completion_date:
+        total_days = (project.target_completion_date - project.start_date).days
+        elapsed_days = (today - project.start_date).days
+        if total_days > 0:
+            progress = (elapsed_days / total_days) * 100
+    return max(0, min(100, progress))
+
+
+def portfolio_status_counts(projects):
+    """Count projects per dashboard status bucket with one conditional aggregate"""
+    return projects.order_by().aggregate(**{
+        bucket: Count('pk', filter=Q(status=code))
+        for bucket, code in STATUS_BUCKETS.items()
+    })
@@ -0,0 +1,133 @@
+"""
+Project Listing
+Query helpers for the General Contractor / Direct Client project list pages.
+
+Rendering a page costs a fixed number of queries however many projects
+there are: the approved schedule is a subquery annotation on the project
+query, pending-project managers are fetched in one in_bulk() call, the
+status cards come from one conditional aggregate, and the table itself is
+paginated in the database.
+"""
+
+from django.core.paginator import Paginator
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+
+from authentication.models import UserProfile
+from scheduling.models import ProjectSchedule
+
+from .models import ProjectProfile, ProjectStaging
+from .search import search_queryset
+
+PROJECTS_PAGE_SIZE = 25
+
+STATUS_CHOICES = [
+    ('PL', 'Planned'),
+    ('OG', 'Ongoing'),
+    ('CP', 'Completed'),
+    ('CN', 'Cancelled'),
+]
+
+
+def with_approved_schedule(projects):
+    """
+    Annotate `approved_schedule_id`: the project's active approved schedule
+    (newest upload first, like ProjectSchedule's default ordering) or None.
+    """
+    approved = ProjectSchedule.objects.filter(
+        project=OuterRef('pk'),
+        status="APPROVED",
+        is_active=True
+    ).order_by('-uploaded_at').values('pk')[:1]
+    return projects.annotate(approved_schedule_id=Subquery(approved))
+
+
+def project_status_counts(projects):
+    """{'all': n, 'PL': n, ...} for a project queryset in one aggregate"""
+    return projects.order_by().aggregate(
+        all=Count('pk'),
+        **{code: Count('pk', filter=Q(status=code)) for code, _label in STATUS_CHOICES}
+    )
+
+
+def pending_projects_with_managers(project_source):
+    """
+    Submitted, not yet reviewed staging projects for a source, and
+    {staging id: UserProfile or None} for their chosen project managers.
+    """
+    pending_projects = list(ProjectStaging.objects.filter(
+        status="PL",
+        is_draft=False,
+        project_data__project_source=project_source
+    ).order_by('-submitted_at'))
+
+    manager_ids = {}
+    for pending_project in pending_projects:
+        if pending_project.project_data and isinstance(pending_project.project_data, dict):
+            manager_id = pending_project.project_data.get('project_manager_id')
+            if manager_id:
+                try:
+                    manager_ids[pending_project.id] = int(manager_id)
+                except (TypeError, ValueError):
+                    continue
+
+    managers = UserProfile.objects.select_related('user').in_bulk(set(manager_ids.values())) if manager_ids else {}
+    pending_project_managers = {
+        pending_id: managers.get(manager_id)
+        for pending_id, manager_id in manager_ids.items()
+    }
+    return pending_projects, pending_project_managers
+
+
+def project_list_context(request, project_source, page_size=PROJECTS_PAGE_SIZE):
+    """Template context for a project list page (filters come from request.GET)"""
+    show_archived = request.GET.get('archived') == '1'
+    status_filter = request.GET.get('status', '').strip()
+    search_query = request.GET.get('search', '').strip()
+
+    # Validate status filter
+    if status_filter and status_filter not in dict(STATUS_CHOICES):
+        status_filter = ''
+
+    base_projects = ProjectProfile.objects.filter(
+        archived=show_archived,
+        project_source=project_source
+    )
+
+    projects = base_projects
+    if status_filter:
+        projects = projects.filter(status=status_filter)
+
+    if search_query:
+        projects = search_queryset(projects, 'project', search_query, ranked=False)
+
+    total_budget = projects.order_by().aggregate(total=Sum('approved_budget'))['total'] or 0
+
+    projects = with_approved_schedule(
+        projects.select_related('project_manager__user')
+    ).order_by('-created_at', '-pk')
+
+    page_obj = Paginator(projects, page_size).get_page(request.GET.get('page'))
+
+    pending_projects, pending_project_managers = pending_projects_with_managers(project_source)
+
+    status_counts = project_status_counts(base_projects)
+
+    search_params = request.GET.copy()
+    search_params.pop('page', None)
+
+    return {
+        "projects": page_obj.object_list,
+        "page_obj": page_obj,
+        "is_paginated": page_obj.has_other_pages(),
+        "project_count": page_obj.paginator.count,
+        "search_params": search_params,
+        "pending_projects": pending_projects,
+        "pending_project_managers": pending_project_managers,
+        "project_type": project_source,
+        "show_archived": show_archived,
+        "total_budget": total_budget,
+        "status_filter": status_filter,
+        "search_query": search_query,
+        "status_choices": STATUS_CHOICES,
+        "status_counts": status_counts,
+    }
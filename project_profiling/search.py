@@ -0,0 +1,291 @@
+"""
+Full-Text Search
+Projects, clients, employees and library documents each get one SearchDocument
+row holding their searchable text. Searches run against that table through a
+database-specific full-text index instead of icontains chains over every
+column:
+
+- PostgreSQL: a generated tsvector column with a GIN index (whole words,
+  ranked with ts_rank) plus a pg_trgm GIN index on the text for substring
+  matches (ranked with word_similarity)
+- SQLite: an external-content FTS5 table with the trigram tokenizer, kept in
+  sync by triggers and ranked with bm25 (queries shorter than three characters,
+  and SQLite builds older than 3.34 without the trigram tokenizer, fall back
+  to LIKE)
+- anything else: a LIKE over the search table
+
+search_queryset() adds the match (and optionally the rank) to an existing
+queryset, so callers keep their own permission filters and each search type
+is still a single query.
+
+The full-text structures are (re)created after every migrate by a post_migrate
+handler, so databases built with --run-syncdb or test databases without
+migrations get them too. Until they exist, searches use the LIKE path.
+"""
+
+import logging
+
+from django.apps import apps
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLE = 'project_profiling_searchdocument'
+FTS_TABLE = 'project_profiling_searchdocument_fts'
+REBUILD_BATCH_SIZE = 1000
+# FTS5 trigram tokens are three characters; shorter queries can't use the index
+MIN_TRIGRAM_QUERY_LENGTH = 3
+# The FTS5 trigram tokenizer was added in SQLite 3.34
+MIN_SQLITE_TRIGRAM_VERSION = (3, 34, 0)
+
+# (alias, database name) of connections whose full-text structures exist
+_full_text_ready_databases = set()
+
+
+def _project_text(project):
+    client = project.client
+    return [
+        project.project_name, project.project_id, project.location,
+        client.company_name if client else None,
+        client.contact_name if client else None,
+    ]
+
+
+def _client_text(client):
+    return [client.company_name, client.contact_name]
+
+
+def _employee_text(employee):
+    return [employee.first_name, employee.last_name, employee.employee_id]
+
+
+def _document_text(document):
+    return [document.title, document.description, document.tags]
+
+
+# Search kind -> (model label, fields the text is built from, select_related, text builder)
+SEARCH_SOURCES = {
+    'project': ('project_profiling.ProjectProfile', {'project_name', 'project_id', 'location', 'client'}, ('client',), _project_text),
+    'client': ('manage_client.Client', {'company_name', 'contact_name'}, (), _client_text),
+    'employee': ('employees.Employee', {'first_name', 'last_name', 'employee_id'}, (), _employee_text),
+    'document': ('project_profiling.ProjectDocument', {'title', 'description', 'tags'}, (), _document_text),
+}
+
+
+def search_kind_for_model(model):
+    label = model._meta.label
+    for kind, (source_label, _fields, _related, _builder) in SEARCH_SOURCES.items():
+        if source_label == label:
+            return kind
+    return None
+
+
+def search_text(kind, instance):
+    """Searchable text for one source row"""
+    builder = SEARCH_SOURCES[kind][3]
+    return '\n'.join(str(value) for value in builder(instance) if value)
+
+
+def needs_reindex(kind, update_fields):
+    """False when a save only touched fields that aren't part of the search text"""
+    if not update_fields:
+        return True
+    return bool(SEARCH_SOURCES[kind][1] & set(update_fields))
+
+
+def index_instance(kind, instance):
+    """Create or refresh the search row for a saved source row"""
+    from .models import SearchDocument
+    SearchDocument.objects.update_or_create(
+        kind=kind, object_id=instance.pk,
+        defaults={'body': search_text(kind, instance)}
+    )
+
+
+def remove_instance(kind, pk):
+    from .models import SearchDocument
+    SearchDocument.objects.filter(kind=kind, object_id=pk).delete()
+
+
+def reindex(kind, queryset, search_model=None, batch_size=REBUILD_BATCH_SIZE):
+    """Replace the search rows of every object in `queryset` (batched)"""
+    if search_model is None:
+        from .models import SearchDocument as search_model
+
+    related = SEARCH_SOURCES[kind][2]
+    if related:
+        queryset = queryset.select_related(*related)
+
+    batch = []
+    total = 0
+
+    def flush():
+        search_model.objects.filter(kind=kind, object_id__in=[row.object_id for row in batch]).delete()
+        search_model.objects.bulk_create(batch)
+
+    for instance in queryset.order_by('pk').iterator(chunk_size=batch_size):
+        batch.append(search_model(kind=kind, object_id=instance.pk, body=search_text(kind, instance)))
+        if len(batch) >= batch_size:
+            flush()
+            total += len(batch)
+            batch = []
+    if batch:
+        flush()
+        total += len(batch)
+    return total
+
+
+def rebuild_search_index(kinds=None, get_model=apps.get_model):
+    """
+    Refill the search table from the source models. `get_model` lets data
+    migrations pass their historical app registry.
+
+    Returns {kind: rows indexed}.
+    """
+    search_model = get_model('project_profiling', 'SearchDocument')
+    counts = {}
+    for kind in kinds or SEARCH_SOURCES:
+        try:
+            model = get_model(*SEARCH_SOURCES[kind][0].split('.'))
+        except LookupError:
+            # e.g. an app without migrations isn't in a migration's app registry
+            logger.warning("Skipping %s search rows: %s is not available", kind, SEARCH_SOURCES[kind][0])
+            continue
+        search_model.objects.filter(kind=kind).delete()
+        counts[kind] = reindex(kind, model._default_manager.all(), search_model=search_model)
+    return counts
+
+
+def install_search_backend(connection):
+    """Create the full-text structures for the connection's database (idempotent)"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                f"ALTER TABLE {SEARCH_TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS (to_tsvector('simple', coalesce(body, ''))) STORED"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_vector_idx ON {SEARCH_TABLE} USING GIN (search_vector)"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_body_trgm_idx ON {SEARCH_TABLE} USING GIN (body gin_trgm_ops)"
+            )
+        elif connection.vendor == 'sqlite' and connection.Database.sqlite_version_info < MIN_SQLITE_TRIGRAM_VERSION:
+            logger.warning(
+                "SQLite %s has no FTS5 trigram tokenizer; searches use LIKE over %s",
+                connection.Database.sqlite_version, SEARCH_TABLE
+            )
+        elif connection.vendor == 'sqlite':
+            created = FTS_TABLE not in connection.introspection.table_names(cursor)
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"body, content='{SEARCH_TABLE}', content_rowid='id', tokenize='trigram')"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {SEARCH_TABLE} BEGIN "
+                f"INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.id, new.body); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {SEARCH_TABLE} BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, body) VALUES ('delete', old.id, old.body); END"
+            )
+            cursor.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON {SEARCH_TABLE} BEGIN "
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, body) VALUES ('delete', old.id, old.body); "
+                f"INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.id, new.body); END"
+            )
+            if created:
+                # Index the rows written before the triggers existed
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        else:
+            logger.info("No full-text index for %s; searches use LIKE over %s", connection.vendor, SEARCH_TABLE)
+
+
+def install_search_backend_after_migrate(sender, using='default', **kwargs):
+    """post_migrate handler: install the full-text structures once the search table exists"""
+    connection = connections[using]
+    if SEARCH_TABLE not in connection.introspection.table_names():
+        return
+    install_search_backend(connection)
+    _full_text_ready_databases.add((connection.alias, connection.settings_dict['NAME']))
+
+
+def full_text_ready(connection):
+    """Whether the connection's full-text table/column has been installed"""
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if key in _full_text_ready_databases:
+        return True
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            columns = connection.introspection.get_table_description(cursor, SEARCH_TABLE)
+            ready = any(column.name == 'search_vector' for column in columns)
+        elif connection.vendor == 'sqlite':
+            ready = FTS_TABLE in connection.introspection.table_names(cursor)
+        else:
+            ready = False
+    if ready:
+        _full_text_ready_databases.add(key)
+    return ready
+
+
+def _like_pattern(query):
+    escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+
+def _search_sql(vendor, kind, query, outer_pk, full_text=True):
+    """(match SQL, params, rank SQL, params) for one search"""
+    if vendor == 'postgresql' and full_text:
+        match = (
+            f"SELECT object_id FROM {SEARCH_TABLE} WHERE kind = %s AND "
+            f"(search_vector @@ plainto_tsquery('simple', %s) OR body ILIKE %s)"
+        )
+        rank = (
+            f"SELECT ts_rank(s.search_vector, plainto_tsquery('simple', %s)) + word_similarity(%s, s.body) "
+            f"FROM {SEARCH_TABLE} s WHERE s.kind = %s AND s.object_id = {outer_pk}"
+        )
+        return match, [kind, query, _like_pattern(query)], rank, [query, query, kind]
+
+    if vendor == 'sqlite' and full_text and len(query) >= MIN_TRIGRAM_QUERY_LENGTH:
+        phrase = '"' + query.replace('"', '""') + '"'
+        match = (
+            f"SELECT s.object_id FROM {FTS_TABLE} JOIN {SEARCH_TABLE} s ON s.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND s.kind = %s"
+        )
+        # bm25 is negative and lower is better; flip it so higher ranks first everywhere
+        rank = (
+            f"SELECT -{FTS_TABLE}.rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = "
+            f"(SELECT s.id FROM {SEARCH_TABLE} s WHERE s.kind = %s AND s.object_id = {outer_pk})"
+        )
+        return match, [phrase, kind], rank, [phrase, kind]
+
+    match = f"SELECT object_id FROM {SEARCH_TABLE} WHERE kind = %s AND body LIKE %s ESCAPE '\\'"
+    return match, [kind, _like_pattern(query)], "SELECT 0", []
+
+
+def search_queryset(queryset, kind, query, ranked=True):
+    """
+    Limit `queryset` to rows whose search text matches `query`.
+
+    With ranked=True the rows are annotated with `search_rank` (higher is a
+    better match) for the caller to order by; list pages that keep their own
+    ordering can pass ranked=False.
+    """
+    query = (query or '').strip()
+    if not query:
+        return queryset
+
+    connection = connections[queryset.db]
+    qn = connection.ops.quote_name
+    model = queryset.model
+    outer_pk = f"{qn(model._meta.db_table)}.{qn(model._meta.pk.column)}"
+
+    match, match_params, rank, rank_params = _search_sql(
+        connection.vendor, kind, query, outer_pk, full_text=full_text_ready(connection)
+    )
+    queryset = queryset.filter(pk__in=RawSQL(match, match_params))
+    if ranked:
+        queryset = queryset.annotate(search_rank=RawSQL(rank, rank_params))
+    return queryset
@@ -1,7 +1,17 @@
 # project_profiling/signals.py
-from django.db.models.signals import post_save, post_delete
+from decimal import Decimal
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete
 from django.dispatch import receiver
-from .models import ProjectCost, ProjectProfile
+from .models import (
+    ProjectCost, ProjectProfile, ProjectBudget, FundAllocation, Expense,
+    WeeklyCostReport, SubcontractorExpense, ProjectCostRollup,
+    ProjectDocument, SupplierQuotation, ProjectType, ProjectTypeCostHistory
+)
+from .cost_configuration import LocationMultiplier, SizeMultiplier
+from .cost_learning import CostLearningEngine
+from .cost_tables import invalidate_cost_tables
+from .document_stats import DOCUMENT_STATS_PROJECT_FIELDS, invalidate_document_stats
+from .search import SEARCH_SOURCES, index_instance, needs_reindex, reindex, remove_instance, search_kind_for_model
 
 def update_project_expense(project):
     """Recalculate total expenses for a project"""
@@ -18,3 +28,151 @@ def update_expense_on_save(sender, instance, **kwargs):
 def update_expense_on_delete(sender, instance, **kwargs):
     if instance.project:
         update_project_expense(instance.project)
+
+
+# ----------------------------
+# ProjectCostRollup maintenance
+# ----------------------------
+# Source model -> (rollup column, project lookup, summed field, extra filter)
+ROLLUP_SOURCES = {
+    model: (column, project_path, field, extra)
+    for column, (model_name, project_path, field, extra) in ProjectCostRollup.SOURCES.items()
+    for model in [ProjectBudget, FundAllocation, Expense, WeeklyCostReport, SubcontractorExpense]
+    if model.__name__ == model_name
+}
+
+def rollup_contribution(sender, pk):
+    """Return (project_id, {column: amount}) that one stored source row adds to its rollup"""
+    column, project_path, field, extra = ROLLUP_SOURCES[sender]
+    row = sender.objects.filter(pk=pk).values(project_path, field, *extra).first()
+    if row is None:
+        return None, {}
+    counted = all(row[key] == value for key, value in extra.items())
+    return row[project_path], {column: (row[field] or Decimal('0')) if counted else Decimal('0')}
+
+def capture_rollup_contribution(sender, instance, raw=False, **kwargs):
+    """Remember the row's contribution before it is changed or deleted"""
+    if raw or instance._state.adding or instance.pk is None:
+        instance._rollup_previous = (None, {})
+    else:
+        instance._rollup_previous = rollup_contribution(sender, instance.pk)
+
+def apply_rollup_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old_project, old = getattr(instance, '_rollup_previous', (None, {}))
+    new_project, new = rollup_contribution(sender, instance.pk)
+    if old_project == new_project:
+        ProjectCostRollup.apply_delta(new_project, **{
+            column: new.get(column, Decimal('0')) - old.get(column, Decimal('0'))
+            for column in {*old, *new}
+        })
+    else:
+        ProjectCostRollup.apply_delta(old_project, create_missing=False, **{c: -v for c, v in old.items()})
+        ProjectCostRollup.apply_delta(new_project, **new)
+
+def apply_rollup_on_delete(sender, instance, **kwargs):
+    old_project, old = getattr(instance, '_rollup_previous', (None, {}))
+    # Never recreate a rollup here: it may be part of the same cascade delete
+    ProjectCostRollup.apply_delta(old_project, create_missing=False, **{c: -v for c, v in old.items()})
+
+for rollup_source in ROLLUP_SOURCES:
+    pre_save.connect(capture_rollup_contribution, sender=rollup_source, dispatch_uid=f'rollup_pre_save_{rollup_source.__name__}')
+    post_save.connect(apply_rollup_on_save, sender=rollup_source, dispatch_uid=f'rollup_post_save_{rollup_source.__name__}')
+    pre_delete.connect(capture_rollup_contribution, sender=rollup_source, dispatch_uid=f'rollup_pre_delete_{rollup_source.__name__}')
+    post_delete.connect(apply_rollup_on_delete, sender=rollup_source, dispatch_uid=f'rollup_post_delete_{rollup_source.__name__}')
+
+
+# ----------------------------
+# Document library stats cache
+# ----------------------------
+# Upload, archive/restore (document.save()) and deletes change the library totals
+@receiver(post_save, sender=ProjectDocument)
+@receiver(post_delete, sender=ProjectDocument)
+@receiver(post_save, sender=SupplierQuotation)
+@receiver(post_delete, sender=SupplierQuotation)
+def invalidate_document_stats_on_change(sender, **kwargs):
+    invalidate_document_stats()
+
+
+# Project contract, permit and BOQ files are counted in the document stats too
+@receiver(post_save, sender=ProjectProfile)
+@receiver(post_delete, sender=ProjectProfile)
+def invalidate_document_stats_on_project_change(sender, update_fields=None, **kwargs):
+    if update_fields and not DOCUMENT_STATS_PROJECT_FIELDS & set(update_fields):
+        return
+    invalidate_document_stats()
+
+
+# ----------------------------
+# Cost estimation table snapshot
+# ----------------------------
+# Admin edits of the multipliers or project types (and learned cost updates,
+# which save the ProjectType) retire the cached estimation tables
+@receiver(post_save, sender=SizeMultiplier)
+@receiver(post_delete, sender=SizeMultiplier)
+@receiver(post_save, sender=LocationMultiplier)
+@receiver(post_delete, sender=LocationMultiplier)
+@receiver(post_save, sender=ProjectType)
+@receiver(post_delete, sender=ProjectType)
+def invalidate_cost_tables_on_change(sender, **kwargs):
+    invalidate_cost_tables()
+
+
+# ----------------------------
+# Learned cost summaries
+# ----------------------------
+COST_HISTORY_LEARNING_FIELDS = ('project_type_id', 'is_approved', 'cost_per_sqm', 'complexity_level', 'uploaded_at')
+
+@receiver(pre_save, sender=ProjectTypeCostHistory)
+def capture_previous_cost_history(sender, instance, raw=False, **kwargs):
+    if raw or not instance.pk:
+        instance._learning_previous = None
+        return
+    instance._learning_previous = (
+        sender.objects.filter(pk=instance.pk).values(*COST_HISTORY_LEARNING_FIELDS).first()
+    )
+
+@receiver(post_save, sender=ProjectTypeCostHistory)
+def update_cost_summary_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_learning_previous', None)
+    if created or previous is None:
+        if instance.is_approved:
+            # New approved data: O(1) update of the running sums
+            CostLearningEngine.record_approved_history(instance)
+        return
+    if not (previous['is_approved'] or instance.is_approved):
+        return
+    current = sender.objects.filter(pk=instance.pk).values(*COST_HISTORY_LEARNING_FIELDS).first()
+    if current != previous:
+        CostLearningEngine.rebuild_cost_summaries({previous['project_type_id'], instance.project_type_id})
+
+@receiver(post_delete, sender=ProjectTypeCostHistory)
+def update_cost_summary_on_delete(sender, instance, **kwargs):
+    if instance.is_approved:
+        # Never recreate a summary here: the project type may be part of the same cascade delete
+        CostLearningEngine.rebuild_cost_summaries([instance.project_type_id], create_missing=False)
+
+
+# ----------------------------
+# Search index maintenance
+# ----------------------------
+def update_search_document(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    kind = search_kind_for_model(sender)
+    if not needs_reindex(kind, update_fields):
+        return
+    index_instance(kind, instance)
+    if kind == 'client':
+        # Project search text includes the client's names
+        reindex('project', ProjectProfile.objects.filter(client=instance))
+
+def remove_search_document(sender, instance, **kwargs):
+    remove_instance(search_kind_for_model(sender), instance.pk)
+
+for search_kind, (search_model_label, *_rest) in SEARCH_SOURCES.items():
+    post_save.connect(update_search_document, sender=search_model_label, dispatch_uid=f'search_post_save_{search_kind}')
+    post_delete.connect(remove_search_document, sender=search_model_label, dispatch_uid=f'search_post_delete_{search_kind}')
@@ -1,3 +1,404 @@
-from django.test import TestCase
+import tempfile
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
+from django.db.models.fields.files import FieldFile
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from authentication.models import UserProfile
+from employees.models import Employee
+from manage_client.models import Client
+from project_profiling import cost_tables, search
+from project_profiling.cost_configuration import LocationMultiplier, SizeMultiplier
+from project_profiling.cost_estimation import CostEstimationEngine
+from project_profiling.cost_learning import CostLearningEngine
+from project_profiling.cost_tables import invalidate_cost_tables
+from project_profiling.document_stats import DOCUMENT_STATS_VERSION_KEY, get_document_stats
+from project_profiling.file_serving import parse_range_header, serve_stored_file
+from project_profiling.models import (
+    ProjectDocument, ProjectProfile, ProjectStaging, ProjectType, ProjectTypeCostHistory, ProjectTypeCostSummary,
+    SearchDocument,
+)
+from project_profiling.project_listing import PROJECTS_PAGE_SIZE
+from project_profiling.search import FTS_TABLE, search_queryset
+from scheduling.models import ProjectSchedule
+
+
+class FileServingTestCase(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        storage = FileSystemStorage(location=self.tmpdir.name)
+        name = storage.save('project_documents/plan.pdf', ContentFile(b'0123456789' * 10))
+        self.file = FieldFile(ProjectDocument(), ProjectDocument._meta.get_field('file'), name)
+        self.file.storage = storage
+        self.uploaded_at = datetime(2024, 8, 12, 8, 30, tzinfo=timezone.utc)
+        self.factory = RequestFactory()
+
+    def serve(self, **headers):
+        return serve_stored_file(self.factory.get('/', headers=headers), self.file, last_modified=self.uploaded_at)
+
+    def test_parse_range_header(self):
+        self.assertEqual(parse_range_header('bytes=0-9', 100), (0, 9))
+        self.assertEqual(parse_range_header('bytes=90-', 100), (90, 99))
+        self.assertEqual(parse_range_header('bytes=-5', 100), (95, 99))
+        self.assertEqual(parse_range_header('bytes=50-500', 100), (50, 99))
+        self.assertIsNone(parse_range_header('bytes=0-1,5-6', 100))
+        self.assertFalse(parse_range_header('bytes=100-', 100))
+
+    def test_full_download_is_streamed(self):
+        response = self.serve()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789' * 10)
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('attachment; filename="plan.pdf"', response['Content-Disposition'])
+
+    def test_range_and_unsatisfiable_range(self):
+        response = self.serve(Range='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+
+        response = self.serve(Range='bytes=200-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_conditional_get_and_if_range(self):
+        etag = self.serve()['ETag']
+        self.assertEqual(self.serve(If_None_Match=etag).status_code, 304)
+
+        # A stale If-Range validator gets the whole file instead of the range
+        response = self.serve(Range='bytes=0-9', If_Range='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.serve(Range='bytes=0-9', If_Range=etag).status_code, 206)
+
+    @override_settings(PROTECTED_FILE_OFFLOAD='x-accel-redirect', PROTECTED_FILE_ACCEL_PREFIX='/protected/')
+    def test_x_accel_redirect_offload(self):
+        response = self.serve()
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/project_documents/plan.pdf')
+        self.assertEqual(response.content, b'')
+
+
+class ProjectListQueryCountTestCase(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(email='om@example.com', password='pass', first_name='Olive', last_name='Manager')
+        self.profile = UserProfile.objects.get_or_create(user=user, defaults={'role': 'OM'})[0]
+        self.client.force_login(user)
+
+    def add_projects(self, count):
+        start = ProjectProfile.objects.count()
+        projects = ProjectProfile.objects.bulk_create([
+            ProjectProfile(
+                project_source='GC', project_id=f'GC-{start + i}', project_name=f'Project {start + i}',
+                location='Manila', status='OG' if i % 2 else 'PL', project_manager=self.profile,
+            )
+            for i in range(count)
+        ])
+        ProjectSchedule.objects.bulk_create([
+            ProjectSchedule(project=project, uploaded_by=self.profile, file='project_schedules/s.xlsx',
+                            status='APPROVED', is_active=True)
+            for project in projects[::3]
+        ])
+        ProjectStaging.objects.bulk_create([
+            ProjectStaging(created_by=self.profile, status='PL', is_draft=False,
+                           project_data={'project_source': 'GC', 'project_name': f'Pending {start + i}',
+                                         'project_id': f'PEND-{start + i}', 'project_manager_id': str(self.profile.id)})
+            for i in range(max(count // 100, 1))
+        ])
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('project_list_general_contractor'))
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_query_count_does_not_grow_with_projects(self):
+        self.add_projects(10)
+        _response, small = self.list_queries()
+
+        self.add_projects(990)
+        response, large = self.list_queries()
+
+        self.assertEqual(large, small, f"{small} queries for 10 projects, {large} for 1,000")
+        self.assertEqual(response.context['project_count'], 1000)
+        self.assertEqual(response.context['status_counts']['OG'], 500)
+        self.assertEqual(len(response.context['projects']), PROJECTS_PAGE_SIZE)
+        self.assertEqual(len(response.context['pending_projects']), 10)
+        self.assertEqual(set(response.context['pending_project_managers'].values()), {self.profile})
+
+        schedules = dict(ProjectSchedule.objects.values_list('project_id', 'pk'))
+        for project in response.context['projects']:
+            self.assertEqual(project.approved_schedule_id, schedules.get(project.pk))
+
+
+
+class DocumentStatsCacheTestCase(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(email='om@example.com', password='pass')
+        self.profile = UserProfile.objects.get_or_create(user=user, defaults={'role': 'OM'})[0]
+        self.project = ProjectProfile.objects.create(
+            project_source='GC', project_id='GC-1', project_name='Warehouse', location='Manila',
+            status='PL', project_manager=self.profile,
+        )
+
+    def test_project_boq_upload_refreshes_stats(self):
+        self.assertEqual(get_document_stats(self.profile)['boq_documents'], 0)
+        self.project.boq_items = [{'code': '1.1', 'description': 'Excavation'}]
+        self.project.save()
+        self.assertEqual(get_document_stats(self.profile)['boq_documents'], 1)
+
+    def test_unrelated_project_update_keeps_cache(self):
+        get_document_stats(self.profile)
+        version = cache.get(DOCUMENT_STATS_VERSION_KEY)
+        self.project.save(update_fields=['status'])
+        self.assertEqual(cache.get(DOCUMENT_STATS_VERSION_KEY), version)
+
+    def test_expired_version_does_not_revive_old_entries(self):
+        self.assertEqual(get_document_stats(self.profile)['boq_documents'], 0)
+        # Another process changes the data; this process only notices once its version expires
+        ProjectProfile.objects.filter(pk=self.project.pk).update(boq_items=[{'code': '1.1'}])
+        self.assertEqual(get_document_stats(self.profile)['boq_documents'], 0)
+        cache.delete(DOCUMENT_STATS_VERSION_KEY)
+        self.assertEqual(get_document_stats(self.profile)['boq_documents'], 1)
+
+class CostTableSnapshotTestCase(TestCase):
+    def setUp(self):
+        invalidate_cost_tables()
+        SizeMultiplier.objects.create(name='Small', min_size=0, max_size=150, multiplier=Decimal('1.4'))
+        SizeMultiplier.objects.create(name='Medium', min_size=100, max_size=600, multiplier=Decimal('1.0'))
+        SizeMultiplier.objects.create(name='Large', min_size=600, multiplier=Decimal('0.85'))
+        LocationMultiplier.objects.create(name='Metro Manila', keywords='Manila, Makati', multiplier=Decimal('1.35'))
+        LocationMultiplier.objects.create(name='Elsewhere', keywords='', multiplier=Decimal('0.95'), is_default=True)
+
+    def multipliers(self, lot_size, location):
+        return CostEstimationEngine.estimate_project_cost(
+            'residential', Decimal(lot_size), 'PRI', location
+        )['multipliers']
+
+    def test_estimates_from_snapshot_without_queries(self):
+        self.multipliers('10', '')
+        with self.assertNumQueries(0):
+            # Overlapping ranges: the lowest min_size that matches wins
+            self.assertEqual(self.multipliers('120', 'Makati City')['size'], Decimal('1.4'))
+            self.assertEqual(self.multipliers('150', '')['size'], Decimal('1.0'))
+            self.assertEqual(self.multipliers('5000', '')['size'], Decimal('0.85'))
+            self.assertEqual(self.multipliers('120', 'Makati City')['location'], Decimal('1.35'))
+            self.assertEqual(self.multipliers('120', 'Iloilo')['location'], Decimal('0.95'))
+
+    def test_saving_a_multiplier_refreshes_the_snapshot(self):
+        self.assertEqual(self.multipliers('120', 'Cebu City')['location'], Decimal('0.95'))
+        LocationMultiplier.objects.create(name='Cebu', keywords='cebu', multiplier=Decimal('1.2'))
+        self.assertEqual(self.multipliers('120', 'Cebu City')['location'], Decimal('1.2'))
+
+    def test_change_in_another_process_is_picked_up(self):
+        self.assertEqual(self.multipliers('120', 'Cebu City')['location'], Decimal('0.95'))
+        # Another process saves a multiplier: its signal bumps the version in
+        # that process's own memory cache, which this process never sees
+        version = cost_tables._tables_version()
+        LocationMultiplier.objects.create(name='Cebu', keywords='cebu', multiplier=Decimal('1.2'))
+        cache.set(cost_tables.COST_TABLES_VERSION_KEY, version, None)
+        cost_tables._snapshot.version = version
+
+        with override_settings(COST_TABLES_MAX_AGE=60):
+            self.assertEqual(self.multipliers('120', 'Cebu City')['location'], Decimal('0.95'))
+        with override_settings(COST_TABLES_MAX_AGE=0):
+            self.assertEqual(self.multipliers('120', 'Cebu City')['location'], Decimal('1.2'))
+
+    def test_scenario_grid_matches_single_estimates(self):
+        lot_sizes = [Decimal('0'), Decimal('80.5'), Decimal('150'), Decimal('999.99')]
+        locations = ['Makati City', 'Iloilo']
+        categories = ['PUB', 'NEW']
+        levels = ['low_end', 'high_end']
+
+        for configured in (True, False):
+            if not configured:
+                # Hardcoded fallback tables
+                SizeMultiplier.objects.all().delete()
+                LocationMultiplier.objects.all().delete()
+            grid = CostEstimationEngine.estimate_scenarios('commercial', lot_sizes, categories, locations, levels)
+            self.assertEqual(grid['shape'], (2, 2, 2, 4))
+            for k, level in enumerate(levels):
+                for c, category in enumerate(categories):
+                    for l, location in enumerate(locations):
+                        for s, lot_size in enumerate(lot_sizes):
+                            single = CostEstimationEngine.estimate_project_cost(
+                                'commercial', lot_size, category, location, level
+                            )
+                            for key in ('total_estimated_cost', 'cost_per_sqm'):
+                                self.assertAlmostEqual(grid[key][k, c, l, s], float(single[key]), places=4)
+
+
+class CostLearningSummaryTestCase(TestCase):
+    def setUp(self):
+        self.project_type = ProjectType.objects.create(name='Warehouse', code='WH')
+
+    def add_history(self, total_cost, complexity_level='mid_range', is_approved=True):
+        return ProjectTypeCostHistory.objects.create(
+            project_type=self.project_type, lot_size=Decimal('100'), total_cost=Decimal(total_cost),
+            complexity_level=complexity_level, is_approved=is_approved
+        )
+
+    def expected_costs(self):
+        """Recency-weighted average over the full history, newest first"""
+        records = ProjectTypeCostHistory.objects.filter(
+            project_type=self.project_type, is_approved=True
+        ).order_by('-uploaded_at', '-pk')
+        total_weight = Decimal('0')
+        costs = {'low_end': Decimal('0'), 'mid_range': Decimal('0'), 'high_end': Decimal('0')}
+        for i, record in enumerate(records):
+            weight = max(Decimal('1.0') - Decimal(i) * Decimal('0.1'), Decimal('0.1'))
+            total_weight += weight
+            costs[record.complexity_level] += record.cost_per_sqm * weight
+        return {level: cost / total_weight for level, cost in costs.items()}
+
+    def test_incremental_updates_match_full_recalculation(self):
+        levels = ['low_end', 'mid_range', 'high_end']
+        for i in range(14):
+            self.add_history(1_000_000 + i * 12_345, levels[i % 3])
+        self.add_history(9_999_999, is_approved=False)
+
+        summary = ProjectTypeCostSummary.objects.get(project_type=self.project_type)
+        self.assertEqual(summary.history_count, 14)
+        self.assertEqual(summary.weighted_costs(), self.expected_costs())
+
+        # Reading the learned sums is a single row lookup, not a history scan
+        with self.assertNumQueries(1):
+            self.assertEqual(CostLearningEngine.get_cost_summary(self.project_type).history_count, 14)
+
+        incremental = summary.weighted_sums
+        CostLearningEngine.rebuild_cost_summaries()
+        self.assertEqual(ProjectTypeCostSummary.objects.get(project_type=self.project_type).weighted_sums, incremental)
+
+        costs = CostLearningEngine.calculate_project_type_costs(self.project_type)
+        self.assertEqual(costs, self.expected_costs())
+        self.project_type.refresh_from_db()
+        self.assertEqual(self.project_type.total_projects_count, 14)
+
+    def test_approval_and_delete_rebuild_the_summary(self):
+        first = self.add_history(2_000_000)
+        pending = self.add_history(3_000_000, is_approved=False)
+        pending.is_approved = True
+        pending.save()
+        self.assertEqual(ProjectTypeCostSummary.objects.get(project_type=self.project_type).history_count, 2)
+
+        first.delete()
+        summary = ProjectTypeCostSummary.objects.get(project_type=self.project_type)
+        self.assertEqual(summary.history_count, 1)
+        self.assertEqual(summary.weighted_costs(), self.expected_costs())
+
+        self.assertEqual(CostLearningEngine.recalculate_all_project_types(), 1)
+        self.project_type.refresh_from_db()
+        self.assertEqual(self.project_type.base_cost_mid_range, Decimal('30000.00'))
+
+
+class SearchIndexTestCase(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(email='pm@example.com', password='pass')
+        self.profile = UserProfile.objects.get_or_create(user=user, defaults={'role': 'OM'})[0]
+        self.client_a = Client.objects.create(company_name='Harbor Drainage Corp', contact_name='Maria Santos')
+        self.client_b = Client.objects.create(company_name='Summit Builders', contact_name='Jose Cruz')
+        self.project_a = self.add_project('GC-1', 'Drainage Upgrade', self.client_a)
+        self.project_b = self.add_project('GC-2', 'Warehouse Extension', self.client_b)
+
+    def add_project(self, project_id, name, client):
+        return ProjectProfile.objects.create(
+            project_source='GC', project_id=project_id, project_name=name, location='Manila',
+            status='PL', project_manager=self.profile, client=client,
+        )
+
+    def add_document(self, title, description=''):
+        return ProjectDocument.objects.create(
+            project=self.project_a, document_type='OTHER', project_stage='PLAN', title=title,
+            description=description, file='project_documents/doc.pdf', uploaded_by=self.profile,
+        )
+
+    def search(self, queryset, kind, query):
+        return list(search_queryset(queryset, kind, query).order_by('-search_rank', 'pk'))
+
+    def test_full_text_backend_is_installed_without_migrations(self):
+        # The test database is built with run-syncdb here; post_migrate still installs the index
+        if connection.vendor == 'sqlite':
+            self.assertIn(FTS_TABLE, connection.introspection.table_names())
+        self.assertTrue(search.full_text_ready(connection))
+
+    def test_project_search(self):
+        self.assertEqual(self.search(ProjectProfile.objects.all(), 'project', 'drainage'), [self.project_a])
+        self.assertEqual(self.search(ProjectProfile.objects.all(), 'project', 'GC-2'), [self.project_b])
+        # Client names are part of the project text
+        self.assertEqual(self.search(ProjectProfile.objects.all(), 'project', 'summit'), [self.project_b])
+        self.assertEqual(self.search(ProjectProfile.objects.all(), 'project', 'nothing like this'), [])
+
+    def test_client_search(self):
+        self.assertEqual(self.search(Client.objects.all(), 'client', 'santos'), [self.client_a])
+        self.assertEqual(self.search(Client.objects.all(), 'client', 'builders'), [self.client_b])
+
+    def test_employee_search(self):
+        ana = Employee.objects.create(employee_id='EMP-100', first_name='Ana', last_name='Reyes',
+                                      role='FM', hire_date=date(2024, 1, 8))
+        ben = Employee.objects.create(employee_id='EMP-200', first_name='Ben', last_name='Reynaldo',
+                                      role='LB', hire_date=date(2024, 1, 8))
+        self.assertEqual(self.search(Employee.objects.all(), 'employee', 'reyes'), [ana])
+        self.assertEqual(self.search(Employee.objects.all(), 'employee', 'EMP-200'), [ben])
+        self.assertEqual(self.search(Employee.objects.all(), 'employee', 'rey'), [ana, ben])
+
+    def test_document_search_is_ranked(self):
+        weak = self.add_document('Site plan', 'General layout of the site, utilities, access roads and drainage notes')
+        strong = self.add_document('Drainage', 'Drainage profile for the drainage channel')
+        self.add_document('Permit', 'Barangay clearance')
+        self.assertEqual(self.search(ProjectDocument.objects.all(), 'document', 'drainage'), [strong, weak])
+
+    def test_save_and_delete_keep_index_current(self):
+        document = self.add_document('Soil test')
+        self.assertEqual(self.search(ProjectDocument.objects.all(), 'document', 'boring log'), [])
+
+        document.title = 'Boring log'
+        document.save()
+        self.assertEqual(self.search(ProjectDocument.objects.all(), 'document', 'boring log'), [document])
+        self.assertEqual(self.search(ProjectDocument.objects.all(), 'document', 'soil test'), [])
+
+        document_pk = document.pk
+        document.delete()
+        self.assertFalse(SearchDocument.objects.filter(kind='document', object_id=document_pk).exists())
+        self.assertEqual(self.search(ProjectDocument.objects.all(), 'document', 'boring log'), [])
+
+    def test_renaming_client_reindexes_its_projects(self):
+        self.client_a.company_name = 'Riverside Holdings'
+        self.client_a.save()
+        self.assertEqual(self.search(ProjectProfile.objects.all(), 'project', 'riverside'), [self.project_a])
+        self.assertEqual(self.search(ProjectProfile.objects.all(), 'project', 'harbor'), [])
+
+    def test_like_fallback_without_full_text_table(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("drops the SQLite FTS table")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {FTS_TABLE}")
+        search._full_text_ready_databases.clear()
+        self.addCleanup(search.install_search_backend, connection)
+        self.addCleanup(search._full_text_ready_databases.clear)
+
+        self.assertFalse(search.full_text_ready(connection))
+        self.assertEqual(self.search(ProjectProfile.objects.all(), 'project', 'drainage'), [self.project_a])
+
+    def test_old_sqlite_skips_trigram_table(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("SQLite-only install path")
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {FTS_TABLE}")
+        search._full_text_ready_databases.clear()
+        self.addCleanup(search.install_search_backend, connection)
+        self.addCleanup(search._full_text_ready_databases.clear)
+
+        with mock.patch.object(search, 'MIN_SQLITE_TRIGRAM_VERSION', (99, 0, 0)):
+            search.install_search_backend(connection)
+        self.assertNotIn(FTS_TABLE, connection.introspection.table_names())
+        self.assertEqual(self.search(ProjectProfile.objects.all(), 'project', 'drainage'), [self.project_a])
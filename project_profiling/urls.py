@@ -182,6 +182,7 @@ path('<int:project_id>/categories/<int:category_id>/allocation/', views.get_cate
     # Cost Estimation API
     path('api/cost-estimation/', cost_estimation_views.CostEstimationAPIView.as_view(), name='api_cost_estimation'),
     path('api/cost-estimation/options/', cost_estimation_views.get_estimation_options_api, name='api_estimation_options'),
+    path('api/cost-estimation/scenarios/', cost_estimation_views.estimate_cost_scenarios_api, name='api_cost_estimation_scenarios'),
     
     # File Preview and Data Extraction API
     path('api/file-preview/', file_preview_views.FilePreviewAPIView.as_view(), name='api_file_preview'),
@@ -3,6 +3,7 @@ Progress Excel Reader
 Reads and validates uploaded Excel progress reports
 """
 
+from collections import Counter
 from openpyxl import load_workbook
 from decimal import Decimal, InvalidOperation
 from datetime import datetime
@@ -14,14 +15,22 @@ logger = logging.getLogger(__name__)
 class ProgressExcelReader:
     """Read and extract data from uploaded Excel progress reports"""
 
-    def __init__(self, file_path_or_stream):
+    # Only the first rows are searched for the table header
+    HEADER_SEARCH_ROWS = 49
+    # Row holding the PROGRESS THIS WEEK summary in the V2 template
+    SUMMARY_ROW = 3
+
+    def __init__(self, file_path_or_stream, read_only=True):
         """
         Initialize reader with Excel file
 
         Args:
             file_path_or_stream: File path or file-like object
+            read_only: Stream the sheet with openpyxl's read-only mode instead of
+                loading every cell into memory. Both modes return the same result.
         """
-        self.wb = load_workbook(file_path_or_stream, data_only=True)
+        self.read_only = read_only
+        self.wb = load_workbook(file_path_or_stream, data_only=True, read_only=read_only)
         self.ws = self.wb.active
         self.errors = []
         self.warnings = []
@@ -47,8 +56,10 @@ class ProgressExcelReader:
             }
         """
         try:
-            self._find_data_start()
-            self._extract_boq_items()
+            # One pass over the sheet: header search, then the data rows
+            rows = self._iter_rows()
+            self._find_data_start(rows)
+            self._extract_boq_items(rows)
             self._calculate_summary()
             self._validate_data()
 
@@ -70,32 +81,58 @@ class ProgressExcelReader:
                 'warnings': []
             }
 
-    def _find_data_start(self):
-        """Find where BOQ data starts (after headers)"""
+        finally:
+            if self.read_only:
+                # Read-only workbooks keep the underlying archive open
+                self.wb.close()
+
+    def _iter_rows(self):
+        """
+        Yield (row number, cell values) for every row of the sheet, in order.
+        Rows are padded to the sheet width, so values[col - 1] is column `col`.
+        """
+        if self.read_only and (self.ws.max_row is None or self.ws.max_column is None):
+            # The file has no dimension record; scan it once to size the sheet
+            self.ws.calculate_dimension(force=True)
+
+        rows = self.ws.iter_rows(
+            min_row=1, min_col=1,
+            max_row=self.ws.max_row, max_col=self.ws.max_column,
+            values_only=True
+        )
+        return enumerate(rows, start=1)
+
+    def _find_data_start(self, rows):
+        """Find where BOQ data starts (after headers), consuming rows up to the header row"""
         # Look for "ITEM" or "BOQ Code" header (support both V1 and V2 templates)
         self.data_start_row = None
+        self.header_values = ()
+
+        for row_idx, values in rows:
+            if row_idx == self.SUMMARY_ROW:
+                # Extract weekly progress summary from row 3 (V2 template format)
+                self._extract_weekly_summary(values)
 
-        for row_idx in range(1, min(50, self.ws.max_row + 1)):
-            cell_value = self.ws[f'A{row_idx}'].value
+            cell_value = values[0] if values else None
             if cell_value and ('ITEM' in str(cell_value).upper() or 'BOQ Code' in str(cell_value)):
                 self.data_start_row = row_idx + 1
+                self.header_values = values
+                break
+
+            if row_idx >= self.HEADER_SEARCH_ROWS:
                 break
 
         if not self.data_start_row:
             self.errors.append("Could not find BOQ data table in Excel file. Please use the downloaded template.")
             raise ValueError("Data table not found")
 
-        # Extract weekly progress summary from row 3 (V2 template format)
-        self._extract_weekly_summary()
-
-    def _extract_weekly_summary(self):
+    def _extract_weekly_summary(self, values):
         """Extract weekly progress summary from row 3 (PROGRESS THIS WEEK row)"""
         # In V2 template, row 3 has the weekly progress percentage in the last column
         # Scan row 3 to find the percentage value (rightmost non-empty cell)
         try:
-            for col_idx in range(self.ws.max_column, 0, -1):
-                cell = self.ws.cell(row=3, column=col_idx)
-                value = cell.value
+            for col_idx in range(len(values), 0, -1):
+                value = values[col_idx - 1]
 
                 if value is not None and value != '' and value != 'PROGRESS THIS WEEK':
                     # Found the percentage value
@@ -115,18 +152,24 @@ class ProgressExcelReader:
             logger.warning(f"Could not extract weekly summary from row 3: {str(e)}")
             # Not critical, continue anyway
 
-    def _extract_boq_items(self):
+    def _extract_boq_items(self, rows):
         """Extract BOQ items from Excel"""
-        current_division = None
+        for item in self.iter_boq_items(rows):
+            self.boq_items.append(item)
 
+            self.summary['total_items'] += 1
+            self.summary['items_with_progress'] += 1
+            # Don't sum percentages here - use row 3 value in _calculate_summary instead
+            self.summary['total_period_amount'] += item['period_progress_amount']
+
+    def _find_total_columns(self):
+        """Locate the TOTAL AMOUNT and PERCENT columns in the header row"""
         # Find AMOUNT and PERCENT columns (last 2 columns in V2 template)
         # Look in header row 2 for "AMOUNT" and "PERCENT" under "TOTAL"
         total_amount_col = None
         total_percent_col = None
 
-        header_row = self.data_start_row - 1  # Row before data starts
-        for col_idx in range(1, self.ws.max_column + 1):
-            cell_value = self.ws.cell(row=header_row, column=col_idx).value
+        for col_idx, cell_value in enumerate(self.header_values, start=1):
             if cell_value:
                 cell_str = str(cell_value).upper().strip()
                 if 'AMOUNT' in cell_str and total_amount_col is None:
@@ -143,11 +186,27 @@ class ProgressExcelReader:
             total_percent_col = self.ws.max_column
 
         logger.info(f"Using columns for totals - Amount: {total_amount_col}, Percent: {total_percent_col}")
+        return total_amount_col, total_percent_col
+
+    def iter_boq_items(self, rows):
+        """
+        Parse the data rows that follow the header and yield BOQ progress items
+        one at a time. The TOTAL row amount and row errors are recorded on the
+        reader as they are encountered.
+        """
+        current_division = None
+        total_amount_col, total_percent_col = self._find_total_columns()
+
+        def cell(values, col_idx):
+            return self._clean_value(values[col_idx - 1]) if 0 < col_idx <= len(values) else None
+
+        for row_idx, values in rows:
+            if row_idx == self.SUMMARY_ROW:
+                self._extract_weekly_summary(values)
 
-        for row_idx in range(self.data_start_row, self.ws.max_row + 1):
             # Get cell values
-            boq_code = self._get_cell_value('A', row_idx)
-            description = self._get_cell_value('B', row_idx)
+            boq_code = cell(values, 1)
+            description = cell(values, 2)
 
             # Skip empty rows
             if not boq_code:
@@ -162,7 +221,7 @@ class ProgressExcelReader:
             if str(boq_code).upper() == 'TOTAL' or (description and 'TOTAL' in str(description).upper() and 'SUB-TOTAL' not in str(description).upper()):
                 # This is the main TOTAL row - extract the total amount
                 try:
-                    total_row_amount = self._get_cell_value_by_col(total_amount_col, row_idx)
+                    total_row_amount = cell(values, total_amount_col)
                     if total_row_amount and total_row_amount != '' and total_row_amount != 0:
                         self.summary['total_period_amount_from_excel'] = self._parse_decimal(total_row_amount, row_idx, 'Total Amount')
                         logger.info(f"Found TOTAL row at row {row_idx} with amount: ₱{self.summary['total_period_amount_from_excel']:,.2f}")
@@ -175,8 +234,8 @@ class ProgressExcelReader:
                 continue
 
             # Get period amount and percent from the TOTAL columns
-            period_amount = self._get_cell_value_by_col(total_amount_col, row_idx)
-            period_percent = self._get_cell_value_by_col(total_percent_col, row_idx)
+            period_amount = cell(values, total_amount_col)
+            period_percent = cell(values, total_percent_col)
 
             # Skip if no progress entered (both amount and percent are empty/zero)
             if (period_amount is None or period_amount == '' or period_amount == 0) and \
@@ -201,9 +260,9 @@ class ProgressExcelReader:
                     continue
 
                 # Get other values from standard columns
-                quantity = self._get_cell_value('C', row_idx) or 0
-                uom = self._get_cell_value('D', row_idx) or ''
-                approved_amount = self._parse_decimal(self._get_cell_value('E', row_idx), row_idx, 'Approved Amount')
+                quantity = cell(values, 3) or 0
+                uom = cell(values, 4) or ''
+                approved_amount = self._parse_decimal(cell(values, 5), row_idx, 'Approved Amount')
 
                 # For V2 template, we don't have previous cumulative stored
                 # We'll set cumulative = period (this is weekly progress)
@@ -220,7 +279,7 @@ class ProgressExcelReader:
                     )
 
                 # Add BOQ item
-                self.boq_items.append({
+                item = {
                     'boq_item_code': str(boq_code).strip(),
                     'description': str(description).strip() if description else '',
                     'division': current_division or '',
@@ -236,17 +295,15 @@ class ProgressExcelReader:
                     'progress_decreased': False,  # Not tracked in V2
                     'remarks': '',  # V2 doesn't have remarks column
                     'row_number': row_idx
-                })
-
-                self.summary['total_items'] += 1
-                self.summary['items_with_progress'] += 1
-                # Don't sum percentages here - use row 3 value in _calculate_summary instead
-                self.summary['total_period_amount'] += period_amount_value
+                }
 
             except (ValueError, InvalidOperation) as e:
                 self.errors.append(f"Row {row_idx}: Invalid data - {str(e)}")
                 continue
 
+            yield item
+
+
     def _calculate_summary(self):
         """Calculate summary statistics"""
         if not self.boq_items:
@@ -286,57 +343,20 @@ class ProgressExcelReader:
             self.errors.append("No valid BOQ progress entries found in Excel file")
 
         # Check for duplicate BOQ codes
-        boq_codes = [item['boq_item_code'] for item in self.boq_items]
-        duplicates = set([code for code in boq_codes if boq_codes.count(code) > 1])
+        code_counts = Counter(item['boq_item_code'] for item in self.boq_items)
+        duplicates = {code for code, count in code_counts.items() if count > 1}
 
         if duplicates:
             self.errors.append(f"Duplicate BOQ codes found: {', '.join(duplicates)}")
 
-    def _get_cell_value(self, column, row):
-        """Get cell value safely by column letter"""
-        try:
-            cell = self.ws[f'{column}{row}']
-            value = cell.value
-
-            # Handle formulas
-            if hasattr(cell, 'data_type') and cell.data_type == 'f':
-                # Formula cell - use calculated value
-                return value
-
-            # Clean string values
-            if isinstance(value, str):
-                value = value.strip()
-                if value == '':
-                    return None
-
-            return value
-
-        except Exception as e:
-            logger.warning(f"Error reading cell {column}{row}: {str(e)}")
-            return None
-
-    def _get_cell_value_by_col(self, column_index, row):
-        """Get cell value safely by column index"""
-        try:
-            cell = self.ws.cell(row=row, column=column_index)
-            value = cell.value
-
-            # Handle formulas
-            if hasattr(cell, 'data_type') and cell.data_type == 'f':
-                # Formula cell - use calculated value
-                return value
-
-            # Clean string values
-            if isinstance(value, str):
-                value = value.strip()
-                if value == '':
-                    return None
-
-            return value
-
-        except Exception as e:
-            logger.warning(f"Error reading cell at column {column_index}, row {row}: {str(e)}")
-            return None
+    @staticmethod
+    def _clean_value(value):
+        """Strip string cell values; blank strings count as empty"""
+        if isinstance(value, str):
+            value = value.strip()
+            if value == '':
+                return None
+        return value
 
     def _parse_decimal(self, value, row_idx, field_name):
         """Parse value to Decimal"""
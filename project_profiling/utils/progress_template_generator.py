@@ -68,12 +68,11 @@ class ProgressTemplateGenerator:
         # Group BOQ items by division
         divisions = {}
 
-        for boq_item in self.project.boq_items:
-            # Only include level 2 items (actual work items, not headers)
-            level = boq_item.get('level', 0)
-            if level != 2:
-                continue
+        # Latest approved progress for every BOQ item, fetched once
+        previous_by_code = self._get_latest_approved_progress()
 
+        # Only include level 2 items (actual work items, not headers)
+        for boq_item in self.project.boq_index.level_items(2):
             division_name = boq_item.get('division', 'Other')
 
             if division_name not in divisions:
@@ -83,14 +82,8 @@ class ProgressTemplateGenerator:
                 }
 
             # Get previous progress for this BOQ item
-            from project_profiling.models import BOQItemProgress
-
             boq_code = boq_item.get('code', '')
-            previous_progress = BOQItemProgress.objects.filter(
-                project=self.project,
-                boq_item_code=boq_code,
-                status='A'  # Only approved
-            ).order_by('-report_date').first()
+            previous_progress = previous_by_code.get(boq_code)
 
             item_data = {
                 'code': boq_code,
@@ -123,8 +116,6 @@ class ProgressTemplateGenerator:
         Returns:
             list: List of BOQ item dictionaries
         """
-        from project_profiling.models import BOQItemProgress
-
         logger.info(f"[BOQ ITEMS DEBUG] Getting BOQ items for task ID {task.id}: '{task.task_name}'")
         logger.info(f"[BOQ ITEMS DEBUG] Task.boq_item_codes = {task.boq_item_codes}")
         logger.info(f"[BOQ ITEMS DEBUG] Type: {type(task.boq_item_codes)}, Length: {len(task.boq_item_codes) if task.boq_item_codes else 0}")
@@ -136,6 +127,7 @@ class ProgressTemplateGenerator:
         logger.info(f"[BOQ ITEMS DEBUG] Task {task.id} has {len(task.boq_item_codes)} BOQ codes: {task.boq_item_codes}")
 
         boq_items_data = []
+        previous_by_code = self._get_latest_approved_progress(task.boq_item_codes)
 
         for boq_code in task.boq_item_codes:
             # Get BOQ item details from project.boq_items
@@ -145,11 +137,7 @@ class ProgressTemplateGenerator:
                 continue
 
             # Get previous approved progress for this item
-            previous_progress = BOQItemProgress.objects.filter(
-                project=self.project,
-                boq_item_code=boq_code,
-                status='A'  # Only approved
-            ).order_by('-report_date').first()
+            previous_progress = previous_by_code.get(boq_code)
 
             item_data = {
                 'code': boq_code,
@@ -181,11 +169,38 @@ class ProgressTemplateGenerator:
         if not self.project.boq_items:
             return None
 
-        for item in self.project.boq_items:
-            if item.get('code') == boq_code:
-                return item
+        return self.project.get_boq_item(boq_code)
+
+    def _get_latest_approved_progress(self, boq_codes=None):
+        """
+        Latest approved BOQItemProgress per BOQ item code in a single query
+
+        Args:
+            boq_codes: Optional list of codes to limit the lookup to
+
+        Returns:
+            dict: BOQ item code -> BOQItemProgress
+        """
+        from django.db.models import F, Window
+        from django.db.models.functions import RowNumber
+        from project_profiling.models import BOQItemProgress
 
-        return None
+        records = BOQItemProgress.objects.filter(
+            project=self.project,
+            status='A'  # Only approved
+        )
+        if boq_codes is not None:
+            records = records.filter(boq_item_code__in=boq_codes)
+
+        latest = records.annotate(
+            row_number=Window(
+                expression=RowNumber(),
+                partition_by=[F('boq_item_code')],
+                order_by=[F('report_date').desc(), F('pk').desc()],
+            )
+        ).filter(row_number=1)
+
+        return {record.boq_item_code: record for record in latest}
 
     def get_weekly_schedule(self, start_date=None, num_weeks=12):
         """
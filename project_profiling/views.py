@@ -28,7 +28,7 @@ import requests
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_GET
 from django.views.decorators.http import require_POST
-from notifications.utils import send_notification
+from notifications.utils import send_notification, fan_out_notification
 from notifications.models import Notification, NotificationStatus
 from authentication.models import UserProfile
 from authentication.utils.tokens import get_user_profile, verify_user_profile
@@ -38,6 +38,11 @@ from authentication.utils.decorators import verified_email_required, role_requir
 from .forms import ProjectProfileForm, ProjectBudgetForm, QuotationUploadForm
 from django.http import HttpResponse
 from django.urls import resolve
+from .document_stats import get_document_stats
+from .document_listing import DOCUMENT_FIELDS, InvalidCursor, paginate_documents, parse_fields, parse_page_size
+from .file_serving import serve_stored_file
+from .project_listing import project_list_context, with_approved_schedule
+from .search import search_queryset
 from .models import ProjectProfile, ProjectFile, ProjectBudget, FundAllocation, ProjectStaging, ProjectType, ProjectScope, Expense, ProjectDocument, SupplierQuotation
 from manage_client.models import Client
 from django.core.files.storage import default_storage
@@ -237,116 +242,10 @@ def general_projects_list(request):
     if not verified_profile:
         return redirect("unauthorized")
 
-    # Use profile role
-    role = verified_profile.role
-
     try:
-        # Get filter parameters
-        show_archived = request.GET.get('archived') == '1'
-        status_filter = request.GET.get('status', '').strip()
-        search_query = request.GET.get('search', '').strip()
-
-        # Validate status filter
-        valid_statuses = ['PL', 'OG', 'CP', 'CN']
-        if status_filter and status_filter not in valid_statuses:
-            status_filter = ''
-
-        # Base query
-        projects = ProjectProfile.objects.filter(
-            archived=show_archived,
-            project_source="GC"
-        )
-
-        # Apply status filter
-        if status_filter:
-            projects = projects.filter(status=status_filter)
-
-        # Apply search filter with error handling
-        if search_query:
-            try:
-                projects = projects.filter(
-                    Q(project_name__icontains=search_query) |
-                    Q(project_id__icontains=search_query) |
-                    Q(location__icontains=search_query) |
-                    Q(client__company_name__icontains=search_query) |
-                    Q(client__contact_name__icontains=search_query)
-                )
-            except Exception as e:
-                print(f"Search filter error: {e}")
-                # If search fails, just filter by project name as fallback
-                projects = projects.filter(project_name__icontains=search_query)
-
-        # Order by status and creation date
-        projects = projects.order_by('-created_at')
-
-        # Attach approved schedule to each project
-        for project in projects:
-            approved_schedule = ProjectSchedule.objects.filter(
-                project=project,
-                status="APPROVED",
-                is_active=True
-            ).first()
-            project.approved_schedule = approved_schedule  # dynamically attach it
-
-        # Get pending projects for General Contractor
-        pending_projects = ProjectStaging.objects.filter(
-            status="PL",
-            is_draft=False,
-            project_data__project_source="GC"
-        ).order_by('-submitted_at')
-
-        # Get project managers for pending projects
-        pending_project_managers = {}
-        for pending_project in pending_projects:
-            if pending_project.project_data and isinstance(pending_project.project_data, dict):
-                manager_id = pending_project.project_data.get('project_manager_id')
-                if manager_id:
-                    try:
-                        from authentication.models import UserProfile
-                        manager = UserProfile.objects.get(id=manager_id)
-                        pending_project_managers[pending_project.id] = manager
-                    except UserProfile.DoesNotExist:
-                        pending_project_managers[pending_project.id] = None
-
-        # Calculate total approved budget
-        total_budget = projects.aggregate(
-            total=models.Sum('approved_budget')
-        )['total'] or 0
-
-        # Status choices for filter dropdown
-        status_choices = [
-            ('PL', 'Planned'),
-            ('OG', 'Ongoing'),
-            ('CP', 'Completed'),
-            ('CN', 'Cancelled'),
-        ]
-
-        # Count projects by status with error handling
-        try:
-            status_counts = {
-                'all': ProjectProfile.objects.filter(archived=show_archived, project_source="GC").count(),
-                'PL': ProjectProfile.objects.filter(archived=show_archived, project_source="GC", status='PL').count(),
-                'OG': ProjectProfile.objects.filter(archived=show_archived, project_source="GC", status='OG').count(),
-                'CP': ProjectProfile.objects.filter(archived=show_archived, project_source="GC", status='CP').count(),
-                'CN': ProjectProfile.objects.filter(archived=show_archived, project_source="GC", status='CN').count(),
-            }
-        except Exception as e:
-            print(f"Error counting projects by status: {e}")
-            status_counts = {'all': 0, 'PL': 0, 'OG': 0, 'CP': 0, 'CN': 0}
-
-        return render(request, "project_profiling/general_project_list.html", {
-            "projects": projects,
-            "pending_projects": pending_projects,
-            "pending_project_managers": pending_project_managers,
-            "url_name": resolve(request.path_info).url_name,
-            "project_type": "GC",
-            "show_archived": show_archived,
-            "total_budget": total_budget,
-            "status_filter": status_filter,
-            "search_query": search_query,
-            "status_choices": status_choices,
-            "status_counts": status_counts,
-        })
+        context = project_list_context(request, "GC")
+        context["url_name"] = resolve(request.path_info).url_name
+        return render(request, "project_profiling/general_project_list.html", context)
 
     except Exception as e:
         # Log the error
@@ -361,6 +260,7 @@ def general_projects_list(request):
         return render(request, "project_profiling/general_project_list.html", {
             "projects": ProjectProfile.objects.none(),
             "pending_projects": ProjectStaging.objects.none(),
+            "project_count": 0,
             "pending_project_managers": {},
             "url_name": resolve(request.path_info).url_name,
             "project_type": "GC",
@@ -413,10 +313,13 @@ def archived_projects_list(request, project_type):
     if not verified_profile:
         return redirect("unauthorized")
 
-    projects = ProjectProfile.objects.filter(archived=True, project_source=project_type)
+    projects = with_approved_schedule(
+        ProjectProfile.objects.filter(archived=True, project_source=project_type).select_related('project_manager__user')
+    )
     
     return render(request, "project_profiling/general_project_list.html", {
         "projects": projects,
+        "project_count": projects.count(),
         "project_type": project_type,
         
     })
@@ -427,116 +330,10 @@ def direct_projects_list(request):
     if not verified_profile:
         return redirect("unauthorized")
 
-    # Use profile role
-    role = verified_profile.role
-
     try:
-        # Get filter parameters
-        show_archived = request.GET.get('archived') == '1'
-        status_filter = request.GET.get('status', '').strip()
-        search_query = request.GET.get('search', '').strip()
-
-        # Validate status filter
-        valid_statuses = ['PL', 'OG', 'CP', 'CN']
-        if status_filter and status_filter not in valid_statuses:
-            status_filter = ''
-
-        # Base query
-        projects = ProjectProfile.objects.filter(
-            archived=show_archived,
-            project_source="DC"
-        )
-
-        # Apply status filter
-        if status_filter:
-            projects = projects.filter(status=status_filter)
-
-        # Apply search filter with error handling
-        if search_query:
-            try:
-                projects = projects.filter(
-                    Q(project_name__icontains=search_query) |
-                    Q(project_id__icontains=search_query) |
-                    Q(location__icontains=search_query) |
-                    Q(client__company_name__icontains=search_query) |
-                    Q(client__contact_name__icontains=search_query)
-                )
-            except Exception as e:
-                print(f"Search filter error: {e}")
-                # If search fails, just filter by project name as fallback
-                projects = projects.filter(project_name__icontains=search_query)
-
-        # Order by status and creation date
-        projects = projects.order_by('-created_at')
-
-        # Attach approved schedule to each project
-        for project in projects:
-            approved_schedule = ProjectSchedule.objects.filter(
-                project=project,
-                status="APPROVED",
-                is_active=True
-            ).first()
-            project.approved_schedule = approved_schedule
-
-        # Get pending projects for Direct Client
-        pending_projects = ProjectStaging.objects.filter(
-            status="PL",
-            is_draft=False,
-            project_data__project_source="DC"
-        ).order_by('-submitted_at')
-
-        # Get project managers for pending projects
-        pending_project_managers = {}
-        for pending_project in pending_projects:
-            if pending_project.project_data and isinstance(pending_project.project_data, dict):
-                manager_id = pending_project.project_data.get('project_manager_id')
-                if manager_id:
-                    try:
-                        from authentication.models import UserProfile
-                        manager = UserProfile.objects.get(id=manager_id)
-                        pending_project_managers[pending_project.id] = manager
-                    except UserProfile.DoesNotExist:
-                        pending_project_managers[pending_project.id] = None
-
-        # Calculate total approved budget
-        total_budget = projects.aggregate(
-            total=models.Sum('approved_budget')
-        )['total'] or 0
-
-        # Status choices for filter dropdown
-        status_choices = [
-            ('PL', 'Planned'),
-            ('OG', 'Ongoing'),
-            ('CP', 'Completed'),
-            ('CN', 'Cancelled'),
-        ]
-
-        # Count projects by status with error handling
-        try:
-            status_counts = {
-                'all': ProjectProfile.objects.filter(archived=show_archived, project_source="DC").count(),
-                'PL': ProjectProfile.objects.filter(archived=show_archived, project_source="DC", status='PL').count(),
-                'OG': ProjectProfile.objects.filter(archived=show_archived, project_source="DC", status='OG').count(),
-                'CP': ProjectProfile.objects.filter(archived=show_archived, project_source="DC", status='CP').count(),
-                'CN': ProjectProfile.objects.filter(archived=show_archived, project_source="DC", status='CN').count(),
-            }
-        except Exception as e:
-            print(f"Error counting projects by status: {e}")
-            status_counts = {'all': 0, 'PL': 0, 'OG': 0, 'CP': 0, 'CN': 0}
-
-        return render(request, "project_profiling/direct_project_list.html", {
-            "projects": projects,
-            "pending_projects": pending_projects,
-            "pending_project_managers": pending_project_managers,
-            "url_name": resolve(request.path_info).url_name,
-            "project_type": "DC",
-            "show_archived": show_archived,
-            "total_budget": total_budget,
-            "status_filter": status_filter,
-            "search_query": search_query,
-            "status_choices": status_choices,
-            "status_counts": status_counts,
-        })
+        context = project_list_context(request, "DC")
+        context["url_name"] = resolve(request.path_info).url_name
+        return render(request, "project_profiling/direct_project_list.html", context)
 
     except Exception as e:
         # Log the error
@@ -551,6 +348,7 @@ def direct_projects_list(request):
         return render(request, "project_profiling/direct_project_list.html", {
             "projects": ProjectProfile.objects.none(),
             "pending_projects": ProjectStaging.objects.none(),
+            "project_count": 0,
             "pending_project_managers": {},
             "url_name": resolve(request.path_info).url_name,
             "project_type": "DC",
@@ -1511,27 +1309,16 @@ def review_pending_project(request, project_id):
                     print(f"DEBUG: Error contributing to cost learning: {e}")
 
                 # --- Create notifications ---
-                from notifications.models import Notification, NotificationStatus
-                oms = UserProfile.objects.filter(role="OM")
-                print(f"DEBUG: Found {oms.count()} OMs")
-                if oms.exists():
-                    # Create the notification
-                    notif = Notification.objects.create(
-                        message=f"A new project '{new_profile.project_name}' has been approved.",
-                        link=f"/projects/{new_profile.pk}/details/",
-                        role="OM",  # Target OMs
-                    )
-                    print(f"DEBUG: Notification created ID={notif.id}")
-
-                    # Create notification status for each OM
-                    for om in oms:
-                        NotificationStatus.objects.create(
-                            notification=notif,
-                            user=om,
-                            is_read=False,
-                            cleared=False
-                        )
-                        print(f"DEBUG: Notification status created for OM: {om.full_name}")
+                from notifications.models import Notification
+                notif = Notification.objects.create(
+                    message=f"A new project '{new_profile.project_name}' has been approved.",
+                    link=f"/projects/{new_profile.pk}/details/",
+                    role="OM",  # Target OMs
+                )
+                print(f"DEBUG: Notification created ID={notif.id}")
+
+                # Recipients are resolved by the queued fan-out
+                fan_out_notification(notif, roles=["OM"], defer=True)
 
                 # --- Delete staging project ---
                 project.delete()
@@ -3267,96 +3054,7 @@ def api_document_stats(request):
     """Get document statistics"""
     try:
         user_profile = request.user.userprofile
-
-        # Filter documents based on user role
-        if user_profile.role in ['EG', 'OM']:
-            documents = ProjectDocument.objects.all()
-        elif user_profile.role == 'PM':
-            documents = ProjectDocument.objects.filter(
-                Q(project__project_manager=user_profile) |
-                Q(project_staging__created_by=user_profile)
-            )
-        else:
-            documents = ProjectDocument.objects.none()
-
-        # Calculate stats
-        total_documents = documents.count()
-        contracts = documents.filter(document_type='CONTRACT').count()
-        reports = documents.filter(document_type='REPORT').count()
-        quotations_count = documents.filter(document_type='QUOTATION').count()
-
-        # Calculate total size
-        total_size_bytes = documents.aggregate(
-            total=Sum('file_size')
-        )['total'] or 0
-
-        # Add old system documents to stats
-        from .models import ProjectProfile, SupplierQuotation
-
-        # Get old system documents based on user role
-        if user_profile.role in ['EG', 'OM']:
-            old_projects = ProjectProfile.objects.filter(
-                Q(contract_agreement__isnull=False) | Q(permits_licenses__isnull=False)
-            ).exclude(
-                Q(contract_agreement='') | Q(permits_licenses='')
-            )
-        elif user_profile.role == 'PM':
-            old_projects = ProjectProfile.objects.filter(
-                Q(contract_agreement__isnull=False) | Q(permits_licenses__isnull=False)
-            ).exclude(
-                Q(contract_agreement='') | Q(permits_licenses='')
-            ).filter(project_manager=user_profile)
-        else:
-            old_projects = ProjectProfile.objects.none()
-
-        # Count old system documents
-        old_contracts = old_projects.filter(contract_agreement__isnull=False).exclude(contract_agreement='').count()
-        old_permits = old_projects.filter(permits_licenses__isnull=False).exclude(permits_licenses='').count()
-
-        # Count BOQ documents
-        if user_profile.role in ['EG', 'OM']:
-            boq_count = ProjectProfile.objects.filter(boq_items__isnull=False).exclude(boq_items={}).count()
-        elif user_profile.role == 'PM':
-            boq_count = ProjectProfile.objects.filter(
-                boq_items__isnull=False,
-                project_manager=user_profile
-            ).exclude(boq_items={}).count()
-        else:
-            boq_count = 0
-
-        # Count approved quotations
-        if user_profile.role in ['EG', 'OM']:
-            approved_quotations_count = SupplierQuotation.objects.filter(status='APPROVED').count()
-        elif user_profile.role == 'PM':
-            pm_project_ids = ProjectProfile.objects.filter(project_manager=user_profile).values_list('id', flat=True)
-            approved_quotations_count = SupplierQuotation.objects.filter(
-                status='APPROVED',
-                project_type='profile',
-                project_id__in=pm_project_ids
-            ).count()
-        else:
-            approved_quotations_count = 0
-
-        # Update totals
-        total_documents += old_contracts + old_permits + boq_count + approved_quotations_count
-        contracts += old_contracts
-        quotations_count += approved_quotations_count
-
-        # Convert to MB
-        total_size_mb = total_size_bytes / (1024 * 1024)
-        if total_size_mb >= 1000:
-            total_size = f"{total_size_mb / 1024:.1f} GB"
-        else:
-            total_size = f"{total_size_mb:.1f} MB"
-
-        return JsonResponse({
-            'total_documents': total_documents,
-            'contracts': contracts,
-            'reports': reports,
-            'quotations': quotations_count,
-            'boq_documents': boq_count,
-            'total_size': total_size
-        })
+        return JsonResponse(get_document_stats(user_profile))
 
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
@@ -3387,11 +3085,8 @@ def api_documents_list(request):
         # Apply filters
         search = request.GET.get('search', '').strip()
         if search:
-            documents = documents.filter(
-                Q(title__icontains=search) |
-                Q(description__icontains=search) |
-                Q(tags__icontains=search)
-            )
+            # Results stay in upload order so the keyset cursor keeps working
+            documents = search_queryset(documents, 'document', search, ranked=False)
 
         doc_type = request.GET.get('type', 'ALL')
         if doc_type and doc_type != 'ALL':
@@ -3416,50 +3111,24 @@ def api_documents_list(request):
         if not show_archived:
             documents = documents.filter(is_archived=False)
 
-        # Order by most recent
-        documents = documents.order_by('-uploaded_at')
-
-        # Format response
-        data = []
-        for doc in documents:
-            # Get file extension
-            file_extension = ''
-            if doc.file:
-                file_extension = doc.file.name.split('.')[-1] if '.' in doc.file.name else ''
-
-            # Format file size
-            file_size = doc.file_size or 0
-            if file_size >= 1024 * 1024:
-                file_size_str = f"{file_size / (1024 * 1024):.1f} MB"
-            elif file_size >= 1024:
-                file_size_str = f"{file_size / 1024:.1f} KB"
-            else:
-                file_size_str = f"{file_size} Bytes"
-
-            # Get project name from either project or project_staging
-            if doc.project:
-                project_name = doc.project.project_name
-            elif doc.project_staging:
-                project_name = f"{doc.project_staging.project_data.get('project_name', 'Unnamed')} (Pending)"
-            else:
-                project_name = 'N/A'
+        # One keyset page, newest first; ?cursor= continues from the previous page
+        fields = parse_fields(request.GET.get('fields'))
+        cursor = request.GET.get('cursor', '').strip()
+        try:
+            data, next_cursor = paginate_documents(
+                documents, fields,
+                cursor=cursor or None,
+                page_size=parse_page_size(request.GET.get('limit'))
+            )
+        except InvalidCursor as e:
+            return JsonResponse({'error': str(e)}, status=400)
 
-            data.append({
-                'id': doc.id,
-                'title': doc.title,
-                'description': doc.description,
-                'document_type': doc.document_type,
-                'document_type_display': doc.get_document_type_display(),
-                'project_stage': doc.project_stage,
-                'project_stage_display': doc.get_project_stage_display(),
-                'project_name': project_name,
-                'version': doc.version,
-                'file_size': file_size_str,
-                'file_extension': file_extension,
-                'uploaded_by': doc.uploaded_by.full_name if doc.uploaded_by else 'Unknown',
-                'uploaded_at': localtime(doc.uploaded_at).strftime('%b %d, %Y %I:%M %p'),
-                'tags': doc.tags or '',
-                'is_archived': doc.is_archived
+        if cursor:
+            # BOQs, quotations and old-system files are only listed with the first page
+            return JsonResponse({
+                'documents': data,
+                'count': len(data),
+                'next_cursor': next_cursor
             })
 
         # Add old system documents (contracts and permits stored directly on projects)
@@ -3648,15 +3317,16 @@ def api_documents_list(request):
 
         # Apply document type filter
         if doc_type == 'ALL' or doc_type == 'QUOTATION':
+            approved_quotations = list(approved_quotations.select_related('uploaded_by__user'))
+            quotation_project_names = dict(ProjectProfile.objects.filter(
+                id__in=[q.project_id for q in approved_quotations if q.project_type == 'profile']
+            ).values_list('id', 'project_name'))
+
             for quotation in approved_quotations:
                 # Get project name
-                try:
-                    if quotation.project_type == 'profile':
-                        project_obj = ProjectProfile.objects.get(id=quotation.project_id)
-                        project_name = project_obj.project_name
-                    else:
-                        project_name = 'N/A'
-                except ProjectProfile.DoesNotExist:
+                if quotation.project_type == 'profile':
+                    project_name = quotation_project_names.get(quotation.project_id, 'N/A')
+                else:
                     project_name = 'N/A'
 
                 # Get file size
@@ -3697,9 +3367,16 @@ def api_documents_list(request):
                     'download_url': quotation.quotation_file.url if quotation.quotation_file else None
                 })
 
+        # Honour ?fields= for the extra entries too; their is_boq/old_system/... markers are always kept
+        data = [
+            {key: value for key, value in row.items() if key in fields or key not in DOCUMENT_FIELDS}
+            for row in data
+        ]
+
         return JsonResponse({
             'documents': data,
-            'count': len(data)
+            'count': len(data),
+            'next_cursor': next_cursor
         })
 
     except Exception as e:
@@ -4085,9 +3762,14 @@ def api_document_download(request, doc_id):
 
             # Serve the quotation file
             if quotation.quotation_file:
-                response = HttpResponse(quotation.quotation_file.read(), content_type='application/octet-stream')
-                response['Content-Disposition'] = f'attachment; filename="{os.path.basename(quotation.quotation_file.name)}"'
-                return response
+                try:
+                    return serve_stored_file(
+                        request, quotation.quotation_file,
+                        last_modified=quotation.date_submitted,
+                        content_type='application/octet-stream'
+                    )
+                except FileNotFoundError:
+                    return HttpResponse('File not found', status=404)
             else:
                 return HttpResponse('File not found', status=404)
 
@@ -4111,9 +3793,14 @@ def api_document_download(request, doc_id):
 
         # Serve the file
         if document.file:
-            response = HttpResponse(document.file.read(), content_type='application/octet-stream')
-            response['Content-Disposition'] = f'attachment; filename="{os.path.basename(document.file.name)}"'
-            return response
+            try:
+                return serve_stored_file(
+                    request, document.file,
+                    last_modified=document.uploaded_at,
+                    content_type='application/octet-stream'
+                )
+            except FileNotFoundError:
+                return HttpResponse('File not found', status=404)
         else:
             return HttpResponse('File not found', status=404)
 
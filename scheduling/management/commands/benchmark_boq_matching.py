@@ -0,0 +1,75 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from scheduling.task_creator import BOQTaskMatcher, is_task_match
+
+WORDS = [
+    "concrete", "formwork", "rebar", "masonry", "plaster", "tiles", "paint", "ceiling",
+    "roofing", "gutter", "door", "window", "plumbing", "pipes", "fixtures", "wiring",
+    "conduit", "panel", "lighting", "excavation", "backfill", "footing", "column", "beam",
+    "slab", "wall", "partition", "waterproofing", "insulation", "scaffolding", "mobilization",
+    "demobilization", "survey", "layout", "drainage", "septic", "tank", "railings", "stairs",
+    "flooring",
+]
+FILLER = ["and", "of", "the", "supply", "installation", "with", "for", "complete"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark linking BOQ items to schedule tasks: pairwise is_task_match() "
+        "against the inverted-index BOQTaskMatcher on synthetic data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=300, help="Number of tasks (default: 300)")
+        parser.add_argument("--items", type=int, default=3000, help="Number of BOQ lines (default: 3000)")
+        parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+
+        def phrase(min_words, max_words):
+            words = rng.sample(WORDS, rng.randint(min_words, max_words))
+            if rng.random() < 0.5:
+                words.insert(rng.randrange(len(words) + 1), rng.choice(FILLER))
+            return " ".join(words)
+
+        groups = [phrase(1, 2).title() for _ in range(max(options["items"] // 20, 1))]
+        boq_items = [
+            {
+                "code": f"{i // 100 + 1}.{i // 20 % 5 + 1}.{i + 1}",
+                "task_group": rng.choice(groups),
+                "description": f"{phrase(2, 6)} - {rng.randint(1, 500)} sq.m.",
+            }
+            for i in range(options["items"])
+        ]
+        task_names = [
+            rng.choice(groups) if rng.random() < 0.3 else phrase(1, 4).title()
+            for _ in range(options["tasks"])
+        ]
+
+        start = time.perf_counter()
+        pairwise = [
+            [item["code"] for item in boq_items
+             if is_task_match(name, item["task_group"], item["description"])]
+            for name in task_names
+        ]
+        pairwise_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matcher = BOQTaskMatcher(boq_items)
+        indexed = [[item["code"] for item in matcher.match(name)] for name in task_names]
+        indexed_elapsed = time.perf_counter() - start
+
+        links = sum(len(codes) for codes in indexed)
+        self.stdout.write(f"{options['tasks']} tasks x {options['items']} BOQ lines, {links} links")
+        self.stdout.write(f"{'pairwise':>10} {pairwise_elapsed * 1000:>10.1f} ms")
+        self.stdout.write(f"{'indexed':>10} {indexed_elapsed * 1000:>10.1f} ms")
+
+        if pairwise == indexed:
+            self.stdout.write(self.style.SUCCESS("Matches are identical."))
+        else:
+            mismatched = sum(1 for a, b in zip(pairwise, indexed) if a != b)
+            self.stdout.write(self.style.ERROR(f"Matches differ for {mismatched} task(s)."))
@@ -0,0 +1,99 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from project_profiling.models import ProjectProfile
+from scheduling.models import WeeklyProgressReport
+
+
+class _Rollback(Exception):
+    """Raised to discard the benchmark fixtures once a run has been measured"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark cumulative total recalculation when the first of a project's "
+        "weekly progress reports is approved. All generated data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reports",
+            type=int,
+            default=200,
+            help="Number of weekly reports in the project (default: 200)",
+        )
+
+    def handle(self, *args, **options):
+        count = options["reports"]
+
+        self.stdout.write(f"{'method':>22} {'queries':>8} {'ms':>10}")
+        results = {}
+        for label, run in (
+            ("per-report aggregate", self.approve_per_report),
+            ("prefix sum", self.approve_with_prefix_sum),
+        ):
+            try:
+                with transaction.atomic():
+                    first = self.create_reports(count)
+                    with CaptureQueriesContext(connection) as ctx:
+                        start = time.perf_counter()
+                        run(first)
+                        elapsed = time.perf_counter() - start
+                    results[label] = list(
+                        WeeklyProgressReport.objects.filter(project_id=first.project_id)
+                        .order_by("report_number")
+                        .values_list("cumulative_project_amount", "cumulative_project_percent")
+                    )
+                    raise _Rollback
+            except _Rollback:
+                pass
+            self.stdout.write(f"{label:>22} {len(ctx.captured_queries):>8} {elapsed * 1000:>10.1f}")
+
+        if results["per-report aggregate"] == results["prefix sum"]:
+            self.stdout.write(self.style.SUCCESS(f"Cumulative totals match for all {count} reports."))
+        else:
+            self.stdout.write(self.style.ERROR("Cumulative totals differ between the two methods."))
+
+    def create_reports(self, count):
+        today = date.today()
+        project = ProjectProfile.objects.create(
+            project_name="Benchmark Progress Project",
+            project_source="GC",
+            location="Benchmark Site",
+            start_date=today - timedelta(weeks=count),
+            target_completion_date=today,
+            approved_budget=Decimal("50000000"),
+            status="OG",
+        )
+        first_week = today - timedelta(weeks=count)
+        WeeklyProgressReport.objects.bulk_create([
+            WeeklyProgressReport(
+                project=project,
+                week_start_date=first_week + timedelta(weeks=i),
+                week_end_date=first_week + timedelta(weeks=i, days=6),
+                report_number=i + 1,
+                total_period_amount=Decimal("125000.00") + i,
+                total_period_percent=Decimal("0.25"),
+            )
+            for i in range(count)
+        ])
+        return WeeklyProgressReport.objects.get(project=project, report_number=1)
+
+    def approve_per_report(self, report):
+        """The previous approval path: one aggregate and save per later pending report"""
+        report.status = "A"
+        report.save()
+        report.calculate_totals()
+        for later in WeeklyProgressReport.objects.filter(
+            project=report.project, status="P", report_number__gt=report.report_number
+        ).order_by("report_number"):
+            later.calculate_totals()
+        report._update_project_progress()
+
+    def approve_with_prefix_sum(self, report):
+        report.approve(reviewer=None)
@@ -148,6 +148,23 @@ class ProjectTask(models.Model):
         self.project.save(update_fields=["progress"])
         return project_progress
 
+    @staticmethod
+    def map_boq_codes_to_tasks(project):
+        """
+        Map every BOQ item code linked to the project's tasks to its task, in one
+        query. A code linked to several tasks maps to the lowest task id, like
+        filter(boq_item_codes__contains=[code]).first().
+        """
+        code_to_task = {}
+        tasks = ProjectTask.objects.filter(project=project).order_by('pk').only(
+            'id', 'project_id', 'start_date', 'end_date', 'boq_item_codes'
+        )
+        for task in tasks:
+            for code in task.boq_item_codes or []:
+                if isinstance(code, str):
+                    code_to_task.setdefault(code, task)
+        return code_to_task
+
     def get_linked_boq_items(self):
         """
         Get BOQ items from project's BOQ that are linked to this task.
@@ -156,12 +173,7 @@ class ProjectTask(models.Model):
         if not self.boq_item_codes or not self.project.boq_items:
             return []
 
-        linked_items = []
-        for item in self.project.boq_items:
-            if item.get('code') in self.boq_item_codes:
-                linked_items.append(item)
-
-        return linked_items
+        return self.project.boq_index.items_for_codes(self.boq_item_codes)
 
     def calculate_approved_contract_amount(self):
         """
@@ -843,16 +855,14 @@ class WeeklyProgressReport(models.Model):
 
         super().save(*args, **kwargs)
 
-    def calculate_totals(self):
-        """
-        Calculate cumulative amounts based on period progress from Excel upload.
-        Period totals (total_period_amount, total_period_percent) are already set
-        from the Excel file during report creation.
+    # Statuses whose period progress counts towards later reports' cumulative totals
+    CUMULATIVE_STATUSES = ('A', 'P')
 
-        This method only recalculates cumulative values by summing previous reports.
+    def _apply_cumulative_totals(self, previous_amount, previous_percent, total_project_budget):
+        """
+        Set cumulative_project_amount/percent from the period totals of the
+        earlier approved or pending reports plus this report's period progress.
         """
-        from django.db.models import Sum
-
         # Period totals are already set from Excel upload - don't recalculate them
         # Just ensure they're not None
         if self.total_period_amount is None:
@@ -860,43 +870,103 @@ class WeeklyProgressReport(models.Model):
         if self.total_period_percent is None:
             self.total_period_percent = 0
 
-        # Calculate cumulative by summing period progress from previous APPROVED or PENDING reports
-        # plus THIS report's period progress (to show what cumulative WILL BE if approved)
-        # We include PENDING reports so users can see the overall cumulative progress
-        previous_reports_totals = WeeklyProgressReport.objects.filter(
-            project=self.project,
-            status__in=['A', 'P'],  # Include both Approved and Pending
-            report_number__lt=self.report_number  # Less than, not less than or equal
-        ).aggregate(
-            total_period_amount=Sum('total_period_amount'),
-            total_period_percent=Sum('total_period_percent')
-        )
-
         # Cumulative amount = Previous reports + THIS report's period progress
-        previous_amount = previous_reports_totals['total_period_amount'] or 0
         self.cumulative_project_amount = previous_amount + self.total_period_amount
 
         # Cumulative percent = (cumulative amount / total project budget) * 100
         # Use project's approved budget, NOT sum of period percentages
-        total_project_budget = self.project.approved_budget or 0
         if total_project_budget > 0:
-            # Calculate cumulative percent based on cumulative amount
             # This ensures consistency: cumulative % = cumulative amount / budget
             self.cumulative_project_percent = (self.cumulative_project_amount / total_project_budget) * 100
         else:
             # Fallback: sum the period percentages if budget not available
             # However, this should not be used as it causes inconsistency
-            previous_percent = previous_reports_totals['total_period_percent'] or 0
             self.cumulative_project_percent = previous_percent + self.total_period_percent
 
         # Round to 2 decimal places to avoid floating point precision issues
         self.cumulative_project_percent = round(float(self.cumulative_project_percent), 2)
 
+    def calculate_totals(self):
+        """
+        Calculate cumulative amounts based on period progress from Excel upload.
+        Period totals (total_period_amount, total_period_percent) are already set
+        from the Excel file during report creation.
+
+        This method only recalculates cumulative values by summing previous reports.
+        """
+        from django.db.models import Sum
+
+        # Calculate cumulative by summing period progress from previous APPROVED or PENDING reports
+        # plus THIS report's period progress (to show what cumulative WILL BE if approved)
+        # We include PENDING reports so users can see the overall cumulative progress
+        previous_reports_totals = WeeklyProgressReport.objects.filter(
+            project=self.project,
+            status__in=self.CUMULATIVE_STATUSES,  # Include both Approved and Pending
+            report_number__lt=self.report_number  # Less than, not less than or equal
+        ).aggregate(
+            total_period_amount=Sum('total_period_amount'),
+            total_period_percent=Sum('total_period_percent')
+        )
+
+        self._apply_cumulative_totals(
+            previous_reports_totals['total_period_amount'] or 0,
+            previous_reports_totals['total_period_percent'] or 0,
+            self.project.approved_budget or 0,
+        )
+
         self.save(update_fields=[
             'cumulative_project_amount',
             'cumulative_project_percent'
         ])
 
+    def recalculate_subsequent_totals(self, include_self=True):
+        """
+        Recalculate cumulative totals for the pending reports after this one
+        (and this report itself when include_self is set).
+
+        Walks the project's reports once in report_number order keeping running
+        sums of the approved/pending period totals, so every affected report is
+        updated from a prefix sum and saved in a single bulk_update instead of
+        one aggregate and save per report. Returns the number of reports updated.
+        """
+        from itertools import groupby
+
+        reports = WeeklyProgressReport.objects.filter(
+            project_id=self.project_id
+        ).order_by('report_number', 'pk').only(
+            'id', 'project_id', 'report_number', 'status',
+            'total_period_amount', 'total_period_percent',
+            'cumulative_project_amount', 'cumulative_project_percent',
+        )
+
+        total_project_budget = self.project.approved_budget or 0
+        previous_amount = Decimal('0')
+        previous_percent = Decimal('0')
+        to_update = []
+
+        for report_number, group in groupby(reports, key=lambda r: r.report_number):
+            # Reports sharing a number don't count towards each other (report_number__lt)
+            group = [self if report.pk == self.pk else report for report in group]
+
+            for report in group:
+                if report is self:
+                    affected = include_self
+                else:
+                    affected = report.status == 'P' and report_number > self.report_number
+                if affected:
+                    report._apply_cumulative_totals(previous_amount, previous_percent, total_project_budget)
+                    to_update.append(report)
+
+            for report in group:
+                if report.status in self.CUMULATIVE_STATUSES:
+                    previous_amount += report.total_period_amount or 0
+                    previous_percent += report.total_period_percent or 0
+
+        WeeklyProgressReport.objects.bulk_update(
+            to_update, ['cumulative_project_amount', 'cumulative_project_percent']
+        )
+        return len(to_update)
+
     def validate_against_schedule(self):
         """
         Validate this progress report against the approved project schedule.
@@ -945,18 +1015,8 @@ class WeeklyProgressReport(models.Model):
         self.save()
 
         # Recalculate cumulative totals for this report (now that it's approved)
-        self.calculate_totals()
-
-        # Recalculate cumulative totals for any subsequent pending reports
-        # so they reflect the newly approved report in their cumulative calculations
-        subsequent_reports = WeeklyProgressReport.objects.filter(
-            project=self.project,
-            status='P',
-            report_number__gt=self.report_number
-        ).order_by('report_number')
-
-        for report in subsequent_reports:
-            report.calculate_totals()
+        # and for any subsequent pending reports so they reflect it
+        self.recalculate_subsequent_totals()
 
         # Update project progress based on this approved report
         self._update_project_progress()
@@ -979,47 +1039,52 @@ class WeeklyProgressReport(models.Model):
 
         # Recalculate cumulative totals for any subsequent pending reports
         # since this report is now rejected and shouldn't be included
-        subsequent_reports = WeeklyProgressReport.objects.filter(
-            project=self.project,
-            status='P',
-            report_number__gt=self.report_number
-        ).order_by('report_number')
-
-        for report in subsequent_reports:
-            report.calculate_totals()
+        self.recalculate_subsequent_totals(include_self=False)
 
     def _update_task_progress(self):
         """
         Update ProjectTask progress by aggregating approved BOQ items.
+
+        A task's progress is the average cumulative percent of the latest
+        approved record of each of its BOQ item codes. The latest records for
+        every task touched by this report are picked in one windowed query and
+        the tasks are written back with a single bulk_update.
         """
-        from django.db.models import Sum, Avg
+        from collections import defaultdict
+        from django.db.models import F, Window
+        from django.db.models.functions import RowNumber
         from project_profiling.models import BOQItemProgress
 
-        # Get all unique tasks linked to BOQ items in this report
-        boq_items = BOQItemProgress.objects.filter(
+        # Tasks linked to approved BOQ items in this report
+        affected_tasks = BOQItemProgress.objects.filter(
             weekly_report=self,
             status='A',
             project_task__isnull=False
-        )
+        ).values('project_task_id')
 
-        tasks_to_update = set(item.project_task for item in boq_items if item.project_task)
-
-        for task in tasks_to_update:
-            # Get all approved BOQ items for this task
-            task_boq_items = BOQItemProgress.objects.filter(
-                project=self.project,
-                project_task=task,
-                status='A'
-            ).order_by('boq_item_code', '-report_date').distinct('boq_item_code')
+        # Latest approved record per (task, BOQ item code)
+        latest_items = BOQItemProgress.objects.filter(
+            project=self.project,
+            project_task_id__in=affected_tasks,
+            status='A'
+        ).annotate(
+            row_number=Window(
+                expression=RowNumber(),
+                partition_by=[F('project_task_id'), F('boq_item_code')],
+                order_by=[F('report_date').desc(), F('pk').desc()],
+            )
+        ).filter(row_number=1).values_list('project_task_id', 'cumulative_percent')
 
-            # Calculate weighted average progress
-            if task_boq_items.exists():
-                avg_progress = task_boq_items.aggregate(
-                    avg=Avg('cumulative_percent')
-                )['avg'] or 0
+        percents_by_task = defaultdict(list)
+        for task_id, cumulative_percent in latest_items:
+            percents_by_task[task_id].append(cumulative_percent or 0)
 
-                task.progress = round(avg_progress, 2)
-                task.save(update_fields=['progress'])
+        tasks = [
+            ProjectTask(pk=task_id, progress=round(sum(percents) / len(percents), 2))
+            for task_id, percents in percents_by_task.items()
+        ]
+        ProjectTask.objects.bulk_update(tasks, ['progress'])
+        return len(tasks)
 
     def _update_project_progress(self):
         """
@@ -10,6 +10,7 @@ from django.db import transaction
 from .models import ProjectTask, ProjectScope
 import logging
 import re
+from collections import Counter
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,9 @@ class TaskCreator:
         self.created_tasks = []
         self.errors = []
         self.boq_items = self._get_boq_items()
+        self._normalized_divisions = None
+        self._scope_items = {}
+        self._scope_matchers = {}
 
     @transaction.atomic
     def create_tasks(self):
@@ -160,22 +164,47 @@ class TaskCreator:
             return []
 
         boq_items = []
-        for item in self.project.boq_items:
-            # Only get level 2 items (actual materials/activities with quantities)
-            level = item.get('level', 0)
-            if level == 2:  # Level 2 items like 1.1.1, 7.1.3
-                boq_items.append({
-                    'code': item.get('code', ''),
-                    'description': item.get('description', ''),
-                    'division': item.get('division', ''),
-                    'task_group': item.get('task', ''),
-                    'amount': item.get('amount', 0),
-                    'quantity': item.get('quantity', 0),
-                    'uom': item.get('uom', '')
-                })
+        # Only get level 2 items (actual materials/activities with quantities)
+        # Level 2 items like 1.1.1, 7.1.3
+        for item in self.project.boq_index.level_items(2):
+            boq_items.append({
+                'code': item.get('code', ''),
+                'description': item.get('description', ''),
+                'division': item.get('division', ''),
+                'task_group': item.get('task', ''),
+                'amount': item.get('amount', 0),
+                'quantity': item.get('quantity', 0),
+                'uom': item.get('uom', '')
+            })
 
         return boq_items
 
+    def _get_boq_items_for_scope(self, scope_name):
+        """
+        BOQ items whose division matches the scope name, in BOQ order.
+
+        Divisions are normalized once and the result is cached per scope, so
+        tasks in the same scope don't rescan the whole BOQ.
+        """
+        normalized_scope = self._normalize_text(scope_name)
+        if normalized_scope not in self._scope_items:
+            if self._normalized_divisions is None:
+                self._normalized_divisions = [
+                    self._normalize_text(boq_item['division']) for boq_item in self.boq_items
+                ]
+
+            matching_divisions = {
+                division for division in set(self._normalized_divisions)
+                if normalized_scope in division or division in normalized_scope
+            }
+            self._scope_items[normalized_scope] = [
+                boq_item
+                for boq_item, division in zip(self.boq_items, self._normalized_divisions)
+                if division in matching_divisions
+            ]
+
+        return self._scope_items[normalized_scope]
+
     def _link_boq_items_to_task(self, task, scope_name):
         """
         Auto-link BOQ items to a task based on matching criteria.
@@ -195,94 +224,160 @@ class TaskCreator:
         if not self.boq_items:
             return []
 
-        linked_codes = []
+        # Only BOQ items whose division matches the scope are candidates;
+        # the scope's matcher then checks task name similarity
+        matcher = self._get_matcher_for_scope(scope_name)
+        return [boq_item['code'] for boq_item in matcher.match(task.task_name)]
 
-        # Normalize scope name for matching
+    def _get_matcher_for_scope(self, scope_name):
+        """BOQTaskMatcher over the scope's candidate BOQ items, built once per scope"""
         normalized_scope = self._normalize_text(scope_name)
-
-        for boq_item in self.boq_items:
-            # Check if division matches scope
-            normalized_division = self._normalize_text(boq_item['division'])
-
-            if normalized_scope in normalized_division or normalized_division in normalized_scope:
-                # Division matches, now check task name similarity
-                if self._is_task_match(task.task_name, boq_item['task_group'], boq_item['description']):
-                    linked_codes.append(boq_item['code'])
-
-        return linked_codes
+        if normalized_scope not in self._scope_matchers:
+            self._scope_matchers[normalized_scope] = BOQTaskMatcher(
+                self._get_boq_items_for_scope(scope_name)
+            )
+        return self._scope_matchers[normalized_scope]
 
     def _is_task_match(self, task_name, boq_task_group, boq_description):
         """
         Check if BOQ item matches the task based on name and description.
+        See is_task_match().
+        """
+        return is_task_match(task_name, boq_task_group, boq_description)
 
-        Args:
-            task_name: Name of the ProjectTask
-            boq_task_group: Task group from BOQ (e.g., "Site Mobilization")
-            boq_description: Description of BOQ item
+    def _normalize_text(self, text):
+        """Normalize text for comparison. See normalize_text()."""
+        return normalize_text(text)
 
-        Returns:
-            bool: True if there's a match
-        """
-        # Normalize all strings
-        norm_task = self._normalize_text(task_name)
-        norm_group = self._normalize_text(boq_task_group)
-        norm_desc = self._normalize_text(boq_description)
+    def _extract_keywords(self, text):
+        """Extract meaningful keywords from text. See extract_keywords()."""
+        return extract_keywords(text)
 
-        # Direct match with task group
-        if norm_task == norm_group:
-            return True
 
-        # Check if task name contains task group or vice versa
-        if norm_task in norm_group or norm_group in norm_task:
-            return True
+STOP_WORDS = frozenset({
+    'the', 'and', 'or', 'of', 'to', 'in', 'for', 'a', 'an',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'with', 'at', 'by', 'from', 'as', 'all', 'any',
+    'complete', 'supply', 'delivery', 'installation'
+})
 
-        # Extract keywords from task name and check against description
-        task_keywords = self._extract_keywords(norm_task)
-        desc_keywords = self._extract_keywords(norm_desc)
+SPECIAL_CHARS_RE = re.compile(r'[^\w\s]')
+WHITESPACE_RE = re.compile(r'\s+')
 
-        # If 2 or more keywords match, consider it a match
-        matching_keywords = task_keywords.intersection(desc_keywords)
-        if len(matching_keywords) >= 2:
-            return True
+# Number of shared description keywords that makes a BOQ item match a task
+MIN_MATCHING_KEYWORDS = 2
 
-        return False
 
-    def _normalize_text(self, text):
-        """
-        Normalize text for comparison.
-        Converts to lowercase and removes special characters.
-        """
-        if not text:
-            return ""
+def normalize_text(text):
+    """
+    Normalize text for comparison.
+    Converts to lowercase and removes special characters.
+    """
+    if not text:
+        return ""
 
-        # Convert to lowercase
-        text = text.lower()
+    # Convert to lowercase
+    text = text.lower()
 
-        # Remove special characters and extra whitespace
-        text = re.sub(r'[^\w\s]', ' ', text)
-        text = re.sub(r'\s+', ' ', text)
+    # Remove special characters and extra whitespace
+    text = SPECIAL_CHARS_RE.sub(' ', text)
+    text = WHITESPACE_RE.sub(' ', text)
 
-        return text.strip()
+    return text.strip()
 
-    def _extract_keywords(self, text):
-        """
-        Extract meaningful keywords from text.
-        Removes common stop words.
-        """
-        stop_words = {
-            'the', 'and', 'or', 'of', 'to', 'in', 'for', 'a', 'an',
-            'is', 'are', 'was', 'were', 'be', 'been', 'being',
-            'with', 'at', 'by', 'from', 'as', 'all', 'any',
-            'complete', 'supply', 'delivery', 'installation'
-        }
 
-        # Split into words
-        words = text.split()
+def extract_keywords(text):
+    """
+    Extract meaningful keywords from text.
+    Removes common stop words.
+    """
+    # Split into words
+    words = text.split()
+
+    # Filter out stop words and short words
+    return {w for w in words if len(w) > 2 and w not in STOP_WORDS}
 
-        # Filter out stop words and short words
-        keywords = {w for w in words if len(w) > 2 and w not in stop_words}
 
-        return keywords
+def is_task_match(task_name, boq_task_group, boq_description):
+    """
+    Check if BOQ item matches the task based on name and description.
+
+    Args:
+        task_name: Name of the ProjectTask
+        boq_task_group: Task group from BOQ (e.g., "Site Mobilization")
+        boq_description: Description of BOQ item
+
+    Returns:
+        bool: True if there's a match
+    """
+    # Normalize all strings
+    norm_task = normalize_text(task_name)
+    norm_group = normalize_text(boq_task_group)
+    norm_desc = normalize_text(boq_description)
+
+    # Direct match with task group
+    if norm_task == norm_group:
+        return True
+
+    # Check if task name contains task group or vice versa
+    if norm_task in norm_group or norm_group in norm_task:
+        return True
+
+    # Extract keywords from task name and check against description
+    task_keywords = extract_keywords(norm_task)
+    desc_keywords = extract_keywords(norm_desc)
+
+    # If 2 or more keywords match, consider it a match
+    matching_keywords = task_keywords.intersection(desc_keywords)
+    if len(matching_keywords) >= MIN_MATCHING_KEYWORDS:
+        return True
+
+    return False
+
+
+class BOQTaskMatcher:
+    """
+    Matches task names against a fixed list of BOQ items with the same rules
+    as is_task_match(), without re-tokenizing the BOQ for every task.
+
+    Each item's task group and description are normalized once. Items are
+    bucketed by normalized task group (checked with one substring test per
+    distinct group) and description keywords go into an inverted index, so a
+    task only counts keyword hits on the items that share a keyword with it.
+    """
+
+    def __init__(self, boq_items):
+        self.boq_items = boq_items
+        self._positions_by_group = {}
+        self._keyword_index = {}
+
+        for position, boq_item in enumerate(boq_items):
+            norm_group = normalize_text(boq_item['task_group'])
+            self._positions_by_group.setdefault(norm_group, []).append(position)
+
+            for keyword in extract_keywords(normalize_text(boq_item['description'])):
+                self._keyword_index.setdefault(keyword, []).append(position)
+
+    def match(self, task_name):
+        """BOQ items matching the task name, in BOQ order"""
+        norm_task = normalize_text(task_name)
+        matched = set()
+
+        # Task name equals, contains or is contained in the task group
+        for norm_group, positions in self._positions_by_group.items():
+            if norm_task in norm_group or norm_group in norm_task:
+                matched.update(positions)
+
+        # Enough description keywords shared with the task name
+        keyword_hits = Counter()
+        for keyword in extract_keywords(norm_task):
+            keyword_hits.update(self._keyword_index.get(keyword, ()))
+        matched.update(
+            position for position, hits in keyword_hits.items()
+            if hits >= MIN_MATCHING_KEYWORDS
+        )
+
+        return [self.boq_items[position] for position in sorted(matched)]
 
 
 def create_tasks_from_schedule(schedule):
@@ -23,6 +23,7 @@ from django.db.models import Q
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from notifications.models import Notification, NotificationStatus
+from notifications.utils import fan_out_notification
 from authentication.utils.tokens import get_user_profile, verify_user_profile
 
 # Authentication utils & decorators
@@ -116,8 +117,7 @@ def submit_progress_update(request, task_id):
                     message=notif_message,
                     link=reverse("review_updates")
                 )
-                for user in om_eg_users:
-                    NotificationStatus.objects.create(notification=notif, user=user)
+                fan_out_notification(notif, roles=["OM", "EG"], defer=True)
 
             # Notify the PM themselves
             notif_pm = Notification.objects.create(
@@ -994,8 +994,7 @@ def submit_schedule_for_approval(request, schedule_id):
                 message=notif_message,
                 link=reverse('review_project_schedule', args=[schedule.id])
             )
-            for user in om_eg_users:
-                NotificationStatus.objects.create(notification=notif, user=user)
+            fan_out_notification(notif, roles=['OM', 'EG'], defer=True)
 
         # Send email notifications
         from notifications.email_utils import (
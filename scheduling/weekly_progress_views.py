@@ -7,6 +7,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db import transaction
+from django.db.models import Count, Sum
 from django.utils import timezone
 from django.http import JsonResponse, HttpResponse
 from django.template.loader import render_to_string
@@ -44,6 +45,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT when ingesting an uploaded progress sheet
+BOQ_PROGRESS_BATCH_SIZE = 500
+
 
 @login_required
 @role_required('PM')
@@ -1042,6 +1046,10 @@ def upload_progress_excel(request, project_id):
                 )
                 return redirect('submit_weekly_progress', project_id=project.id)
 
+        # Resolve every BOQ code to its task up front, outside the transaction
+        code_to_task = ProjectTask.map_boq_codes_to_tasks(project)
+        reporter = request.user.userprofile
+
         # Create weekly report and BOQ items
         with transaction.atomic():
             # Create report
@@ -1050,34 +1058,34 @@ def upload_progress_excel(request, project_id):
                 week_start_date=week_start_date,
                 week_end_date=week_end_date,
                 remarks=remarks,
-                submitted_by=request.user.userprofile,
+                submitted_by=reporter,
                 status='P',
                 excel_file=excel_file
             )
 
             # Save supporting files/attachments
             from .models import WeeklyReportAttachment
-            for supporting_file in supporting_files:
-                WeeklyReportAttachment.objects.create(
+            WeeklyReportAttachment.objects.bulk_create([
+                WeeklyReportAttachment(
                     weekly_report=report,
                     file=supporting_file,
                     filename=supporting_file.name,
                     file_size=supporting_file.size
                 )
+                for supporting_file in supporting_files
+            ])
 
             # Create BOQ item progress records
+            boq_progress_records = []
             for boq_data in result['boq_items']:
                 # Find the corresponding task
-                task = ProjectTask.objects.filter(
-                    project=project,
-                    boq_item_codes__contains=[boq_data['boq_item_code']]
-                ).first()
+                task = code_to_task.get(boq_data['boq_item_code'])
 
                 if not task:
                     logger.warning(f"No task found for BOQ item {boq_data['boq_item_code']}")
                     continue
 
-                BOQItemProgress.objects.create(
+                record = BOQItemProgress(
                     project=project,
                     weekly_report=report,
                     boq_item_code=boq_data['boq_item_code'],
@@ -1094,12 +1102,17 @@ def upload_progress_excel(request, project_id):
                     scheduled_start_date=task.start_date,
                     scheduled_end_date=task.end_date,
                     status='P',
-                    reported_by=request.user.userprofile,
+                    reported_by=reporter,
                     report_date=week_end_date,
                     remarks=boq_data['remarks'],
                     progress_decreased=boq_data['progress_decreased'],
                     decrease_reason=boq_data['remarks'] if boq_data['progress_decreased'] else ''
                 )
+                # bulk_create skips save(), which normally derives period progress
+                record.calculate_period_progress()
+                boq_progress_records.append(record)
+
+            BOQItemProgress.objects.bulk_create(boq_progress_records, batch_size=BOQ_PROGRESS_BATCH_SIZE)
 
             # Set report totals from Excel summary (don't use calculate_totals as it incorrectly sums percentages)
             weekly_progress_percent = result['summary']['total_period_percent']
@@ -1107,16 +1120,20 @@ def upload_progress_excel(request, project_id):
 
             # Calculate cumulative progress by adding all approved AND pending reports
             # (Include pending so users can see what cumulative will be)
-            previous_reports = WeeklyProgressReport.objects.filter(
+            previous_totals = WeeklyProgressReport.objects.filter(
                 project=project,
                 status__in=['A', 'P'],  # Include both Approved and Pending
                 week_end_date__lt=week_start_date
-            ).order_by('-week_end_date')
+            ).aggregate(
+                report_count=Count('id'),
+                total_amount=Sum('total_period_amount'),
+                total_percent=Sum('total_period_percent'),
+            )
+            has_previous_reports = previous_totals['report_count'] > 0
 
             cumulative_amount = weekly_progress_amount
-            if previous_reports.exists():
-                total_previous_amount = sum(r.total_period_amount for r in previous_reports)
-                cumulative_amount = total_previous_amount + weekly_progress_amount
+            if has_previous_reports:
+                cumulative_amount = previous_totals['total_amount'] + weekly_progress_amount
 
             # Calculate cumulative percentage based on total project budget
             # Use the project's approved budget from database, NOT from Excel
@@ -1128,9 +1145,8 @@ def upload_progress_excel(request, project_id):
             else:
                 # Fallback: just add the period percentages
                 cumulative_percent = weekly_progress_percent
-                if previous_reports.exists():
-                    total_previous_percent = sum(r.total_period_percent for r in previous_reports)
-                    cumulative_percent = total_previous_percent + weekly_progress_percent
+                if has_previous_reports:
+                    cumulative_percent = previous_totals['total_percent'] + weekly_progress_percent
 
             report.total_period_amount = weekly_progress_amount
             report.total_period_percent = weekly_progress_percent
@@ -1154,6 +1170,7 @@ def upload_progress_excel(request, project_id):
 
             # Create notification for PM (report submitted successfully)
             from notifications.models import Notification, NotificationStatus
+            from notifications.utils import fan_out_notification
             pm_notification = Notification.objects.create(
                 message=f"Weekly progress report for {project.project_name} submitted successfully (Week: {week_start_date.strftime('%b %d')} - {week_end_date.strftime('%b %d, %Y')})",
                 link=f"/scheduling/progress/weekly/{report.id}/",
@@ -1172,14 +1189,8 @@ def upload_progress_excel(request, project_id):
                 role='OM'  # Both OM and EG will see this
             )
 
-            # Add notification for all OM and EG users
-            om_eg_users = UserProfile.objects.filter(role__in=['OM', 'EG'])
-            for user_profile in om_eg_users:
-                NotificationStatus.objects.create(
-                    notification=om_eg_notification,
-                    user=user_profile,
-                    is_read=False
-                )
+            # Add notification for all OM and EG users (bulk fan-out in the background)
+            fan_out_notification(om_eg_notification, roles=['OM', 'EG'], defer=True)
 
             # Send email notifications
             from notifications.email_utils import (
@@ -1198,6 +1209,7 @@ def upload_progress_excel(request, project_id):
             )
 
             # Email to OM/EG users (pending review)
+            om_eg_users = UserProfile.objects.filter(role__in=['OM', 'EG'])
             if om_eg_users.exists():
                 send_progress_report_pending_email(
                     om_eg_users=om_eg_users,
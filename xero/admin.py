@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import XeroConnection
+from .models import XeroConnection, XeroSyncItem
 
 @admin.register(XeroConnection)
 class XeroConnectionAdmin(admin.ModelAdmin):
@@ -20,3 +20,11 @@ class XeroConnectionAdmin(admin.ModelAdmin):
     is_valid_display.boolean = True
     is_valid_display.short_description = "Valid?"
 
+
+
+@admin.register(XeroSyncItem)
+class XeroSyncItemAdmin(admin.ModelAdmin):
+    list_display = ("kind", "object_id", "status", "attempts", "next_attempt_at", "remote_id", "synced_at")
+    list_filter = ("kind", "status")
+    search_fields = ("remote_id", "last_error")
+    readonly_fields = ("idempotency_key", "batch_key", "created_at", "synced_at")
@@ -0,0 +1,214 @@
+"""
+Xero API Client
+One pooled requests.Session shared by every Xero call, with timeouts, a
+thread pool for fetching independent endpoints at once, and caching:
+
+- get_cached(): per-tenant TTL cache for slow-changing data (Organisation,
+  Accounts)
+- get_modified_since(): keeps a per-tenant snapshot of a collection (Contacts)
+  and only asks Xero for records changed since the last pass, using the
+  If-Modified-Since header. A call fetches at most XERO_SNAPSHOT_MAX_PAGES
+  pages and a longer pass resumes on the next call, so a cold cache never
+  turns one page load into a page-by-page walk of the whole collection
+
+XERO_API_BASE_URL can point at a local stub server, which is how the tests
+exercise it.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone as dt_timezone
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+ORGANISATION_CACHE_TIMEOUT = 3600
+ACCOUNTS_CACHE_TIMEOUT = 900
+# Contacts/Invoices snapshots are refreshed incrementally, so they can live long
+SNAPSHOT_CACHE_TIMEOUT = 86400
+# Xero returns at most 100 records per page for paged endpoints
+PAGE_SIZE = 100
+DEFAULT_SNAPSHOT_MAX_PAGES = 5
+MAX_WORKERS = 5
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """The process-wide pooled session (created on first use)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = getattr(settings, 'XERO_POOL_SIZE', 10)
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _session = session
+    return _session
+
+
+def xero_cache_key(tenant_id, name):
+    return f"xero:{tenant_id}:{name}"
+
+
+def _modified_since_header(moment):
+    # Xero takes a UTC timestamp without offset
+    return moment.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+class XeroClient:
+    """
+    Authenticated calls for one access token (and tenant). Results use the
+    same shape as make_xero_api_call: {'success': True, 'data': ...} or
+    {'error': ..., 'details': ...}.
+    """
+
+    def __init__(self, access_token, tenant_id=None, session=None, base_url=None, timeout=None):
+        self.access_token = access_token
+        self.tenant_id = tenant_id
+        self.session = session or get_session()
+        self.base_url = (base_url or getattr(settings, 'XERO_API_BASE_URL', 'https://api.xero.com')).rstrip('/')
+        self.timeout = timeout or getattr(settings, 'XERO_REQUEST_TIMEOUT', 20)
+
+    @classmethod
+    def from_connection(cls, xero_conn, tenant_id=None, **kwargs):
+        return cls(xero_conn.access_token, tenant_id=tenant_id or xero_conn.tenant_id or None, **kwargs)
+
+    def _headers(self, tenant=True, extra=None):
+        headers = {
+            'Authorization': f'Bearer {self.access_token}',
+            'Accept': 'application/json',
+        }
+        if tenant and self.tenant_id:
+            headers['xero-tenant-id'] = self.tenant_id
+        if extra:
+            headers.update(extra)
+        return headers
+
+    def _request(self, method, url, headers, params=None, data=None):
+        try:
+            response = self.session.request(
+                method, url, headers=headers, params=params, json=data, timeout=self.timeout
+            )
+        except requests.RequestException as e:
+            return {'error': f'Request failed: {str(e)}'}, None
+
+        if response.status_code == 304:
+            return {'success': True, 'data': None, 'not_modified': True}, response
+        if response.status_code == 200:
+            return {'success': True, 'data': response.json(), 'tenant_id': self.tenant_id}, response
+        result = {
+            'error': f'API call failed: {response.status_code}',
+            'details': response.text,
+            'status_code': response.status_code,
+        }
+        if response.status_code == 429:
+            # Rate limited: Xero says how many seconds to wait
+            try:
+                result['retry_after'] = int(response.headers.get('Retry-After', ''))
+            except ValueError:
+                result['retry_after'] = None
+        return result, response
+
+    def connections(self):
+        """Organisations the token can access (no tenant header needed)"""
+        result, response = self._request('GET', f'{self.base_url}/connections', self._headers(tenant=False))
+        if result.get('success'):
+            return {'success': True, 'connections': result['data']}
+        if response is not None:
+            return {'error': f'Failed to get connections: {response.status_code}'}
+        return result
+
+    def get(self, endpoint, params=None, headers=None):
+        url = f'{self.base_url}/api.xro/2.0/{endpoint}'
+        result, _response = self._request('GET', url, self._headers(extra=headers), params=params)
+        return result
+
+    def post(self, endpoint, data, params=None, idempotency_key=None):
+        url = f'{self.base_url}/api.xro/2.0/{endpoint}'
+        headers = self._headers(extra={'Content-Type': 'application/json'})
+        if idempotency_key:
+            # Xero replays the original response for a repeated key instead of creating duplicates
+            headers['Idempotency-Key'] = idempotency_key
+        result, _response = self._request('POST', url, headers, params=params, data=data)
+        return result
+
+    def get_cached(self, endpoint, timeout, params=None):
+        """GET through the per-tenant cache; only successful responses are cached"""
+        key = xero_cache_key(self.tenant_id, endpoint)
+        result = cache.get(key)
+        if result is None:
+            result = self.get(endpoint, params=params)
+            if result.get('success'):
+                cache.set(key, result, timeout)
+        return result
+
+    def get_modified_since(self, collection, id_field, params=None, timeout=SNAPSHOT_CACHE_TIMEOUT, max_pages=None):
+        """
+        Records of a paged collection (e.g. Contacts/ContactID), fetching only
+        the ones changed since the previous pass for this tenant.
+
+        At most `max_pages` pages are requested per call. A pass that needs more
+        is resumed from the next page on the following call (without moving
+        If-Modified-Since on), so until it completes the snapshot holds the
+        pages fetched so far; `params` (e.g. an order) decide which those are.
+
+        Returns {'success': True, 'data': {collection: [records]}, 'complete': bool}
+        like get().
+        """
+        if max_pages is None:
+            max_pages = getattr(settings, 'XERO_SNAPSHOT_MAX_PAGES', DEFAULT_SNAPSHOT_MAX_PAGES)
+        key = xero_cache_key(self.tenant_id, f'snapshot:{collection}')
+        snapshot = cache.get(key) or {'records': {}, 'modified_since': None, 'resume': None}
+        records = dict(snapshot['records'])
+        # An unfinished pass keeps its start time and continues where it stopped
+        started_at, first_page = snapshot['resume'] or (datetime.now(dt_timezone.utc), 1)
+
+        headers = {}
+        if snapshot['modified_since']:
+            headers['If-Modified-Since'] = _modified_since_header(snapshot['modified_since'])
+
+        complete = False
+        for page in range(first_page, first_page + max_pages):
+            result = self.get(collection, params={**(params or {}), 'page': page}, headers=headers)
+            if not result.get('success'):
+                return result
+            if result.get('not_modified'):
+                complete = True
+                break
+            batch = result['data'].get(collection, [])
+            for record in batch:
+                records[record[id_field]] = record
+            if len(batch) < PAGE_SIZE:
+                complete = True
+                break
+
+        if complete:
+            snapshot = {'records': records, 'modified_since': started_at, 'resume': None}
+        else:
+            snapshot = {'records': records, 'modified_since': snapshot['modified_since'], 'resume': (started_at, page + 1)}
+        cache.set(key, snapshot, timeout)
+        return {
+            'success': True, 'data': {collection: list(records.values())},
+            'complete': complete, 'tenant_id': self.tenant_id,
+        }
+
+    def fetch_many(self, calls, max_workers=MAX_WORKERS):
+        """
+        Run independent calls ({name: zero-argument callable}) concurrently.
+        Returns {name: result}; an exception becomes an {'error': ...} result.
+        """
+        def run(call):
+            try:
+                return call()
+            except Exception as e:
+                return {'error': f'Request failed: {str(e)}'}
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(calls)) or 1) as executor:
+            futures = {name: executor.submit(run, call) for name, call in calls.items()}
+            return {name: future.result() for name, future in futures.items()}
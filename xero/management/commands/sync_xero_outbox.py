@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from xero.sync_outbox import DEFAULT_BATCH_LIMIT, sync_xero_outbox
+
+
+class Command(BaseCommand):
+    help = "Push clients, invoices and expenses waiting in the Xero outbox, in bulk requests"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_LIMIT,
+            help=f"Records sent per Xero request (default: {DEFAULT_BATCH_LIMIT})",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and poll the outbox instead of exiting when it is empty",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=30,
+            help="Seconds to wait between polls in --loop mode (default: 30)",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            synced, failed = sync_xero_outbox(batch_size=options["batch_size"])
+            if synced or failed or not options["loop"]:
+                self.stdout.write(f"Xero sync: {synced} synced, {failed} failed.")
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
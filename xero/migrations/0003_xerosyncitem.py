@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-16 19:33
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xero', '0002_xeroconnection_created_at_xeroconnection_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='XeroSyncItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('contact', 'Client → Contact'), ('invoice', 'Project → Invoice'), ('expense', 'Expense → Bank Transaction')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField(help_text='Primary key of the client, project or expense')),
+                ('tenant_id', models.CharField(blank=True, max_length=100)),
+                ('idempotency_key', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('synced', 'Synced'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('remote_id', models.CharField(blank=True, help_text='Xero ID of the created/updated record', max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('synced_at', models.DateTimeField(blank=True, null=True)),
+                ('connection', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_items', to='xero.xeroconnection')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['status', 'kind', 'next_attempt_at'], name='xero_xerosy_status_39ee2a_idx'), models.Index(fields=['kind', 'object_id'], name='xero_xerosy_kind_78e5f9_idx')],
+            },
+        ),
+    ]
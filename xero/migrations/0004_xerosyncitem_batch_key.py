@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-16 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('xero', '0003_xerosyncitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='xerosyncitem',
+            name='batch_key',
+            field=models.CharField(blank=True, help_text='Idempotency-Key of the batch this item was sent in; retries resend the same batch', max_length=64),
+        ),
+    ]
@@ -1,3 +1,5 @@
+import uuid
+
 from django.db import models
 from django.utils import timezone
 from authentication.models import UserProfile
@@ -17,3 +19,50 @@ class XeroConnection(models.Model):
     
     def __str__(self):
         return f"Xero connection for {self.user.full_name or self.user.user.email}"
+
+
+class XeroSyncItem(models.Model):
+    """
+    Outbox of records waiting to be pushed to Xero. Views only insert a row
+    here; the sync_xero_outbox worker sends them in batches (see sync_outbox.py).
+    """
+    KIND_CHOICES = [
+        ('contact', 'Client → Contact'),
+        ('invoice', 'Project → Invoice'),
+        ('expense', 'Expense → Bank Transaction'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('synced', 'Synced'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField(help_text="Primary key of the client, project or expense")
+    connection = models.ForeignKey(XeroConnection, on_delete=models.CASCADE, related_name='sync_items')
+    tenant_id = models.CharField(max_length=100, blank=True)
+    idempotency_key = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    batch_key = models.CharField(
+        max_length=64, blank=True,
+        help_text="Idempotency-Key of the batch this item was sent in; retries resend the same batch"
+    )
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    remote_id = models.CharField(max_length=100, blank=True, help_text="Xero ID of the created/updated record")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    synced_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'kind', 'next_attempt_at']),
+            models.Index(fields=['kind', 'object_id']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.object_id} ({self.status})"
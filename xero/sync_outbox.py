@@ -0,0 +1,384 @@
+"""
+Database-backed outbox for pushing clients, project invoices and expenses to Xero.
+
+queue_xero_sync() stores a pending XeroSyncItem and returns immediately, so
+saving a client or expense never waits on Xero. sync_xero_outbox() (run by the
+sync_xero_outbox command or the background queue) claims due items per kind
+and sends each organisation's items in bulk POSTs of up to XERO_BATCH_LIMIT
+records, with summarizeErrors=false so every record gets its own status.
+
+- Idempotency: each batch carries an Idempotency-Key derived from its items'
+  keys and stored on them before the POST. A batch that fails after being
+  sent (timeout, 5xx, rate limit) is re-claimed as the same batch, so Xero
+  sees the same key and replays its first response if it had applied it.
+  Records that already exist in Xero are sent with their Xero ID (updates
+  instead of duplicates)
+- Rate limits: a 429 puts the batch back for Retry-After seconds without
+  using up an attempt and stops sending for that organisation in this run
+- Other failures are retried with exponential backoff until
+  XERO_SYNC_MAX_ATTEMPTS; Xero validation errors, and an expired connection
+  (there is no token refresh, the user has to reconnect), fail the record
+  immediately
+
+The payload is built when the item is sent, so several saves of the same
+record before the worker runs are pushed once, with the latest data.
+"""
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .client import XeroClient
+from .models import XeroSyncItem
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_LIMIT = 50
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_BASE_SECONDS = 60
+DEFAULT_RATE_LIMIT_DELAY = 60
+MAX_RETRY_DELAY = timedelta(hours=6)
+# Items stuck in "sending" this long (e.g. the worker died) are retried
+STALE_SENDING_AFTER = timedelta(minutes=15)
+
+
+def get_expense_account_code(category):
+    """
+    Map your expense categories to Xero account codes
+    """
+    category_mapping = {
+        'labor': '400',      # Cost of Sales
+        'equipment': '410',  # Equipment Expenses
+        'subcontractors': '420',  # Subcontractor Costs
+        'service': '420',
+        'materials': '430',  # Materials
+        'material': '430',
+        'other': '460'       # General Expenses
+    }
+
+    return category_mapping.get((category or '').lower(), '460')
+
+
+def contact_payload(client, remote_id=None):
+    contact = {
+        "Name": client.company_name,
+        "FirstName": client.contact_name.split(' ')[0] if client.contact_name else '',
+        "LastName": ' '.join(client.contact_name.split(' ')[1:]) if client.contact_name and len(client.contact_name.split(' ')) > 1 else '',
+        "EmailAddress": client.email or '',
+        "ContactNumber": f"CLIENT-{client.id}",
+        "ContactStatus": "ACTIVE" if client.is_active else "ARCHIVED",
+    }
+    if client.address:
+        contact["Addresses"] = [{
+            "AddressType": "STREET",
+            "AddressLine1": client.address or '',
+            "City": client.city or '',
+            "Region": client.state or '',
+            "PostalCode": client.zip_code or '',
+        }]
+    if client.phone:
+        contact["Phones"] = [{"PhoneType": "DEFAULT", "PhoneNumber": client.phone}]
+    contact_id = remote_id or client.xero_contact_id
+    if contact_id:
+        contact["ContactID"] = contact_id
+    return contact
+
+
+def invoice_payload(project, remote_id=None):
+    client = project.client
+    if client and client.xero_contact_id:
+        contact = {"ContactID": client.xero_contact_id}
+    else:
+        # Xero matches (or creates) the contact by name
+        contact = {"Name": client.company_name if client else project.project_name}
+    invoice = {
+        "Type": "ACCREC",  # Accounts Receivable (customer invoice)
+        "Contact": contact,
+        "Date": project.created_at.strftime('%Y-%m-%d'),
+        "DueDate": (project.created_at + timedelta(days=30)).strftime('%Y-%m-%d'),
+        "InvoiceNumber": f"INV-{project.id}",
+        "Reference": f"Project: {project.project_name}",
+        "Status": "DRAFT",
+        "LineItems": [{
+            "Description": f"Project: {project.project_name}",
+            "Quantity": 1,
+            "UnitAmount": float(project.approved_budget or project.estimated_cost or 0),
+            "AccountCode": "200",  # Revenue account
+            "TaxType": "NONE"
+        }]
+    }
+    if remote_id:
+        invoice["InvoiceID"] = remote_id
+    return invoice
+
+
+def expense_payload(expense, remote_id=None):
+    project = expense.project
+    description = expense.description or expense.get_expense_type_display()
+    transaction_data = {
+        "Type": "SPEND",
+        "Contact": {"Name": expense.vendor or "General Expense"},
+        "Date": expense.expense_date.strftime('%Y-%m-%d'),
+        "Reference": f"Project: {project.project_name} - {description}"[:255],
+        "Status": "AUTHORISED",
+        "BankAccount": {"Code": "090"},
+        "LineItems": [{
+            "Description": description,
+            "Quantity": 1,
+            "UnitAmount": float(expense.amount),
+            "AccountCode": get_expense_account_code(expense.expense_type),
+        }]
+    }
+    if remote_id:
+        transaction_data["BankTransactionID"] = remote_id
+    return transaction_data
+
+
+def _contact_synced(clients_by_id, synced):
+    """Store returned ContactIDs on the clients"""
+    now = timezone.now()
+    changed = []
+    for object_id, remote_id in synced.items():
+        client = clients_by_id[object_id]
+        client.xero_contact_id = remote_id
+        client.xero_last_sync = now
+        changed.append(client)
+    if changed:
+        type(changed[0]).objects.bulk_update(changed, ['xero_contact_id', 'xero_last_sync'])
+
+
+# Kind -> (source model, Xero collection, Xero ID field, related to load, payload builder, on-synced hook)
+SYNC_KINDS = {
+    'contact': ('manage_client.Client', 'Contacts', 'ContactID', (), contact_payload, _contact_synced),
+    'invoice': ('project_profiling.ProjectProfile', 'Invoices', 'InvoiceID', ('client',), invoice_payload, None),
+    'expense': ('project_profiling.Expense', 'BankTransactions', 'BankTransactionID', ('project',), expense_payload, None),
+}
+
+
+def queue_xero_sync(kind, instance, xero_connection, tenant_id=None):
+    """
+    Schedule `instance` to be pushed to Xero with the given connection's token.
+    A record that is already waiting is not queued twice.
+
+    Returns the XeroSyncItem.
+    """
+    tenant_id = tenant_id or xero_connection.tenant_id
+    item = XeroSyncItem.objects.filter(
+        kind=kind, object_id=instance.pk, connection=xero_connection, tenant_id=tenant_id, status='pending'
+    ).first()
+    if item is None:
+        item = XeroSyncItem.objects.create(
+            kind=kind, object_id=instance.pk, connection=xero_connection, tenant_id=tenant_id
+        )
+
+    from .tasks import enqueue_xero_sync
+    enqueue_xero_sync()
+    return item
+
+
+def retry_delay(attempts):
+    """Backoff before the next attempt: base * 2^(attempts-1), capped"""
+    base = getattr(settings, 'XERO_SYNC_RETRY_BASE_SECONDS', DEFAULT_RETRY_BASE_SECONDS)
+    return min(timedelta(seconds=base * 2 ** max(attempts - 1, 0)), MAX_RETRY_DELAY)
+
+
+def batch_idempotency_key(items):
+    """Same items -> same key, so a retried batch is recognised by Xero"""
+    keys = ','.join(sorted(str(item.idempotency_key) for item in items))
+    return hashlib.sha256(keys.encode()).hexdigest()
+
+
+def claim_due_items(kind, batch_size):
+    """
+    Mark due items of one kind as "sending" and return them: a whole batch
+    that was sent before and failed, otherwise up to batch_size new items
+    """
+    now = timezone.now()
+    XeroSyncItem.objects.filter(
+        status='sending', next_attempt_at__lte=now - STALE_SENDING_AFTER
+    ).update(status='pending')
+
+    with transaction.atomic():
+        due = (
+            XeroSyncItem.objects
+            .select_for_update(skip_locked=True)
+            .filter(kind=kind, status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')
+        )
+        batch_key = due.exclude(batch_key='').values_list('batch_key', flat=True).first()
+        if batch_key:
+            # Keep the batch together so its Idempotency-Key still matches the first POST
+            ids = list(due.filter(batch_key=batch_key).values_list('id', flat=True))
+        else:
+            ids = list(due.filter(batch_key='').values_list('id', flat=True)[:batch_size])
+        XeroSyncItem.objects.filter(id__in=ids).update(status='sending', next_attempt_at=now)
+    return list(XeroSyncItem.objects.filter(id__in=ids).select_related('connection').order_by('id'))
+
+
+def _record_failure(items, error, max_attempts, permanent=False):
+    now = timezone.now()
+    for item in items:
+        item.attempts += 1
+        item.last_error = str(error)[:2000]
+        if permanent or item.attempts >= max_attempts:
+            item.status = 'failed'
+            logger.error("Giving up on Xero sync item %s after %s attempts: %s", item.pk, item.attempts, error)
+        else:
+            item.status = 'pending'
+            item.next_attempt_at = now + retry_delay(item.attempts)
+            logger.warning("Xero sync item %s failed (attempt %s), retrying at %s: %s",
+                           item.pk, item.attempts, item.next_attempt_at, error)
+    XeroSyncItem.objects.bulk_update(items, ['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def _defer_for_rate_limit(items, retry_after):
+    """Put items back without using up an attempt"""
+    delay = timedelta(seconds=retry_after or DEFAULT_RATE_LIMIT_DELAY)
+    next_attempt_at = timezone.now() + delay
+    for item in items:
+        item.status = 'pending'
+        item.next_attempt_at = next_attempt_at
+        item.last_error = f"Rate limited by Xero; retrying in {int(delay.total_seconds())}s"
+    XeroSyncItem.objects.bulk_update(items, ['status', 'next_attempt_at', 'last_error'])
+
+
+def _validation_error(record):
+    errors = record.get('ValidationErrors') or []
+    if errors or record.get('StatusAttributeString') == 'ERROR':
+        return '; '.join(error.get('Message', '') for error in errors) or 'Rejected by Xero'
+    return None
+
+
+def deliver_batch(kind, items, client=None):
+    """
+    Send one organisation's claimed items of a kind in a single POST and
+    record each outcome. Returns (synced, failed, rate_limited).
+    """
+    model_label, collection, id_field, related, build_payload, on_synced = SYNC_KINDS[kind]
+    max_attempts = getattr(settings, 'XERO_SYNC_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    if not items:
+        return 0, 0, False
+
+    connection = items[0].connection
+    if not connection.is_valid():
+        # Retrying can't help: nothing refreshes the token until the user reconnects
+        _record_failure(items, "Xero connection expired. Please reconnect.", max_attempts, permanent=True)
+        return 0, len(items), False
+
+    model = apps.get_model(model_label)
+    sources = model.objects.select_related(*related).in_bulk({item.object_id for item in items})
+    missing = [item for item in items if item.object_id not in sources]
+    if missing:
+        _record_failure(missing, f"{model.__name__} no longer exists", max_attempts, permanent=True)
+    items = [item for item in items if item.object_id in sources]
+    if not items:
+        return 0, len(missing), False
+
+    batch_keys = {item.batch_key for item in items}
+    if len(batch_keys) == 1 and '' not in batch_keys and not missing:
+        batch_key = batch_keys.pop()
+    else:
+        # A new batch (or one whose composition changed, which Xero couldn't
+        # match to its first response anyway); record the key before sending
+        batch_key = batch_idempotency_key(items)
+        for item in items:
+            item.batch_key = batch_key
+        XeroSyncItem.objects.bulk_update(items, ['batch_key'])
+
+    # Records already in Xero are updated by their Xero ID instead of created again
+    known_ids = dict(
+        XeroSyncItem.objects
+        .filter(kind=kind, object_id__in=[item.object_id for item in items], status='synced')
+        .exclude(remote_id='')
+        .order_by('synced_at')
+        .values_list('object_id', 'remote_id')
+    )
+    payload = {collection: [build_payload(sources[item.object_id], known_ids.get(item.object_id)) for item in items]}
+
+    client = client or XeroClient.from_connection(connection, tenant_id=items[0].tenant_id or None)
+    if not client.tenant_id:
+        connections_result = client.connections()
+        if not (connections_result.get('success') and connections_result['connections']):
+            _record_failure(items, connections_result.get('error', 'No tenant ID available'), max_attempts)
+            return 0, len(items) + len(missing), False
+        client.tenant_id = connections_result['connections'][0]['tenantId']
+
+    result = client.post(
+        collection, payload,
+        params={'summarizeErrors': 'false'},
+        idempotency_key=batch_key
+    )
+
+    if result.get('status_code') == 429:
+        _defer_for_rate_limit(items, result.get('retry_after'))
+        return 0, len(missing), True
+    if not result.get('success'):
+        _record_failure(items, f"{result.get('error')} {result.get('details', '')}".strip(), max_attempts)
+        return 0, len(items) + len(missing), False
+
+    records = result['data'].get(collection, [])
+    now = timezone.now()
+    synced_items, rejected, synced_ids = [], [], {}
+    for item, record in zip(items, records):
+        error = _validation_error(record)
+        if error:
+            rejected.append((item, error))
+            continue
+        item.status = 'synced'
+        item.attempts += 1
+        item.remote_id = record.get(id_field, '')
+        item.synced_at = now
+        item.last_error = ''
+        synced_items.append(item)
+        synced_ids[item.object_id] = item.remote_id
+
+    XeroSyncItem.objects.bulk_update(synced_items, ['status', 'attempts', 'remote_id', 'synced_at', 'last_error'])
+    for item, error in rejected:
+        _record_failure([item], error, max_attempts, permanent=True)
+    unanswered = items[len(records):]
+    if unanswered:
+        # Not part of the batch Xero answered; they go out in a new batch
+        for item in unanswered:
+            item.batch_key = ''
+        XeroSyncItem.objects.bulk_update(unanswered, ['batch_key'])
+        _record_failure(unanswered, "No result returned by Xero", max_attempts)
+    if on_synced and synced_ids:
+        on_synced(sources, synced_ids)
+
+    logger.info("Xero %s batch: %s synced, %s failed", kind, len(synced_items), len(items) - len(synced_items))
+    return len(synced_items), len(items) - len(synced_items) + len(missing), False
+
+
+def sync_xero_outbox(batch_size=None, max_batches=None):
+    """
+    Push due items kind by kind (contacts first, so invoices can reference
+    them) until none are left. Returns (synced, failed).
+    """
+    batch_size = batch_size or getattr(settings, 'XERO_BATCH_LIMIT', DEFAULT_BATCH_LIMIT)
+    total_synced = total_failed = batches = 0
+    for kind in SYNC_KINDS:
+        rate_limited = set()
+        while max_batches is None or batches < max_batches:
+            items = claim_due_items(kind, batch_size)
+            if not items:
+                break
+
+            # One POST per organisation; a rate-limited organisation waits for the next run
+            groups = {}
+            for item in items:
+                groups.setdefault((item.connection_id, item.tenant_id), []).append(item)
+            for key, group in groups.items():
+                if key in rate_limited:
+                    _defer_for_rate_limit(group, None)
+                    continue
+                synced, failed, limited = deliver_batch(kind, group)
+                total_synced += synced
+                total_failed += failed
+                if limited:
+                    rate_limited.add(key)
+            batches += 1
+    return total_synced, total_failed
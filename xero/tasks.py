@@ -0,0 +1,22 @@
+"""
+Background entry points for the Xero sync outbox. Jobs go through the
+notification queue (NOTIFICATION_QUEUE_BACKEND), so they run on Celery, the
+local worker thread or inline exactly like email delivery.
+"""
+from notifications.tasks import shared_task, submit_job
+
+
+def run_xero_sync():
+    from .sync_outbox import sync_xero_outbox
+    sync_xero_outbox()
+
+
+if shared_task is not None:
+    sync_xero_outbox_task = shared_task(name="xero.sync_xero_outbox")(run_xero_sync)
+else:
+    sync_xero_outbox_task = None
+
+
+def enqueue_xero_sync():
+    """Push queued Xero records in the background"""
+    submit_job(run_xero_sync, celery_task=sync_xero_outbox_task)
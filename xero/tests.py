@@ -1,3 +1,269 @@
-from django.test import TestCase
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from authentication.models import UserProfile
+from manage_client.models import Client
+from xero.client import PAGE_SIZE, XeroClient
+from xero.models import XeroConnection, XeroSyncItem
+from xero.sync_outbox import queue_xero_sync, sync_xero_outbox
+
+
+class StubXeroHandler(BaseHTTPRequestHandler):
+    """Canned Xero responses; every request is recorded on the server"""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.server.requests.append((url.path, parse_qs(url.query), dict(self.headers)))
+        if url.path == '/connections':
+            return self.reply([{'tenantId': 'tenant-1'}])
+
+        collection = url.path.rsplit('/', 1)[-1]
+        if collection == 'Organisation':
+            return self.reply({'Organisations': [{'Name': 'Stub Builders'}]})
+        if collection == 'Accounts':
+            return self.reply({'Accounts': [{'Code': '200', 'Type': 'REVENUE'}]})
+        if collection == 'Contacts':
+            contacts = self.server.contacts
+            if 'If-Modified-Since' in self.headers:
+                contacts = self.server.changed_contacts
+            page = int(parse_qs(url.query).get('page', ['1'])[0])
+            return self.reply({'Contacts': contacts[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]})
+        self.send_error(404)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((url.path, parse_qs(url.query), dict(self.headers)))
+        self.server.posted.append(body)
+        if self.server.rate_limited:
+            self.server.rate_limited -= 1
+            return self.reply({'Message': 'Rate limit exceeded'}, status=429, headers={'Retry-After': '120'})
+        if self.server.unavailable:
+            self.server.unavailable -= 1
+            return self.reply({'Message': 'Service unavailable'}, status=503)
+
+        if url.path.endswith('/Contacts'):
+            contacts = []
+            for contact in body['Contacts']:
+                if contact['Name'] in self.server.rejected_names:
+                    contact = dict(contact, StatusAttributeString='ERROR',
+                                   ValidationErrors=[{'Message': 'Name is invalid'}])
+                else:
+                    contact = dict(contact, ContactID=contact.get('ContactID', f"xc-{contact['ContactNumber']}"))
+                contacts.append(contact)
+            return self.reply({'Contacts': contacts})
+        self.send_error(404)
+
+    def reply(self, payload, status=200, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_xero(testcase):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubXeroHandler)
+    server.requests = []
+    server.posted = []
+    server.contacts = []
+    server.changed_contacts = []
+    server.rejected_names = set()
+    server.rate_limited = 0
+    server.unavailable = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    testcase.addCleanup(server.server_close)
+    testcase.addCleanup(server.shutdown)
+    return server
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                                       'LOCATION': 'xero-client-tests'}})
+class XeroClientTestCase(SimpleTestCase):
+    def setUp(self):
+        self.server = start_stub_xero(self)
+        self.server.contacts = [
+            {'ContactID': f'c{i}', 'Name': f'Contact {i}', 'ContactStatus': 'ACTIVE'} for i in range(150)
+        ]
+        cache.clear()
+
+        self.client = XeroClient('token', tenant_id='tenant-1',
+                                 base_url=f'http://127.0.0.1:{self.server.server_port}', timeout=5)
+
+    def paths(self):
+        return [path for path, _query, _headers in self.server.requests]
+
+    def test_fan_out_and_ttl_cache(self):
+        for _ in range(2):
+            results = self.client.fetch_many({
+                'organisation': lambda: self.client.get_cached('Organisation', 60),
+                'accounts': lambda: self.client.get_cached('Accounts', 60),
+                'connections': self.client.connections,
+            })
+            self.assertEqual(results['organisation']['data']['Organisations'][0]['Name'], 'Stub Builders')
+            self.assertEqual(results['accounts']['data']['Accounts'][0]['Code'], '200')
+            self.assertEqual(results['connections']['connections'][0]['tenantId'], 'tenant-1')
+
+        # Organisation and Accounts were served from the cache the second time
+        self.assertEqual(self.paths().count('/api.xro/2.0/Organisation'), 1)
+        self.assertEqual(self.paths().count('/api.xro/2.0/Accounts'), 1)
+        self.assertEqual(self.paths().count('/connections'), 2)
+        headers = self.server.requests[0][2]
+        self.assertEqual(headers['Authorization'], 'Bearer token')
+
+    def test_modified_since_pages_then_merges_changes(self):
+        result = self.client.get_modified_since('Contacts', 'ContactID')
+        self.assertEqual(len(result['data']['Contacts']), 150)
+        first_pass = self.server.requests[:]
+        self.assertEqual([query['page'] for _path, query, _headers in first_pass], [['1'], ['2']])
+        self.assertTrue(all('If-Modified-Since' not in headers for _path, _query, headers in first_pass))
+
+        self.server.changed_contacts = [{'ContactID': 'c3', 'Name': 'Renamed', 'ContactStatus': 'ARCHIVED'}]
+        result = self.client.get_modified_since('Contacts', 'ContactID')
+
+        contacts = {contact['ContactID']: contact for contact in result['data']['Contacts']}
+        self.assertEqual(len(contacts), 150)
+        self.assertEqual(contacts['c3']['Name'], 'Renamed')
+        _path, _query, headers = self.server.requests[-1]
+        self.assertIn('If-Modified-Since', headers)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_cold_snapshot_is_fetched_a_bounded_number_of_pages_per_call(self):
+        result = self.client.get_modified_since('Contacts', 'ContactID', params={'order': 'Name ASC'}, max_pages=1)
+        self.assertFalse(result['complete'])
+        self.assertEqual(len(result['data']['Contacts']), PAGE_SIZE)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.server.requests[0][1]['order'], ['Name ASC'])
+
+        # The next call resumes the unfinished pass from page 2, still without If-Modified-Since
+        result = self.client.get_modified_since('Contacts', 'ContactID', params={'order': 'Name ASC'}, max_pages=1)
+        self.assertTrue(result['complete'])
+        self.assertEqual(len(result['data']['Contacts']), 150)
+        _path, query, headers = self.server.requests[-1]
+        self.assertEqual(query['page'], ['2'])
+        self.assertNotIn('If-Modified-Since', headers)
+
+        # Only a completed pass moves on to incremental fetches
+        self.client.get_modified_since('Contacts', 'ContactID', params={'order': 'Name ASC'}, max_pages=1)
+        _path, query, headers = self.server.requests[-1]
+        self.assertEqual(query['page'], ['1'])
+        self.assertIn('If-Modified-Since', headers)
+
+    def test_unreachable_server_returns_error(self):
+        self.server.shutdown()
+        self.server.server_close()
+        result = self.client.get('Organisation')
+        self.assertIn('Request failed', result['error'])
+
+
+class XeroSyncOutboxTestCase(TestCase):
+    def setUp(self):
+        self.server = start_stub_xero(self)
+        settings_override = override_settings(
+            XERO_API_BASE_URL=f'http://127.0.0.1:{self.server.server_port}',
+            XERO_REQUEST_TIMEOUT=5,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        user = get_user_model().objects.create_user(email='xero@example.com', password='pass')
+        profile, _created = UserProfile.objects.get_or_create(user=user)
+        self.connection = XeroConnection.objects.create(
+            user=profile, access_token='token', tenant_id='tenant-1',
+            expires_at=timezone.now() + timedelta(hours=1)
+        )
+        self.clients = [
+            Client.objects.create(company_name=f'Client {i}', contact_name='Ana Cruz') for i in range(7)
+        ]
+
+    def post_requests(self):
+        return [(query, headers) for path, query, headers in self.server.requests if path.endswith('/Contacts')]
+
+    def test_contacts_sent_in_bulk_batches(self):
+        for client in self.clients:
+            queue_xero_sync('contact', client, self.connection)
+        # A second save before the worker runs does not queue the client twice
+        queue_xero_sync('contact', self.clients[0], self.connection)
+        self.server.rejected_names = {'Client 6'}
+
+        synced, failed = sync_xero_outbox(batch_size=5)
+
+        self.assertEqual((synced, failed), (6, 1))
+        self.assertEqual([len(body['Contacts']) for body in self.server.posted], [5, 2])
+        query, headers = self.post_requests()[0]
+        self.assertEqual(query['summarizeErrors'], ['false'])
+        self.assertEqual(headers['xero-tenant-id'], 'tenant-1')
+        self.assertIn('Idempotency-Key', headers)
+
+        client = Client.objects.get(pk=self.clients[0].pk)
+        self.assertEqual(client.xero_contact_id, f'xc-CLIENT-{client.pk}')
+        self.assertIsNotNone(client.xero_last_sync)
+        rejected = XeroSyncItem.objects.get(object_id=self.clients[6].pk)
+        self.assertEqual(rejected.status, 'failed')
+        self.assertIn('Name is invalid', rejected.last_error)
+
+        # Syncing again updates the existing Xero contact instead of creating another
+        queue_xero_sync('contact', client, self.connection)
+        sync_xero_outbox()
+        self.assertEqual(self.server.posted[-1]['Contacts'][0]['ContactID'], client.xero_contact_id)
+
+    def test_rate_limit_defers_without_using_an_attempt(self):
+        for client in self.clients[:3]:
+            queue_xero_sync('contact', client, self.connection)
+        self.server.rate_limited = 1
+
+        self.assertEqual(sync_xero_outbox(), (0, 0))
+        items = XeroSyncItem.objects.all()
+        self.assertTrue(all(item.status == 'pending' and item.attempts == 0 for item in items))
+        self.assertTrue(all(item.next_attempt_at > timezone.now() + timedelta(seconds=100) for item in items))
+        self.assertEqual(len(self.server.posted), 1)
+
+        # Nothing is due until Retry-After has passed; then the same batch goes again
+        first_key = self.post_requests()[0][1]['Idempotency-Key']
+        self.assertEqual(sync_xero_outbox(), (0, 0))
+        XeroSyncItem.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(sync_xero_outbox(), (3, 0))
+        self.assertEqual(self.post_requests()[-1][1]['Idempotency-Key'], first_key)
+
+    def test_failed_batch_is_retried_whole_with_the_same_key(self):
+        for client in self.clients[:3]:
+            queue_xero_sync('contact', client, self.connection)
+        self.server.unavailable = 1
+        self.assertEqual(sync_xero_outbox(batch_size=5), (0, 3))
+        first_key = self.post_requests()[0][1]['Idempotency-Key']
+
+        # Items queued meanwhile don't join the failed batch, even with room for them
+        for client in self.clients[3:5]:
+            queue_xero_sync('contact', client, self.connection)
+        XeroSyncItem.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(sync_xero_outbox(batch_size=5), (5, 0))
+
+        retried, new = self.post_requests()[1:]
+        self.assertEqual(retried[1]['Idempotency-Key'], first_key)
+        self.assertNotEqual(new[1]['Idempotency-Key'], first_key)
+        self.assertEqual([len(body['Contacts']) for body in self.server.posted], [3, 3, 2])
+
+    def test_expired_connection_fails_without_retrying(self):
+        self.connection.expires_at = timezone.now() - timedelta(minutes=1)
+        self.connection.save()
+        queue_xero_sync('contact', self.clients[0], self.connection)
+
+        self.assertEqual(sync_xero_outbox(), (0, 1))
+        item = XeroSyncItem.objects.get()
+        self.assertEqual((item.status, item.attempts), ('failed', 1))
+        self.assertEqual(self.server.posted, [])
@@ -1,5 +1,6 @@
 from django.shortcuts import render
-from .xero_helpers import make_xero_api_call, get_xero_connections
+from .client import ACCOUNTS_CACHE_TIMEOUT, ORGANISATION_CACHE_TIMEOUT
+from .xero_helpers import make_xero_api_call, get_xero_client, get_xero_connections
 import requests
 from django.shortcuts import redirect
 from django.conf import settings
@@ -200,8 +201,17 @@ def xero_dashboard(request):
     
     context['connected'] = True
     
+    # One XeroConnection read; every call below shares the client's pooled session
+    client, error = get_xero_client(
+        request,
+        tenant_id=request.session.get('xero_selected_tenant_id') or request.session.get('xero_tenant_id')
+    )
+    if error:
+        context['error'] = error.get('error')
+        return render(request, 'xero_dashboard.html', context)
+    
     # Get all available organizations
-    connections_result = get_xero_connections(request)
+    connections_result = client.connections()
     if connections_result.get('success'):
         context['available_orgs'] = connections_result['connections']
         
@@ -224,19 +234,30 @@ def xero_dashboard(request):
         context['error'] = 'No organizations available'
         return render(request, 'xero_dashboard.html', context)
     
-    current_tenant_id = context['current_org']['tenantId']
+    client.tenant_id = context['current_org']['tenantId']
+    
+    # The endpoints are independent, so fetch them concurrently. Organisation and
+    # Accounts rarely change and are cached per tenant; Contacts only fetch
+    # records modified since the last dashboard load (a bounded number of pages,
+    # in name order, per load); Invoices are one server-ordered page.
+    results = client.fetch_many({
+        'organisation': lambda: client.get_cached('Organisation', ORGANISATION_CACHE_TIMEOUT),
+        'contacts': lambda: client.get_modified_since('Contacts', 'ContactID', params={'order': 'Name ASC'}),
+        'invoices': lambda: client.get('Invoices', params={'order': 'Date DESC', 'page': 1}),
+        'accounts': lambda: client.get_cached('Accounts', ACCOUNTS_CACHE_TIMEOUT),
+        'bank_transactions': lambda: client.get('BankTransactions', params={'order': 'Date DESC'}),
+    })
     
     # Get Organization Info
-    org_result = make_xero_api_call(request, 'Organisation', tenant_id=current_tenant_id)
+    org_result = results['organisation']
     if org_result.get('success'):
         context['organization'] = org_result['data']['Organisations'][0]
     else:
         context['error'] = org_result.get('error')
         return render(request, 'xero_dashboard.html', context)
     
-    # Get other data using the selected tenant_id
     # Get Contacts (Clients)
-    contacts_result = make_xero_api_call(request, 'Contacts', tenant_id=current_tenant_id)
+    contacts_result = results['contacts']
     if contacts_result.get('success'):
         contacts = contacts_result['data']['Contacts']
         context['contacts'] = sorted(
@@ -245,12 +266,12 @@ def xero_dashboard(request):
         )[:10]
     
     # Get Recent Invoices
-    invoices_result = make_xero_api_call(request, 'Invoices?order=Date DESC', tenant_id=current_tenant_id)
+    invoices_result = results['invoices']
     if invoices_result.get('success'):
         context['invoices'] = invoices_result['data']['Invoices'][:5]
     
     # Get Chart of Accounts
-    accounts_result = make_xero_api_call(request, 'Accounts', tenant_id=current_tenant_id)
+    accounts_result = results['accounts']
     if accounts_result.get('success'):
         all_accounts = accounts_result['data']['Accounts']
         context['accounts'] = {
@@ -260,7 +281,7 @@ def xero_dashboard(request):
         }
     
     # Get Recent Bank Transactions
-    bank_result = make_xero_api_call(request, 'BankTransactions?order=Date DESC', tenant_id=current_tenant_id)
+    bank_result = results['bank_transactions']
     if bank_result.get('success'):
         context['bank_transactions'] = bank_result['data']['BankTransactions'][:5]
     
@@ -1,42 +1,36 @@
 # manage_client/xero_helpers.py
-import requests
-from django.conf import settings
+from .client import XeroClient
 from .models import XeroConnection
-from django.utils import timezone
 
-def get_xero_connections(request):
-    """Get all available Xero connections/organizations"""
+def get_xero_client(request, tenant_id=None):
+    """
+    XeroClient for the logged-in user's stored connection, or an error dict
+    when there is no usable connection. Reads XeroConnection once.
+    """
     if not request.user.is_authenticated:
-        return {'error': 'User not authenticated'}
+        return None, {'error': 'User not authenticated'}
     
     try:
         xero_conn = XeroConnection.objects.get(user=request.user.userprofile)
         if not xero_conn.is_valid():
-            return {'error': 'Xero connection expired. Please reconnect.'}
-        
-        access_token = xero_conn.access_token
+            return None, {'error': 'Xero connection expired. Please reconnect.'}
     except (XeroConnection.DoesNotExist, AttributeError):
-        return {'error': 'Not connected to Xero'}
+        return None, {'error': 'Not connected to Xero'}
     
-    headers = {
-        'Authorization': f'Bearer {access_token}',
-        'Accept': 'application/json',
-    }
-    
-    try:
-        response = requests.get('https://api.xero.com/connections', headers=headers)
-        if response.status_code == 200:
-            connections = response.json()
-            return {'success': True, 'connections': connections}
+    client = XeroClient.from_connection(xero_conn, tenant_id=tenant_id)
+    if not client.tenant_id:
+        # Get the first available connection and store it
+        connections_result = client.connections()
+        if connections_result.get('success') and connections_result['connections']:
+            client.tenant_id = connections_result['connections'][0]['tenantId']
+            xero_conn.tenant_id = client.tenant_id
+            xero_conn.save()
         else:
-            return {'error': f'Failed to get connections: {response.status_code}'}
-    except Exception as e:
-        return {'error': f'Request failed: {str(e)}'}
+            return None, {'error': 'No tenant ID available'}
+    return client, None
 
-def make_xero_api_call(request, endpoint, method='GET', data=None, tenant_id=None):
-    """
-    Helper function to make authenticated Xero API calls using database-stored tokens
-    """
+def get_xero_connections(request):
+    """Get all available Xero connections/organizations"""
     if not request.user.is_authenticated:
         return {'error': 'User not authenticated'}
     
@@ -44,50 +38,33 @@ def make_xero_api_call(request, endpoint, method='GET', data=None, tenant_id=Non
         xero_conn = XeroConnection.objects.get(user=request.user.userprofile)
         if not xero_conn.is_valid():
             return {'error': 'Xero connection expired. Please reconnect.'}
-        
-        access_token = xero_conn.access_token
     except (XeroConnection.DoesNotExist, AttributeError):
         return {'error': 'Not connected to Xero'}
     
-    # Use provided tenant_id or get stored tenant_id or fetch default
-    if not tenant_id:
-        tenant_id = xero_conn.tenant_id
-    
-    if not tenant_id:
-        # Get the first available connection and store it
-        connections_result = get_xero_connections(request)
-        if connections_result.get('success') and connections_result['connections']:
-            tenant_id = connections_result['connections'][0]['tenantId']
-            xero_conn.tenant_id = tenant_id
-            xero_conn.save()
-        else:
-            return {'error': 'No tenant ID available'}
-    
-    # Make the API call
-    headers = {
-        'Authorization': f'Bearer {access_token}',
-        'Accept': 'application/json',
-        'xero-tenant-id': tenant_id,
-    }
+    return XeroClient.from_connection(xero_conn).connections()
+
+def make_xero_api_call(request, endpoint, method='GET', data=None, tenant_id=None):
+    """
+    Helper function to make authenticated Xero API calls using database-stored tokens
+    """
+    client, error = get_xero_client(request, tenant_id=tenant_id)
+    if error:
+        return error
     
     if method.upper() == 'POST':
-        headers['Content-Type'] = 'application/json'
+        return client.post(endpoint, data)
+    return client.get(endpoint)
+
+def get_xero_connection(user):
+    """The user's stored XeroConnection if it is still valid, else None"""
+    if not user.is_authenticated:
+        return None
     
     try:
-        url = f"https://api.xero.com/api.xro/2.0/{endpoint}"
-        
-        if method.upper() == 'POST':
-            response = requests.post(url, headers=headers, json=data)
-        else:
-            response = requests.get(url, headers=headers)
-        
-        if response.status_code == 200:
-            return {'success': True, 'data': response.json(), 'tenant_id': tenant_id}
-        else:
-            return {'error': f'API call failed: {response.status_code}', 'details': response.text}
-    
-    except Exception as e:
-        return {'error': f'Request failed: {str(e)}'}
+        xero_conn = XeroConnection.objects.get(user=user.userprofile)
+    except (XeroConnection.DoesNotExist, AttributeError):
+        return None
+    return xero_conn if xero_conn.is_valid() else None
 
 def has_xero_connection(user):
     """Check if user has a valid Xero connection"""